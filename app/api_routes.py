@@ -0,0 +1,183 @@
+import gzip
+import hashlib
+import json
+import threading
+import numpy as np
+from collections import OrderedDict
+from flask import Blueprint, Response, request
+from app.downsample import take, view_indices
+from app.indicators import SERIES as INDICATOR_SERIES, get_trend_indicators
+from app.market_data import UnknownSymbol, get_symbol_data, normalize_symbol
+from app.routes import chart_view, requested_symbol
+from app.similarity import DEFAULT_AHEAD, DEFAULT_K, DEFAULT_WINDOW, MAX_K, MAX_WINDOW, similar_periods
+from app.volatility import SERIES as VOLATILITY_SERIES, get_volatility, regime_labels
+
+try:
+    import brotli
+except ImportError:  # optional: pip install brotli
+    brotli = None
+
+# ------------------ JSON DATA API ------------------
+# Chart data for the dashboards, fetched by static/js/charts.js. Responses
+# carry a strong ETag derived from the data version and the query, so repeat
+# visits revalidate with a 304 and no body. Encoded bodies are kept in a small
+# LRU keyed by ETag, so a hit skips JSON serialization and compression too.
+
+api_routes = Blueprint('api_routes', __name__, url_prefix='/api')
+
+CACHE_CONTROL = 'public, max-age=60, must-revalidate'
+MAX_CACHED_BODIES = 64
+MIN_COMPRESS_BYTES = 1024
+
+_bodies = OrderedDict()
+_lock = threading.Lock()
+
+
+def _negotiate_encoding():
+    accepted = request.accept_encodings
+    if brotli is not None and accepted['br']:
+        return 'br'
+    if accepted['gzip']:
+        return 'gzip'
+    return None
+
+
+def _etag(endpoint, market, encoding, extra=()):
+    key = repr((endpoint, market.path, market.version, sorted(request.args.items(multi=True)), extra))
+    tag = hashlib.sha1(key.encode()).hexdigest()
+    # Each encoding is a different representation and needs its own strong tag
+    return f"{tag}-{encoding}" if encoding else tag
+
+
+def _encode(payload, encoding):
+    body = json.dumps(payload, separators=(',', ':')).encode()
+    if len(body) < MIN_COMPRESS_BYTES:
+        return body, None
+    if encoding == 'br':
+        return brotli.compress(body), 'br'
+    if encoding == 'gzip':
+        return gzip.compress(body, compresslevel=6), 'gzip'
+    return body, None
+
+
+def versioned_json(endpoint, market, build, extra=()):
+    # extra: versions of any other data the payload depends on
+    encoding = _negotiate_encoding()
+    etag = _etag(endpoint, market, encoding, extra)
+
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        cached = _bodies.get(etag)
+        if cached is None:
+            cached = _encode(build(), encoding)
+            with _lock:
+                _bodies[etag] = cached
+                while len(_bodies) > MAX_CACHED_BODIES:
+                    _bodies.popitem(last=False)
+        body, content_encoding = cached
+        response = Response(body, mimetype='application/json')
+        if content_encoding:
+            response.headers['Content-Encoding'] = content_encoding
+
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = CACHE_CONTROL
+    response.vary.add('Accept-Encoding')
+    return response
+
+
+@api_routes.errorhandler(UnknownSymbol)
+def unknown_symbol(e):
+    return {'error': str(e)}, 404
+
+
+# ---- Prices ----
+@api_routes.route('/prices')
+def prices():
+    symbol = requested_symbol()
+    view = chart_view()
+    market = get_symbol_data(symbol)
+
+    def build():
+        df = market.frame
+        idx = view_indices(market.timestamps, market.column('Close'), **view)
+        return {
+            'symbol': symbol,
+            'dates': take(df['Date'].astype(str).tolist(), idx),
+            'prices': take(df['Close'].tolist(), idx),
+        }
+
+    return versioned_json('prices', market, build)
+
+
+# ---- Trend Indicators ----
+@api_routes.route('/indicators')
+def indicators():
+    symbol = requested_symbol()
+    view = chart_view()
+    market = get_symbol_data(symbol)
+
+    def build():
+        context = dict(get_trend_indicators(market))
+        idx = view_indices(market.timestamps, market.column('Close'), **view)
+        for name in ['dates', 'prices', 'volume'] + INDICATOR_SERIES:
+            context[name] = take(context[name], idx)
+        context['symbol'] = symbol
+        return context
+
+    return versioned_json('indicators', market, build)
+
+
+# ---- Volatility ----
+@api_routes.route('/volatility')
+def volatility():
+    symbol = requested_symbol()
+    view = chart_view()
+    market = get_symbol_data(symbol)
+
+    def build():
+        df = market.frame
+        analytics = get_volatility(market)
+        daily_changes = analytics['returns']
+        # min/max buckets so every spike survives downsampling
+        idx = view_indices(market.timestamps, daily_changes, method='minmax', **view)
+        payload = {
+            'symbol': symbol,
+            'volatility': analytics['summary']['volatility'],
+            'spikes': analytics['summary']['spikes'],
+            'dates': take(df['Date'].astype(str).tolist(), idx),
+            'prices': take(df['Close'].tolist(), idx),
+            'daily_changes': take(np.nan_to_num(daily_changes).tolist(), idx),
+            'summary': analytics['summary'],
+            'regime': take(regime_labels(analytics['regime']), idx),
+        }
+        for name in VOLATILITY_SERIES:
+            # null where an estimator has no value yet (JSON has no NaN)
+            values = analytics['series'][name]
+            payload[name] = take(np.where(np.isfinite(values), np.round(values, 4), None).tolist(), idx)
+        return payload
+
+    return versioned_json('volatility', market, build)
+
+
+# ---- Similar Past Periods ----
+@api_routes.route('/similar')
+def similar():
+    # ?window=30&k=5&ahead=20&dtw=1&symbols=A,B (histories to search; default: this symbol)
+    symbol = requested_symbol()
+    market = get_symbol_data(symbol)
+    window = min(max(request.args.get('window', DEFAULT_WINDOW, type=int), 5), MAX_WINDOW)
+    k = min(max(request.args.get('k', DEFAULT_K, type=int), 1), MAX_K)
+    ahead = min(max(request.args.get('ahead', DEFAULT_AHEAD, type=int), 1), MAX_WINDOW)
+    dtw = request.args.get('dtw') in ('1', 'true')
+    names = [name for name in request.args.get('symbols', '').split(',') if name.strip()]
+    targets = {normalize_symbol(name): None for name in names} or {symbol: None}
+    targets = {name: (market if name == symbol else get_symbol_data(name)) for name in targets}
+    versions = tuple((target.path, target.version) for target in targets.values())
+
+    def build():
+        result = similar_periods(market, targets, window, k, ahead, dtw)
+        result['symbol'] = symbol
+        return result
+
+    return versioned_json('similar', market, build, versions)
@@ -3,17 +3,40 @@ import sys
 from flask import Flask
 from app.routes import finance_routes
 from app.auth_routes import auth_routes
+from app.api_routes import api_routes
+from app.metrics_routes import metrics_routes
+from app.stream_routes import stream_routes
+from app.scheduler import SCHEDULER_ENABLED, start_scheduler
+from app.db import init_db
 
-app = Flask(__name__)
-app.secret_key = 'your_secret_key_here'
 
-app.register_blueprint(auth_routes)
-app.register_blueprint(finance_routes)
+def create_app(scheduler=SCHEDULER_ENABLED):
+    # Blueprints register routes only; one-time setup (the user schema)
+    # happens here, once per app, instead of as an import side effect.
+    # Importing this module builds nothing: the WSGI entry (app/wsgi.py),
+    # __main__ and tools call create_app().
+    app = Flask(__name__)
+    app.secret_key = 'your_secret_key_here'
+
+    app.register_blueprint(auth_routes)
+    app.register_blueprint(finance_routes)
+    app.register_blueprint(api_routes)
+    app.register_blueprint(metrics_routes)
+    app.register_blueprint(stream_routes)
+
+    init_db()
+
+    # Background data refresh / retraining / cache warm-up (app/scheduler.py)
+    if scheduler:
+        start_scheduler()
+    return app
+
 
 PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
 if PROJECT_ROOT not in sys.path:
     sys.path.insert(0, PROJECT_ROOT)
-    
+
 if __name__ == "__main__":
+    # Under the debug reloader only the serving child process starts the scheduler
+    app = create_app(SCHEDULER_ENABLED and os.environ.get('WERKZEUG_RUN_MAIN') == 'true')
     app.run(debug=True)
-
@@ -1,73 +1,24 @@
 from flask import Blueprint, render_template, request, redirect, url_for, flash, session
 import sqlite3
-import os
-from werkzeug.security import generate_password_hash, check_password_hash
+from app.password_hashing import PasswordHashBusy, hash_password, verify_password
+from app.db import PROFILE_FIELDS, create_profile, create_user, get_credentials, get_profile
 
 # ------------------- Blueprint -------------------
 auth_routes = Blueprint('auth_routes', __name__)
 
 # ------------------- Database Setup -------------------
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-DB_PATH = os.path.join(BASE_DIR, '..', 'data', 'users.db')
-DB_PATH = os.path.normpath(DB_PATH)
-
-def init_db():
-    os.makedirs(os.path.join(BASE_DIR, '..', 'data'), exist_ok=True)
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-
-    # Users table
-    c.execute('''
-        CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            username TEXT UNIQUE NOT NULL,
-            password TEXT NOT NULL
-        )
-    ''')
-
-    # User profile table
-    c.execute('''
-        CREATE TABLE IF NOT EXISTS user_profile (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id INTEGER NOT NULL,
-            full_name TEXT,
-            age INTEGER,
-            occupation TEXT,
-            salary REAL,
-            expenses REAL,
-            investment_amt REAL,
-            savings_goal TEXT,
-            risk_profile TEXT,
-            investment_experience TEXT,
-            investment_horizon TEXT,
-            preferred_instruments TEXT,
-            FOREIGN KEY(user_id) REFERENCES users(id)
-        )
-    ''')
-
-    conn.commit()
-    conn.close()
-
-# Initialize DB
-init_db()
+# Connections, pragmas and queries live in app/db.py; the schema is created
+# once by create_app() in app/app.py
 
 @auth_routes.route('/signup', methods=['GET', 'POST'])
 def signup():
     if request.method == 'POST':
         username = request.form['username']
         password = request.form['password']
-        hashed_password = generate_password_hash(password)
 
         try:
-            # Use "with" to auto-handle connection closing
-            with sqlite3.connect(DB_PATH, timeout=5) as conn:
-                c = conn.cursor()
-                c.execute("INSERT INTO users (username, password) VALUES (?, ?)", (username, hashed_password))
-                conn.commit()
-
-                # Fetch user_id
-                c.execute("SELECT id FROM users WHERE username = ?", (username,))
-                user_id = c.fetchone()[0]
+            hashed_password = hash_password(password)
+            user_id = create_user(username, hashed_password)
 
             # Save in session
             session['user_id'] = user_id
@@ -81,6 +32,9 @@ def signup():
             flash('Username already exists. Please choose another.', 'danger')
         except sqlite3.OperationalError as e:
             flash(f'Database is busy, try again. ({str(e)})', 'danger')
+        except PasswordHashBusy as e:
+            flash(str(e), 'danger')
+            return render_template('signup.html'), 503
 
     return render_template('signup.html')
 
@@ -96,31 +50,10 @@ def profile():
         return redirect(url_for('finance_routes.home'))
 
     if request.method == 'POST':
-        full_name = request.form['full_name']
-        age = request.form['age']
-        occupation = request.form['occupation']
-        salary = request.form['salary']
-        expenses = request.form['expenses']
-        investment_amt = request.form['investment_amt']
-        savings_goal = request.form['savings_goal']
-        risk_profile = request.form['risk_profile']
-        investment_experience = request.form['investment_experience']
-        investment_horizon = request.form['investment_horizon']
-        preferred_instruments = ', '.join(request.form.getlist('preferred_instruments'))
-
-        conn = sqlite3.connect(DB_PATH)
-        c = conn.cursor()
-        c.execute("""
-            INSERT INTO user_profile (
-                user_id, full_name, age, occupation, salary, expenses, investment_amt,
-                savings_goal, risk_profile, investment_experience, investment_horizon, preferred_instruments
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            session['user_id'], full_name, age, occupation, salary, expenses, investment_amt,
-            savings_goal, risk_profile, investment_experience, investment_horizon, preferred_instruments
-        ))
-        conn.commit()
-        conn.close()
+        profile = {field: request.form[field] for field in PROFILE_FIELDS if field != 'preferred_instruments'}
+        profile['preferred_instruments'] = ', '.join(request.form.getlist('preferred_instruments'))
+
+        create_profile(session['user_id'], profile)
 
         session.pop('just_signed_up', None)  # Remove flag
         flash('Profile saved successfully!', 'success')
@@ -135,13 +68,15 @@ def login():
         username = request.form['username']
         password = request.form['password']
 
-        conn = sqlite3.connect(DB_PATH)
-        c = conn.cursor()
-        c.execute("SELECT id, password FROM users WHERE username = ?", (username,))
-        user = c.fetchone()
-        conn.close()
+        user = get_credentials(username)
+
+        try:
+            valid = bool(user) and verify_password(user[1], password)
+        except PasswordHashBusy as e:
+            flash(str(e), 'danger')
+            return render_template('login.html'), 503
 
-        if user and check_password_hash(user[1], password):
+        if valid:
             session['user_id'] = user[0]
             session['username'] = username
             flash('Logged in successfully!', 'success')
@@ -165,12 +100,7 @@ def view_profile():
         flash("You need to login first!", "warning")
         return redirect(url_for('auth_routes.login'))
 
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row  # lets you access columns by name
-    c = conn.cursor()
-    c.execute("SELECT * FROM user_profile WHERE user_id = ?", (session['user_id'],))
-    profile = c.fetchone()
-    conn.close()
+    profile = get_profile(session['user_id'])
 
     return render_template('view_profile.html', profile=profile)
 
@@ -0,0 +1,237 @@
+import argparse
+import json
+import os
+import time
+import numpy as np
+import pandas as pd
+from ml.artifacts import new_version
+
+# ------------------ SHARED MARKET DATA PLANE ------------------
+# For multi-worker deployments: one publisher process parses each symbol's
+# history once, precomputes the trend indicators, and writes both into a
+# segment file under PLANE_DIR (tmpfs /dev/shm when available):
+#   <name>-<version>.plane   header (magic, format, JSON: version, row count,
+#                            array offsets, KPIs) + 64-byte aligned arrays
+#   <name>.json              pointer naming the live segment; replaced
+#                            atomically after the segment is complete
+# With MARKET_DATA_PLANE=1, app/market_data.py resolves a symbol through its
+# pointer (one stat() per request, like any other data version) and maps the
+# segment read-only: columns and indicator arrays are zero-copy views of the
+# same physical pages in every worker, so adding workers adds no copies of
+# the history. A republish swaps the pointer, and every worker picks up the
+# new version on its next request without parsing anything. Old segments
+# stay until pruned; workers still mapping them keep valid pages.
+#
+#   python -m app.data_plane [SYMBOL ...] [--watch] [--interval 30]
+
+MARKET_DATA_PLANE = os.environ.get('MARKET_DATA_PLANE') == '1'
+PLANE_DIR = os.environ.get('MARKET_DATA_PLANE_DIR') or (
+    '/dev/shm/stock-dashboard-plane' if os.path.isdir('/dev/shm') else os.path.join('data', 'plane'))
+KEEP_SEGMENTS = 3
+MAGIC = b'MKTPLANE'
+FORMAT = 1
+ALIGN = 64
+INDICATOR_PREFIX = 'ind:'
+DATE_LABELS = 'label:Date'  # dd-mm-YYYY bytes; formatting 1M dates costs seconds per worker
+
+
+def plane_name(path):
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+def pointer_path(path, plane_dir=PLANE_DIR):
+    return os.path.join(plane_dir, f'{plane_name(path)}.json')
+
+
+def _aligned(offset):
+    return -(-offset // ALIGN) * ALIGN
+
+
+# ---- Writing (publisher) ----
+def write_segment(target, arrays, meta):
+    # arrays: {name: 1-D ndarray}; meta: JSON-serializable, must hold 'version'
+    layout, offset = {}, 0
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        layout[name] = {'dtype': array.dtype.str, 'length': int(len(array)), 'offset': offset}
+        offset = _aligned(offset + array.nbytes)
+
+    header = json.dumps({**meta, 'arrays': layout}).encode()
+    data_start = _aligned(len(MAGIC) + 8 + len(header))
+    tmp_path = f"{target}.tmp-{os.getpid()}"
+    with open(tmp_path, 'wb') as f:
+        f.write(MAGIC + np.array([FORMAT, len(header)], dtype='<u4').tobytes() + header)
+        for name, array in arrays.items():
+            f.seek(data_start + layout[name]['offset'])
+            f.write(np.ascontiguousarray(array).tobytes())
+        f.truncate(data_start + offset)
+    os.replace(tmp_path, target)
+
+
+def publish(path, plane_dir=PLANE_DIR):
+    # Loads `path` the normal way (store or CSV), never through the plane,
+    # and publishes it with its indicators. Returns the pointer contents.
+    from app.indicators import SERIES, TrendIndicators
+    from app.market_data import load_source
+
+    market = load_source(path)
+    signature = market.version
+    frame = market.frame
+    volume = frame['Volume'].to_numpy() if 'Volume' in frame.columns else None
+    indicators = TrendIndicators(frame['Date'].astype(str), frame['Close'], volume)
+
+    arrays = {'Date': market.timestamps.to_numpy().astype('datetime64[D]').astype(np.int32),
+              DATE_LABELS: frame['Date'].astype(str).to_numpy().astype(np.bytes_)}
+    for name in frame.columns.drop('Date'):
+        values = pd.to_numeric(frame[name], errors='coerce')
+        if not values.isna().all():
+            arrays[name] = values.to_numpy(dtype=np.float64)
+    if volume is not None:
+        arrays[INDICATOR_PREFIX + 'volume'] = np.asarray(indicators.volume, dtype=np.float64)
+    for name in SERIES:
+        arrays[INDICATOR_PREFIX + name] = np.asarray(indicators.series[name], dtype=np.float64)
+
+    version = new_version()  # sorts in publish order, which prune() relies on
+    os.makedirs(plane_dir, exist_ok=True)
+    segment = f'{plane_name(path)}-{version}.plane'
+    meta = {'version': version, 'source': path, 'source_signature': signature,
+            'rows': int(len(frame)), 'kpis': indicators.kpis()}
+    write_segment(os.path.join(plane_dir, segment), arrays, meta)
+
+    # The pointer goes last: it is the commit marker
+    pointer = {'version': version, 'segment': segment, 'source_signature': signature}
+    target = pointer_path(path, plane_dir)
+    tmp_path = f"{target}.tmp-{os.getpid()}"
+    with open(tmp_path, 'w') as f:
+        json.dump(pointer, f)
+    os.replace(tmp_path, target)
+    prune(path, plane_dir)
+    return pointer
+
+
+def prune(path, plane_dir=PLANE_DIR, keep=KEEP_SEGMENTS):
+    prefix = f'{plane_name(path)}-'
+    segments = sorted(name for name in os.listdir(plane_dir)
+                      if name.startswith(prefix) and name.endswith('.plane'))
+    for name in segments[:-keep]:
+        try:
+            os.remove(os.path.join(plane_dir, name))
+        except FileNotFoundError:
+            pass
+
+
+# ---- Reading (workers) ----
+_pointers = {}
+
+
+def current_pointer(path, plane_dir=PLANE_DIR):
+    # Pointer contents for `path`, re-read only when the file changes; None
+    # when nothing was published
+    target = pointer_path(path, plane_dir)
+    try:
+        st = os.stat(target)
+    except FileNotFoundError:
+        return None
+    signature = (st.st_mtime_ns, st.st_size, st.st_ino)
+    cached = _pointers.get(target)
+    if cached is None or cached[0] != signature:
+        try:
+            with open(target) as f:
+                cached = _pointers[target] = (signature, json.load(f))
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+    return cached[1]
+
+
+class Segment:
+    # Read-only mapping of one published segment
+
+    def __init__(self, filename):
+        self.buffer = np.memmap(filename, dtype=np.uint8, mode='r')
+        if bytes(self.buffer[:len(MAGIC)]) != MAGIC:
+            raise ValueError(f"{filename} is not a market data segment.")
+        fmt, header_len = np.frombuffer(self.buffer, dtype='<u4', count=2, offset=len(MAGIC))
+        if fmt != FORMAT:
+            raise ValueError(f"{filename} has format {fmt}, expected {FORMAT}.")
+        start = len(MAGIC) + 8
+        self.meta = json.loads(bytes(self.buffer[start:start + header_len]))
+        self.data_start = _aligned(start + int(header_len))
+        self.version = self.meta['version']
+
+    def array(self, name):
+        spec = self.meta['arrays'][name]
+        return np.frombuffer(self.buffer, dtype=np.dtype(spec['dtype']), count=spec['length'],
+                             offset=self.data_start + spec['offset'])
+
+    def names(self):
+        return list(self.meta['arrays'])
+
+
+def attach(path, version, plane_dir=PLANE_DIR):
+    pointer = current_pointer(path, plane_dir)
+    if pointer is None or pointer['version'] != version:
+        raise FileNotFoundError(f"Plane version {version} of {path} is no longer published.")
+    segment = Segment(os.path.join(plane_dir, pointer['segment']))
+    if segment.version != version:
+        raise ValueError(f"Plane segment header says {segment.version}, pointer says {version}.")
+    return segment
+
+
+def segment_columns(segment):
+    # Price columns (Date as int32 days), without indicators and labels
+    return {name: segment.array(name) for name in segment.names()
+            if not name.startswith((INDICATOR_PREFIX, 'label:'))}
+
+
+def date_labels(segment):
+    # The frame's Date strings; str objects are per worker, but decoding is
+    # ~30x faster than formatting the dates again
+    return segment.array(DATE_LABELS).astype(str).astype(object)
+
+
+def indicator_context(segment, market):
+    # Same keys as app/indicators.get_trend_indicators(); arrays are views
+    from app.indicators import SERIES
+    context = {
+        'dates': market.frame['Date'].to_numpy(),
+        'prices': market.column('Close'),
+    }
+    # Histories without volume get integer zeros, as TrendIndicators does
+    volume = INDICATOR_PREFIX + 'volume'
+    context['volume'] = segment.array(volume) if volume in segment.meta['arrays'] else [0] * len(market)
+    for name in SERIES:
+        context[name] = segment.array(INDICATOR_PREFIX + name)
+    context.update(segment.meta['kpis'])
+    return context
+
+
+if __name__ == "__main__":
+    from app.market_data import source_signature
+    from ml.symbols import list_symbols, normalize_symbol, resolve_symbol
+
+    parser = argparse.ArgumentParser(description="Publish market data into the shared plane")
+    parser.add_argument('symbols', nargs='*', help="default: every symbol")
+    parser.add_argument('--watch', action='store_true', help="republish whenever the source changes")
+    parser.add_argument('--interval', type=float, default=30.0)
+    parser.add_argument('--force', action='store_true', help="publish even when the source is unchanged")
+    args = parser.parse_args()
+
+    symbols = [normalize_symbol(s) for s in args.symbols] or list_symbols()
+    while True:
+        for symbol in symbols:
+            path = resolve_symbol(symbol)
+            pointer = current_pointer(path)
+            try:
+                signature = source_signature(path)
+            except FileNotFoundError as e:
+                print(f"{symbol}: {e}")
+                continue
+            unchanged = pointer is not None and pointer['source_signature'] == json.loads(json.dumps(signature))
+            if unchanged and not args.force:
+                continue
+            pointer = publish(path)
+            print(f"{symbol}: published {pointer['segment']} in {PLANE_DIR}")
+        if not args.watch:
+            break
+        args.force = False  # --watch: later passes only publish changes
+        time.sleep(args.interval)
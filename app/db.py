@@ -0,0 +1,136 @@
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+# ------------------ USER DATABASE ACCESS ------------------
+# A small pool of long-lived connections shared by all threads (werkzeug
+# serves each request on a new thread). A query borrows a connection for
+# its duration; at most POOL_SIZE idle ones are kept per database, extras
+# opened during a burst are closed when returned. Forked workers start with
+# an empty pool and never share a handle. Connections run in WAL mode so
+# readers don't block the writer, wait on a busy database instead of failing
+# immediately, and reuse sqlite's per-connection prepared statement cache.
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DB_PATH = os.environ.get('USERS_DB_PATH') or os.path.normpath(os.path.join(BASE_DIR, '..', 'data', 'users.db'))
+
+BUSY_TIMEOUT_MS = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000))
+SYNCHRONOUS = os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL')  # safe with WAL
+STATEMENT_CACHE_SIZE = 128
+POOL_SIZE = int(os.environ.get('SQLITE_POOL_SIZE', 4))
+
+PROFILE_FIELDS = [
+    'full_name', 'age', 'occupation', 'salary', 'expenses', 'investment_amt',
+    'savings_goal', 'risk_profile', 'investment_experience', 'investment_horizon',
+    'preferred_instruments',
+]
+
+_idle = {}  # path -> idle connections
+_idle_lock = threading.Lock()
+_pid = os.getpid()
+
+
+def _connect(path):
+    conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT_MS / 1000, check_same_thread=False,
+                           cached_statements=STATEMENT_CACHE_SIZE)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute(f'PRAGMA busy_timeout={BUSY_TIMEOUT_MS}')
+    conn.execute(f'PRAGMA synchronous={SYNCHRONOUS}')
+    return conn
+
+
+@contextmanager
+def connection(path=DB_PATH):
+    global _pid
+    with _idle_lock:
+        if _pid != os.getpid():
+            _idle.clear()  # the parent's handles stay with the parent
+            _pid = os.getpid()
+        idle = _idle.get(path)
+        conn = idle.pop() if idle else None
+    if conn is None:
+        conn = _connect(path)
+    try:
+        yield conn
+    finally:
+        if conn.in_transaction:
+            conn.rollback()
+        with _idle_lock:
+            idle = _idle.setdefault(path, [])
+            keep = _pid == os.getpid() and len(idle) < POOL_SIZE
+            if keep:
+                idle.append(conn)
+        if not keep:
+            conn.close()
+
+
+def close_db(path=DB_PATH):
+    with _idle_lock:
+        idle = _idle.pop(path, [])
+    for conn in idle:
+        conn.close()
+
+
+def init_db(path=DB_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with connection(path) as conn, conn:
+        # Users table
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS users (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                username TEXT UNIQUE NOT NULL,
+                password TEXT NOT NULL
+            )
+        ''')
+
+        # User profile table
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS user_profile (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id INTEGER NOT NULL,
+                full_name TEXT,
+                age INTEGER,
+                occupation TEXT,
+                salary REAL,
+                expenses REAL,
+                investment_amt REAL,
+                savings_goal TEXT,
+                risk_profile TEXT,
+                investment_experience TEXT,
+                investment_horizon TEXT,
+                preferred_instruments TEXT,
+                FOREIGN KEY(user_id) REFERENCES users(id)
+            )
+        ''')
+
+        # view_profile looks profiles up by user_id
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_user_profile_user_id ON user_profile(user_id)')
+
+
+# ---- Queries ----
+def create_user(username, password_hash):
+    with connection() as conn, conn:
+        cur = conn.execute("INSERT INTO users (username, password) VALUES (?, ?)", (username, password_hash))
+    return cur.lastrowid
+
+
+def get_credentials(username):
+    # (id, password_hash) or None
+    with connection() as conn:
+        return conn.execute("SELECT id, password FROM users WHERE username = ?", (username,)).fetchone()
+
+
+def create_profile(user_id, profile):
+    with connection() as conn, conn:
+        conn.execute(f"""
+            INSERT INTO user_profile (user_id, {', '.join(PROFILE_FIELDS)})
+            VALUES (?, {', '.join('?' * len(PROFILE_FIELDS))})
+        """, (user_id, *(profile.get(field) for field in PROFILE_FIELDS)))
+
+
+def get_profile(user_id):
+    with connection() as conn:
+        cur = conn.cursor()
+        cur.row_factory = sqlite3.Row  # lets the template access columns by name
+        return cur.execute("SELECT * FROM user_profile WHERE user_id = ?", (user_id,)).fetchone()
@@ -0,0 +1,78 @@
+import numpy as np
+
+# ------------------ CHART DOWNSAMPLING ------------------
+# Charts only need as many points as the canvas has pixels. Pages pick the
+# rows to send with Largest-Triangle-Three-Buckets (keeps the visual shape,
+# peaks and dips of a line) or min/max bucketing (keeps every extreme, good
+# for spiky bar series), after restricting to the requested date range.
+
+DEFAULT_POINTS = 1000
+MAX_POINTS = 20000
+
+
+def lttb_indices(values, n_out):
+    values = np.asarray(values, dtype=float)
+    n = len(values)
+    if n_out <= 0 or n <= n_out or n_out < 3:
+        return np.arange(n)
+
+    # Buckets over the interior points; first and last points are always kept
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    starts, ends = edges[:-1], edges[1:]
+    x = np.arange(n, dtype=float)
+    # Average of every bucket, used as the third triangle corner for the one before it
+    counts = ends - starts
+    avg_y = np.add.reduceat(values[:n - 1], starts) / counts
+    avg_x = (starts + ends - 1) / 2.0
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(len(starts)):
+        lo, hi = starts[i], ends[i]
+        if i + 1 < len(starts):
+            cx, cy = avg_x[i + 1], avg_y[i + 1]
+        else:
+            cx, cy = x[n - 1], values[n - 1]
+        ax, ay = x[a], values[a]
+        area = np.abs((ax - cx) * (values[lo:hi] - ay) - (ax - x[lo:hi]) * (cy - ay))
+        a = lo + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def minmax_indices(values, n_out):
+    # Two points (min and max) per bucket over the interior, in time order;
+    # first and last points are always kept so the line spans the full range
+    values = np.asarray(values, dtype=float)
+    n = len(values)
+    if n_out <= 0 or n <= n_out or n_out < 2:
+        return np.arange(n)
+    edges = np.linspace(1, n - 1, (n_out - 2) // 2 + 1).astype(np.int64)
+    picks = [0, n - 1]
+    for lo, hi in zip(edges[:-1], edges[1:]):
+        if hi > lo:
+            chunk = values[lo:hi]
+            picks.extend((lo + int(np.argmin(chunk)), lo + int(np.argmax(chunk))))
+    return np.unique(picks)
+
+
+def view_indices(timestamps, values, points=DEFAULT_POINTS, start=None, end=None, method='lttb'):
+    # Rows of the series to render for the given zoom window and point budget
+    positions = np.arange(len(values))
+    if start is not None or end is not None:
+        ts = np.asarray(timestamps, dtype='datetime64[ns]')
+        mask = np.ones(len(ts), dtype=bool)
+        if start is not None:
+            mask &= ts >= np.datetime64(start, 'ns')
+        if end is not None:
+            mask &= ts <= np.datetime64(end, 'ns')
+        positions = np.flatnonzero(mask)
+
+    window = np.nan_to_num(np.asarray(values, dtype=float)[positions])
+    pick = minmax_indices if method == 'minmax' else lttb_indices
+    return positions[pick(window, points)]
+
+
+def take(series, indices):
+    return [series[i] for i in indices]
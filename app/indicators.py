@@ -0,0 +1,238 @@
+import math
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from app.data_plane import indicator_context
+from app.market_data import MAX_RESIDENT_SYMBOLS
+from ml.rolling import RollingWindow
+from ml.stages import stage
+
+# ------------------ TREND INDICATOR ENGINE ------------------
+# Indicators for the trend dashboard are computed once per data version.
+# When the history only grew (new daily bars appended), the new rows are
+# folded in using rolling sums, EWM state and a running cummax instead of
+# recomputing the whole history.
+
+MA_WINDOWS = (20, 50, 200)
+BB_WINDOW = 20
+RSI_WINDOW = 14
+MONTHLY_LAG = 30
+EMA_FAST = 12
+EMA_SLOW = 26
+
+SERIES = ['ma20', 'ma50', 'ma200', 'bb_upper', 'bb_lower', 'daily_return',
+          'monthly_return', 'drawdown', 'rsi', 'macd']
+
+
+def _nan_to_zero(value):
+    return 0.0 if math.isnan(value) else float(value)
+
+
+class TrendIndicators:
+
+    def __init__(self, dates, closes, volume=None):
+        closes = pd.Series(np.asarray(closes, dtype=float))
+        n = len(closes)
+        self.dates = [str(d) for d in dates]
+        self.prices = closes.tolist()
+        self.volume = [0] * n if volume is None else pd.Series(volume).fillna(0).tolist()
+
+        # ---- Full vectorized pass ----
+        ma = {w: closes.rolling(window=w).mean() for w in MA_WINDOWS}
+        daily_return = closes.pct_change() * 100
+        monthly_return = closes.pct_change(MONTHLY_LAG) * 100
+        cummax = closes.cummax()
+        drawdown = ((cummax - closes) / cummax) * 100
+
+        delta = closes.diff()
+        up = delta.clip(lower=0)
+        down = -1 * delta.clip(upper=0)
+        rsi = 100 - (100 / (1 + up.rolling(RSI_WINDOW).mean() / down.rolling(RSI_WINDOW).mean()))
+
+        ema_fast = closes.ewm(span=EMA_FAST, adjust=False).mean()
+        ema_slow = closes.ewm(span=EMA_SLOW, adjust=False).mean()
+
+        bb_mid = closes.rolling(BB_WINDOW).mean()
+        bb_std = closes.rolling(BB_WINDOW).std()
+
+        self.series = {
+            'ma20': ma[20].fillna(0).tolist(),
+            'ma50': ma[50].fillna(0).tolist(),
+            'ma200': ma[200].fillna(0).tolist(),
+            'bb_upper': (bb_mid + 2 * bb_std).fillna(0).tolist(),
+            'bb_lower': (bb_mid - 2 * bb_std).fillna(0).tolist(),
+            'daily_return': daily_return.fillna(0).tolist(),
+            'monthly_return': monthly_return.fillna(0).tolist(),
+            'drawdown': drawdown.fillna(0).tolist(),
+            'rsi': rsi.fillna(0).tolist(),
+            'macd': (ema_fast - ema_slow).fillna(0).tolist(),
+        }
+
+        # ---- Running state for incremental appends ----
+        values = self.prices
+        self.ma_windows = {w: RollingWindow(w, values[-w:]) for w in MA_WINDOWS}
+        self.bb_window = RollingWindow(BB_WINDOW, values[-BB_WINDOW:])
+        self.up_window = RollingWindow(RSI_WINDOW, up.iloc[1:].tail(RSI_WINDOW).tolist())
+        self.down_window = RollingWindow(RSI_WINDOW, down.iloc[1:].tail(RSI_WINDOW).tolist())
+        self.ema_fast = float(ema_fast.iloc[-1]) if n else None
+        self.ema_slow = float(ema_slow.iloc[-1]) if n else None
+        self.cummax = float(cummax.iloc[-1]) if n else -math.inf
+        self.highest_vol = float(daily_return.abs().max()) if n else math.nan
+        self.support = float(closes.min()) if n else math.nan
+
+    def __len__(self):
+        return len(self.prices)
+
+    def append(self, date, close, volume=0):
+        close = float(close)
+        prev = self.prices[-1] if self.prices else None
+        self.dates.append(str(date))
+        self.prices.append(close)
+        self.volume.append(0 if volume is None or math.isnan(volume) else volume)
+
+        for window in self.ma_windows.values():
+            window.push(close)
+        self.bb_window.push(close)
+        mid, std = self.bb_window.mean(), self.bb_window.std()
+
+        if prev is None:
+            daily = math.nan
+            self.ema_fast = self.ema_slow = close
+        else:
+            daily = (close / prev - 1) * 100
+            delta = close - prev
+            self.up_window.push(max(delta, 0.0))
+            self.down_window.push(max(-delta, 0.0))
+            a_fast = 2 / (EMA_FAST + 1)
+            a_slow = 2 / (EMA_SLOW + 1)
+            self.ema_fast = a_fast * close + (1 - a_fast) * self.ema_fast
+            self.ema_slow = a_slow * close + (1 - a_slow) * self.ema_slow
+
+        n = len(self.prices)
+        monthly = (close / self.prices[n - 1 - MONTHLY_LAG] - 1) * 100 if n > MONTHLY_LAG else math.nan
+
+        self.cummax = max(self.cummax, close)
+        drawdown = (self.cummax - close) / self.cummax * 100
+
+        rsi = math.nan
+        if self.up_window.full:
+            roll_up, roll_down = self.up_window.mean(), self.down_window.mean()
+            if roll_down > 0:
+                rsi = 100 - 100 / (1 + roll_up / roll_down)
+            elif roll_up > 0:
+                rsi = 100.0
+
+        if not math.isnan(daily):
+            self.highest_vol = abs(daily) if math.isnan(self.highest_vol) else max(self.highest_vol, abs(daily))
+        self.support = close if math.isnan(self.support) else min(self.support, close)
+
+        values = {
+            'ma20': self.ma_windows[20].mean(),
+            'ma50': self.ma_windows[50].mean(),
+            'ma200': self.ma_windows[200].mean(),
+            'bb_upper': mid + 2 * std,
+            'bb_lower': mid - 2 * std,
+            'daily_return': daily,
+            'monthly_return': monthly,
+            'drawdown': drawdown,
+            'rsi': rsi,
+            'macd': self.ema_fast - self.ema_slow,
+        }
+        for name, value in values.items():
+            self.series[name].append(_nan_to_zero(value))
+
+    def trim(self, keep):
+        # Drop all but the last `keep` points of the history lists; the
+        # running state (windows, EMAs, cummax) is unaffected
+        excess = len(self.prices) - keep
+        if excess > 0:
+            for values in [self.dates, self.prices, self.volume] + list(self.series.values()):
+                del values[:excess]
+
+    def kpis(self):
+        trend_pct = ((self.prices[-1] / self.prices[0]) - 1) * 100
+        return {
+            'trend_pct': round(trend_pct, 2),
+            'highest_vol': round(self.highest_vol, 2),
+            'support_level': round(self.support, 2),
+        }
+
+    def context(self):
+        # Snapshot sized to the current length, safe to hand to templates
+        # while later appends extend the underlying lists.
+        n = len(self.prices)
+        context = {
+            'dates': self.dates[:n],
+            'prices': self.prices[:n],
+            'volume': self.volume[:n],
+        }
+        for name in SERIES:
+            context[name] = self.series[name][:n]
+        context.update(self.kpis())
+        return context
+
+
+# ------------------ Per data-version cache ------------------
+class _Entry:
+    def __init__(self, version, indicators):
+        self.version = version
+        self.indicators = indicators
+        self.context = indicators.context()
+
+
+# Bounded like the market data store so evicted symbols free their indicators too
+_cache = OrderedDict()
+_lock = threading.Lock()
+
+
+def _volume(frame):
+    return frame['Volume'].to_numpy() if 'Volume' in frame.columns else None
+
+
+def _extends(indicators, frame):
+    # True when frame is the cached history with rows appended at the end
+    n = len(indicators)
+    if len(frame) <= n:
+        return False
+    closes = frame['Close'].to_numpy()[:n]
+    dates = frame['Date'].astype(str).to_numpy()[:n]
+    return (np.array_equal(closes, np.asarray(indicators.prices))
+            and dates[-1] == indicators.dates[-1])
+
+
+def get_trend_indicators(market):
+    if market.plane is not None:
+        # Precomputed by the publisher (app/data_plane.py), shared by all workers
+        return market.memo('plane_indicators', lambda: indicator_context(market.plane, market))
+
+    entry = _cache.get(market.path)
+    if entry is not None and entry.version == market.version:
+        try:
+            _cache.move_to_end(market.path)
+        except KeyError:
+            pass
+        return entry.context
+
+    with _lock:
+        entry = _cache.get(market.path)
+        if entry is not None and entry.version == market.version:
+            return entry.context
+
+        frame = market.frame
+        with stage('indicators'):
+            if entry is not None and _extends(entry.indicators, frame):
+                indicators = entry.indicators
+                new_rows = frame.iloc[len(indicators):]
+                volume = _volume(new_rows)
+                for i, (date, close) in enumerate(zip(new_rows['Date'], new_rows['Close'])):
+                    indicators.append(date, close, 0 if volume is None else volume[i])
+            else:
+                indicators = TrendIndicators(frame['Date'].astype(str), frame['Close'], _volume(frame))
+
+        entry = _Entry(market.version, indicators)
+        _cache[market.path] = entry
+        _cache.move_to_end(market.path)
+        while len(_cache) > MAX_RESIDENT_SYMBOLS:
+            _cache.popitem(last=False)
+        return entry.context
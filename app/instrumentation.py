@@ -0,0 +1,72 @@
+import bisect
+import threading
+
+# ------------------ METRICS REGISTRY ------------------
+# Minimal Prometheus-style histograms, kept in process memory and rendered in
+# the text exposition format by /metrics (app/metrics_routes.py). Each
+# observation is a bisect and two increments under a lock, cheap enough to
+# run on every request and every stage.
+
+# Prometheus client defaults, in seconds
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    def __init__(self, name, help_text, label_names, buckets=BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets)
+        self._series = {}  # label values -> [bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[i] += 1
+            series[-1] += value
+
+    def series(self):
+        with self._lock:
+            return {labels: list(values) for labels, values in self._series.items()}
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for labels, values in sorted(self.series().items()):
+            base = ','.join(f'{k}="{_escape(v)}"' for k, v in zip(self.label_names, labels))
+            sep = ',' if base else ''
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), values[:-1]):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f'{self.name}_bucket{{{base}{sep}le="{le}"}} {cumulative}')
+            lines.append(f'{self.name}_sum{{{base}}} {values[-1]}')
+            lines.append(f'{self.name}_count{{{base}}} {cumulative}')
+        return '\n'.join(lines)
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def render_gauges(name, help_text, values, label=None):
+    # values: {label value: number} when `label` is set, else a single number
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} gauge"]
+    if label is None:
+        lines.append(f"{name} {values}")
+    else:
+        lines.extend(f'{name}{{{label}="{_escape(key)}"}} {value}' for key, value in sorted(values.items()))
+    return '\n'.join(lines)
+
+
+REQUEST_SECONDS = Histogram('http_request_duration_seconds', "Time spent handling a request.",
+                            ['route', 'method', 'status'])
+STAGE_SECONDS = Histogram('stage_duration_seconds', "Time spent in a named stage of a request or job.",
+                          ['route', 'stage'])
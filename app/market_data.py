@@ -0,0 +1,233 @@
+import os
+import threading
+from collections import OrderedDict
+import pandas as pd
+from ml.stages import stage
+from app.data_plane import MARKET_DATA_PLANE, attach, current_pointer, date_labels, segment_columns
+from ml.columnar_store import META_FILE, days_to_datetime, is_fresh, open_columns, read_source, store_path, to_columns
+from ml.symbols import DEFAULT_DATA_PATH, DEFAULT_SYMBOL, UnknownSymbol, list_symbols, normalize_symbol, resolve_symbol
+
+# ------------------ MARKET DATA STORE ------------------
+# The price history is loaded once and kept in memory. Every request only
+# stat()s the source file (and its columnar store, if one was ingested with
+# `python -m ml.columnar_store`); data is reloaded when either changes.
+# A fresh columnar store is memory-mapped instead of parsing the CSV.
+#
+# Each symbol is loaded lazily on first request and at most
+# MAX_RESIDENT_SYMBOLS series stay in memory (least recently used evicted).
+# refresh_market_data() swaps in a new version only after it has been warmed.
+# Loads hold a per-path lock; the module lock only guards the resident set,
+# so a slow load or refresh of one symbol never blocks the others.
+#
+# With MARKET_DATA_PLANE=1, symbols published by `python -m app.data_plane`
+# are attached from the shared plane instead (app/data_plane.py): the
+# version is the published one and nothing is parsed in the worker.
+
+DATA_PATH = DEFAULT_DATA_PATH
+MAX_RESIDENT_SYMBOLS = int(os.environ.get('MARKET_DATA_MAX_SYMBOLS', 8))
+
+
+class MarketData:
+    def __init__(self, path, frame, version):
+        self.path = path
+        self.frame = frame
+        self.version = version
+        self._timestamps = None
+        self._memo = {}
+        self.plane = None  # app/data_plane.Segment when attached from the plane
+
+    def __len__(self):
+        return len(self.frame)
+
+    def column(self, name):
+        # Columnar NumPy view of a single series (no copy)
+        return self.frame[name].to_numpy()
+
+    def memo(self, key, compute):
+        # Derived data (feature frames, statistics) cached for the lifetime
+        # of this data version; a reload starts from an empty memo.
+        try:
+            return self._memo[key]
+        except KeyError:
+            value = self._memo[key] = compute()
+            return value
+
+    @property
+    def timestamps(self):
+        # Parsed once per data version; Date strings are dd-mm-YYYY
+        if self._timestamps is None:
+            self._timestamps = pd.to_datetime(self.frame['Date'], format='%d-%m-%Y', errors='coerce')
+        return self._timestamps
+
+
+_cache = OrderedDict()
+_lock = threading.Lock()  # _cache and _path_locks
+_path_locks = {}
+
+
+def _path_lock(path):
+    with _lock:
+        return _path_locks.setdefault(path, threading.Lock())
+
+
+def _file_signature(path):
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def source_signature(path):
+    # Version of the files on disk: the source and its columnar store
+    signature = (_file_signature(path), _file_signature(os.path.join(store_path(path), META_FILE)))
+    if signature == (None, None):
+        raise FileNotFoundError(f"{path} not found.")
+    return signature
+
+
+def _signature(path):
+    if MARKET_DATA_PLANE:
+        pointer = current_pointer(path)
+        if pointer is not None:
+            return 'plane', pointer['version']
+    return source_signature(path)
+
+
+def _read_source(path):
+    # Same parse and cleaning as ingesting the store does (read_source), and
+    # the same frame construction as reading the store back
+    return _from_columns(to_columns(read_source(path)))
+
+
+def _read_store(dest):
+    return _from_columns(open_columns(dest))
+
+
+def _from_columns(columns, labels=None):
+    # Numeric columns stay memory-mapped; only the Date labels are built
+    timestamps = pd.Series(days_to_datetime(columns.pop('Date')))
+    frame = {'Date': timestamps.dt.strftime('%d-%m-%Y').to_numpy() if labels is None else labels}
+    frame.update(columns)
+    return pd.DataFrame(frame, copy=False), timestamps
+
+
+def get_market_data(path=DATA_PATH):
+    signature = _signature(path)
+    cached = _cache.get(path)
+    if cached is not None and cached.version == signature:
+        try:
+            _cache.move_to_end(path)
+        except KeyError:
+            pass  # evicted by another thread meanwhile
+        return cached
+
+    with _path_lock(path):
+        # Another thread (or the scheduler) may have reloaded while we waited
+        signature = _signature(path)
+        cached = _cache.get(path)
+        if cached is not None and cached.version == signature:
+            return cached
+
+        market = _load(path, signature)
+        with _lock:
+            _install(path, market)
+        return market
+
+
+def _load(path, signature, retry=True):
+    if signature[0] == 'plane':
+        try:
+            with stage('plane_attach'):
+                segment = attach(path, signature[1])
+                frame, timestamps = _from_columns(segment_columns(segment), date_labels(segment))
+        except FileNotFoundError:
+            # Republished or pruned between the pointer read and the attach:
+            # follow the new pointer once, then fall back to the source
+            current = _signature(path)
+            if retry and current[0] == 'plane' and current != signature:
+                return _load(path, current, retry=False)
+            signature = source_signature(path)
+        else:
+            market = MarketData(path, frame, signature)
+            market._timestamps = timestamps
+            market.plane = segment
+            return market
+
+    dest = store_path(path)
+    if is_fresh(dest, path):
+        with stage('store_read'):
+            frame, timestamps = _read_store(dest)
+        market = MarketData(path, frame, signature)
+        market._timestamps = timestamps
+        return market
+    with stage('csv_read'):
+        frame, timestamps = _read_source(path)
+    market = MarketData(path, frame, signature)
+    market._timestamps = timestamps
+    return market
+
+
+def load_source(path=DATA_PATH):
+    # A fresh MarketData read from the columnar store or CSV, never from the
+    # data plane nor the memo; used to publish the plane (app/data_plane.py)
+    return _load(path, source_signature(path))
+
+
+def _install(path, market):
+    _cache[path] = market
+    _cache.move_to_end(path)
+    while len(_cache) > MAX_RESIDENT_SYMBOLS:
+        _cache.popitem(last=False)
+
+
+def resident_paths():
+    return list(_cache)
+
+
+def is_current(path=DATA_PATH):
+    # True when the resident copy of `path` matches the files on disk
+    cached = _cache.get(path)
+    try:
+        return cached is not None and cached.version == _signature(path)
+    except FileNotFoundError:
+        return False
+
+
+def refresh_market_data(path=DATA_PATH, update=None, warm=None):
+    # Used by the scheduler (app/scheduler.py) to publish a data version only
+    # once it is warm. update() writes the new files, warm(market) fills the
+    # caches of a private copy (training included); both run without any
+    # lock, and requests keep being served meanwhile, loading the new files
+    # themselves if they arrive first. The warmed copy is installed last,
+    # if it is still current.
+    if update is not None:
+        update()
+    market = _load(path, _signature(path))
+    if warm is not None:
+        warm(market)
+    with _path_lock(path):
+        # Unless the files changed again while warming
+        if market.version == _signature(path):
+            with _lock:
+                _install(path, market)
+    return market
+
+
+def get_symbol_data(symbol=None):
+    # Raises UnknownSymbol for symbols missing from the directory
+    return get_market_data(resolve_symbol(symbol))
+
+
+def load_prices(path=DATA_PATH):
+    # Shared frame: callers must copy before adding columns
+    return get_market_data(path).frame
+
+
+def data_version(path=DATA_PATH):
+    return get_market_data(path).version
+
+
+def clear_cache():
+    with _lock:
+        _cache.clear()
@@ -0,0 +1,157 @@
+import cProfile
+import io
+import os
+import pstats
+import resource
+import threading
+import time
+from flask import (Blueprint, Response, before_render_template, current_app, g, has_request_context, request,
+                   template_rendered)
+from app.instrumentation import REQUEST_SECONDS, STAGE_SECONDS, render_gauges
+from app.market_data import resident_paths
+from app.password_hashing import hash_pool_stats
+from app.response_cache import response_cache_stats
+from app.scheduler import scheduler_stats
+from ml.stages import add_observer
+
+try:
+    import pyinstrument
+except ImportError:  # optional: pip install pyinstrument
+    pyinstrument = None
+
+# ------------------ REQUEST INSTRUMENTATION ------------------
+# Every request is timed per route, and every stage timer (ml/stages.py: data
+# load, features, model load, predict, indicators, template render) is
+# recorded against the route that ran it. Both are exposed as histograms on
+# /metrics and per response in a Server-Timing header.
+#
+# ?profile=1 (or an X-Profile: 1 header) returns a cProfile report of that
+# one request instead of its response; ?profile=pyinstrument uses
+# pyinstrument when installed. Only available with PROFILE_REQUESTS=1 or in
+# debug mode, and one profiled request at a time.
+
+PROFILE_REQUESTS = os.environ.get('PROFILE_REQUESTS') == '1'
+PROFILE_HEADER = 'X-Profile'
+PROFILE_LINES = 40
+
+metrics_routes = Blueprint('metrics_routes', __name__)
+
+_profile_lock = threading.Lock()
+
+
+def _route():
+    if has_request_context():
+        return request.endpoint or 'unmatched'
+    return 'background'  # scheduler, scripts
+
+
+def _record_stage(name, seconds):
+    STAGE_SECONDS.observe(seconds, _route(), name)
+    if has_request_context():
+        g.setdefault('stages', []).append((name, seconds))
+
+
+add_observer(_record_stage)
+
+
+# ---- Template render timing ----
+def _render_started(sender, template, context, **extra):
+    g.render_t0 = time.perf_counter()
+
+
+def _render_finished(sender, template, context, **extra):
+    t0 = g.pop('render_t0', None)
+    if t0 is not None:
+        _record_stage('render', time.perf_counter() - t0)
+
+
+before_render_template.connect(_render_started)
+template_rendered.connect(_render_finished)
+
+
+# ---- Request hooks ----
+def _requested_profiler():
+    mode = request.args.get('profile') or request.headers.get(PROFILE_HEADER)
+    if not mode or mode == '0' or not (PROFILE_REQUESTS or current_app.debug):
+        return None
+    return 'pyinstrument' if mode == 'pyinstrument' and pyinstrument is not None else 'cprofile'
+
+
+@metrics_routes.before_app_request
+def start_request_timer():
+    g.request_t0 = time.perf_counter()
+    kind = _requested_profiler()
+    if kind is not None and _profile_lock.acquire(blocking=False):
+        profiler = pyinstrument.Profiler() if kind == 'pyinstrument' else cProfile.Profile()
+        g.profiler = (kind, profiler)
+        if kind == 'pyinstrument':
+            profiler.start()
+        else:
+            profiler.enable()
+
+
+def _stop_profiler():
+    kind, profiler = g.pop('profiler')
+    try:
+        if kind == 'pyinstrument':
+            profiler.stop()
+            return profiler.output_text(unicode=False, color=False)
+        profiler.disable()
+        out = io.StringIO()
+        pstats.Stats(profiler, stream=out).sort_stats('cumulative').print_stats(PROFILE_LINES)
+        return out.getvalue()
+    finally:
+        _profile_lock.release()
+
+
+def _profile_response(response, elapsed, stages):
+    report = _stop_profiler()
+    lines = [f"{request.method} {request.full_path.rstrip('?')} -> {response.status_code}",
+             f"total: {elapsed * 1000:.2f} ms"]
+    lines.extend(f"  {name}: {seconds * 1000:.2f} ms" for name, seconds in stages)
+    return Response('\n'.join(lines) + '\n\n' + report, mimetype='text/plain')
+
+
+@metrics_routes.after_app_request
+def record_request(response):
+    t0 = g.get('request_t0')
+    if t0 is None:
+        return response
+    elapsed = time.perf_counter() - t0
+    REQUEST_SECONDS.observe(elapsed, _route(), request.method, str(response.status_code))
+
+    stages = g.get('stages', [])
+    timings = [f"{name};dur={seconds * 1000:.2f}" for name, seconds in stages]
+    response.headers['Server-Timing'] = ', '.join(timings + [f"total;dur={elapsed * 1000:.2f}"])
+
+    if 'profiler' in g:
+        return _profile_response(response, elapsed, stages)
+    if _requested_profiler() is not None:
+        response.headers[PROFILE_HEADER] = 'busy'  # another request holds the profiler
+    return response
+
+
+@metrics_routes.teardown_app_request
+def release_profiler(exc):
+    # Error paths that never reached after_request
+    if 'profiler' in g:
+        _stop_profiler()
+
+
+# ---- /metrics ----
+@metrics_routes.route('/metrics')
+def metrics():
+    sections = [REQUEST_SECONDS.render(), STAGE_SECONDS.render()]
+    for key, value in hash_pool_stats().items():
+        sections.append(render_gauges(f'password_hash_{key}', f"Password hash pool: {key}.", value))
+    sections.append(render_gauges('market_data_resident_symbols', "Price series held in memory.",
+                                  len(resident_paths())))
+    for key, value in response_cache_stats().items():
+        sections.append(render_gauges(f'response_cache_{key}', f"Rendered page cache: {key}.", value))
+    scheduler = scheduler_stats()
+    if scheduler is not None:
+        sections.append(render_gauges('scheduler_runs', "Completed scheduler passes.", scheduler['runs']))
+        sections.append(render_gauges('scheduler_errors', "Failed symbol refreshes.", scheduler['errors']))
+    sections.append(render_gauges('process_max_rss_bytes', "Peak resident set size.",
+                                  resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024))
+    return Response('\n'.join(sections) + '\n', mimetype='text/plain; version=0.0.4; charset=utf-8')
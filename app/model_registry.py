@@ -0,0 +1,184 @@
+import os
+import threading
+from collections import OrderedDict
+from ml.stages import stage
+from ml.affine import AFFINE_FILE, AffineModel
+from ml.horizons import direct_horizon, predict_direct
+from ml.artifacts import MANIFEST_FILE, artifact_path, read_manifest
+from ml.symbols import DEFAULT_SYMBOL, model_dir, normalize_symbol
+from app.market_data import MAX_RESIDENT_SYMBOLS
+
+# ------------------ MODEL REGISTRY ------------------
+# The model and both scalers are unpickled once and kept in memory. Each
+# request only stat()s the three artifacts; when any of them changes on disk
+# a new bundle is loaded and swapped in as a whole. If the files change again
+# while we are reading them (retraining in progress) or fail to unpickle, the
+# previous bundle keeps serving until the next request retries.
+#
+# Retrained models are published as versioned directories named by a
+# manifest.json (ml/artifacts.py); the manifest is re-read only when it changes.
+#
+# When a model directory has affine.npz (ml/affine.py), that single NumPy
+# file is served instead of the pickles, so the web process never imports
+# scikit-learn. MODEL_SERVE_AFFINE=0 forces the pickled path.
+#
+# Symbols are checked against the symbol directory before any path is
+# built (UnknownSymbol otherwise), and at most MAX_RESIDENT_SYMBOLS bundles
+# stay in memory, least recently used evicted, like the price series.
+
+MODEL_FILE = 'linear_model.pkl'
+SCALER_X_FILE = 'scaler_X.pkl'
+SCALER_Y_FILE = 'scaler_y.pkl'
+SERVE_AFFINE = os.environ.get('MODEL_SERVE_AFFINE', '1') == '1'
+
+
+_manifests = {}
+
+
+def current_manifest(directory):
+    # manifest.json of a model directory, or None for flat (unversioned) models
+    path = os.path.join(directory, MANIFEST_FILE)
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    signature = (st.st_mtime_ns, st.st_size, st.st_ino)
+    cached = _manifests.get(directory)
+    if cached is None or cached[0] != signature:
+        cached = _manifests[directory] = (signature, read_manifest(directory))
+    return cached[1]
+
+
+def model_paths(symbol=DEFAULT_SYMBOL):
+    # NIFTY50 -> ml/models/, other symbols -> ml/models/<SYMBOL>/; within it the
+    # version named by manifest.json, else the flat *.pkl files
+    directory = model_dir(symbol)
+    manifest = current_manifest(directory)
+    if SERVE_AFFINE:
+        affine_path = artifact_path(directory, AFFINE_FILE, manifest)
+        if os.path.exists(affine_path):
+            return (affine_path,)
+    return tuple(artifact_path(directory, filename, manifest)
+                 for filename in (MODEL_FILE, SCALER_X_FILE, SCALER_Y_FILE))
+
+
+class ModelNotFound(Exception):
+    pass
+
+
+class ModelBundle:
+    def __init__(self, model, scaler_X, scaler_y, version, direct=None):
+        self.model = model
+        self.scaler_X = scaler_X
+        self.scaler_y = scaler_y
+        self.version = version
+        self.direct = direct or {}  # horizon -> direct multi-step model (ml/horizons.py)
+
+    def predict(self, X):
+        # X holds raw feature rows; returns next-close predictions in price units
+        with stage('predict'):
+            X_scaled = self.scaler_X.transform(X)
+            pred_scaled = self.model.predict(X_scaled)
+            return self.scaler_y.inverse_transform(pred_scaled.reshape(-1, 1))[:, 0]
+
+    def predict_direct(self, X, horizon):
+        with stage('predict'):
+            return predict_direct(self.direct[horizon], X)
+
+
+class AffineBundle:
+    # Same interface as ModelBundle, served from a folded AffineModel
+    def __init__(self, model, version):
+        self.model = model
+        self.version = version
+        self.direct = model.direct
+
+    def predict(self, X):
+        with stage('predict'):
+            return self.model.predict(X)
+
+    def predict_direct(self, X, horizon):
+        with stage('predict'):
+            return self.model.predict_direct(X, horizon)
+
+
+_bundles = OrderedDict()
+_lock = threading.Lock()
+
+
+def _signature(paths):
+    sig = []
+    for path in paths:
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        sig.append((st.st_mtime_ns, st.st_size))
+    # Paths are part of the version: each published model lives in its own directory
+    return paths, tuple(sig)
+
+
+def _load(paths, signature):
+    if len(paths) == 1:
+        with stage('model_load'):
+            bundle = AffineBundle(AffineModel.load(paths[0]), signature)
+        if _signature(paths) != signature:
+            raise ValueError("Model artifacts changed while loading.")
+        return bundle
+
+    import joblib  # the pickled path unpickles scikit-learn objects
+    model_path, scaler_x_path, scaler_y_path = paths
+    with stage('model_load'):
+        # Direct models only ship inside versioned directories, which never change
+        directory = os.path.dirname(model_path)
+        direct = {}
+        for filename in os.listdir(directory):
+            horizon = direct_horizon(filename)
+            if horizon is not None:
+                direct[horizon] = joblib.load(os.path.join(directory, filename))
+        bundle = ModelBundle(joblib.load(model_path), joblib.load(scaler_x_path),
+                             joblib.load(scaler_y_path), signature, direct)
+    if _signature(paths) != signature:
+        raise ValueError("Model artifacts changed while loading.")
+    return bundle
+
+
+def get_model(symbol=DEFAULT_SYMBOL):
+    # Raises UnknownSymbol for symbols missing from the directory,
+    # ModelNotFound when the symbol has no trained model
+    symbol = normalize_symbol(symbol)
+    paths = model_paths(symbol)
+    signature = _signature(paths)
+    current = _bundles.get(symbol)
+    if current is not None and (signature is None or current.version == signature):
+        try:
+            _bundles.move_to_end(symbol)
+        except KeyError:
+            pass  # evicted by another thread meanwhile
+        return current
+    if signature is None:
+        if symbol == DEFAULT_SYMBOL:
+            raise ModelNotFound("Model or scalers not found. Train it first.")
+        raise ModelNotFound(f"No model trained for {symbol}. Run: python ml/train_model.py {symbol}")
+
+    with _lock:
+        current = _bundles.get(symbol)
+        if current is not None and current.version == signature:
+            return current
+        try:
+            bundle = _load(paths, signature)
+        except Exception:
+            if current is None:
+                raise
+            return current
+        _bundles[symbol] = bundle
+        _bundles.move_to_end(symbol)
+        while len(_bundles) > MAX_RESIDENT_SYMBOLS:
+            _bundles.popitem(last=False)
+        return bundle
+
+
+def clear_cache():
+    with _lock:
+        _bundles.clear()
+        _manifests.clear()
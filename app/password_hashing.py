@@ -0,0 +1,109 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from werkzeug.security import check_password_hash, generate_password_hash
+
+# ------------------ PASSWORD HASHING ------------------
+# Hashing and verification are deliberately slow KDFs. They run on a small
+# bounded pool (hashlib releases the GIL, so the threads really run in
+# parallel) instead of on whichever request thread got the login, so a login
+# burst can use at most HASH_WORKERS cores. At most HASH_QUEUE_LIMIT more
+# requests wait for a worker; beyond that callers get PasswordHashBusy right
+# away and the route answers 503, keeping the dashboards responsive. A hash
+# that takes longer than HASH_TIMEOUT_S is answered the same way; if it had
+# not started yet it is cancelled and its slot freed, otherwise the slot is
+# freed when it finishes.
+#
+# Method/cost follow werkzeug's syntax, e.g. "scrypt:32768:8:1" or
+# "pbkdf2:sha256:600000". Existing hashes keep verifying after a change.
+
+HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD', 'scrypt')
+SALT_LENGTH = int(os.environ.get('PASSWORD_SALT_LENGTH', 16))
+HASH_WORKERS = int(os.environ.get('HASH_WORKERS', min(4, os.cpu_count() or 1)))
+HASH_QUEUE_LIMIT = int(os.environ.get('HASH_QUEUE_LIMIT', 32))
+HASH_TIMEOUT_S = float(os.environ.get('HASH_TIMEOUT_S', 10))
+
+
+class PasswordHashBusy(Exception):
+    pass
+
+
+class _HashPool:
+    def __init__(self, workers, queue_limit):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-hash')
+        self.slots = threading.BoundedSemaphore(workers + queue_limit)
+        self.lock = threading.Lock()
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self.submitted = 0
+        self.started = 0
+        self.completed = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.cancelled = 0
+        self.hash_seconds = 0.0
+        self.max_hash_seconds = 0.0
+
+    def _run(self, fn, args):
+        with self.lock:
+            self.started += 1
+        t0 = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            elapsed = time.perf_counter() - t0
+            with self.lock:
+                self.completed += 1
+                self.hash_seconds += elapsed
+                self.max_hash_seconds = max(self.max_hash_seconds, elapsed)
+            self.slots.release()
+
+    def run(self, fn, *args):
+        if not self.slots.acquire(blocking=False):
+            with self.lock:
+                self.rejected += 1
+            raise PasswordHashBusy("Too many sign-ins in progress, please try again.")
+        with self.lock:
+            self.submitted += 1
+        future = self.executor.submit(self._run, fn, args)
+        try:
+            return future.result(timeout=HASH_TIMEOUT_S)
+        except FutureTimeout:
+            cancelled = future.cancel()
+            if cancelled:
+                self.slots.release()  # _run never ran, so it won't
+            with self.lock:
+                self.timed_out += 1
+                self.cancelled += cancelled
+            raise PasswordHashBusy("Sign-in is taking too long, please try again.") from None
+
+    def stats(self):
+        with self.lock:
+            return {
+                'workers': self.workers,
+                'queue_limit': self.queue_limit,
+                'queue_depth': self.submitted - self.started - self.cancelled,
+                'in_progress': self.started - self.completed,
+                'completed': self.completed,
+                'rejected': self.rejected,
+                'timed_out': self.timed_out,
+                'hash_seconds_total': self.hash_seconds,
+                'hash_seconds_avg': self.hash_seconds / self.completed if self.completed else 0.0,
+                'hash_seconds_max': self.max_hash_seconds,
+            }
+
+
+_pool = _HashPool(HASH_WORKERS, HASH_QUEUE_LIMIT)
+
+
+def hash_password(password):
+    return _pool.run(generate_password_hash, password, HASH_METHOD, SALT_LENGTH)
+
+
+def verify_password(password_hash, password):
+    return _pool.run(check_password_hash, password_hash, password)
+
+
+def hash_pool_stats():
+    return _pool.stats()
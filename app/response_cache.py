@@ -0,0 +1,114 @@
+import os
+import threading
+from collections import OrderedDict
+from functools import wraps
+from flask import Response, current_app, request
+
+# ------------------ RENDERED PAGE CACHE ------------------
+# Dashboard pages are a pure function of the route, its query string, the
+# symbol's data version and (for predictions) the model version. The
+# rendered body is cached under that key in a bounded LRU, so a reload or
+# a new model version simply stops matching old entries.
+#
+# Concurrent misses on the same key are coalesced (single flight): the first
+# request computes, the rest wait for its result. A burst of N identical
+# requests after a data refresh costs one render, not N. Only 200 responses
+# are stored; errors are shared with the waiters of that one flight and not
+# kept.
+
+RESPONSE_CACHE_SIZE = int(os.environ.get('RESPONSE_CACHE_SIZE', 128))
+RESPONSE_CACHE_ENABLED = os.environ.get('RESPONSE_CACHE', '1') == '1' and RESPONSE_CACHE_SIZE > 0
+FLIGHT_TIMEOUT_S = 30  # waiters compute themselves after this
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class ResponseCache:
+    def __init__(self, max_entries=RESPONSE_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._flights = {}
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.coalesced = self.evictions = 0
+
+    def get_or_compute(self, key, compute, cacheable=lambda result: True):
+        with self._lock:
+            try:
+                result = self._entries[key]
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return result
+            except KeyError:
+                pass
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            if flight.done.wait(FLIGHT_TIMEOUT_S) and flight.error is None:
+                return flight.result
+            return compute()  # the leader failed or is stuck: don't fail with it
+
+        try:
+            flight.result = compute()
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+                if flight.error is None and cacheable(flight.result):
+                    self._entries[key] = flight.result
+                    self._entries.move_to_end(key)
+                    while len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+                        self.evictions += 1
+            flight.done.set()
+        return flight.result
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'coalesced': self.coalesced,
+                    'evictions': self.evictions, 'entries': len(self._entries)}
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+PAGE_CACHE = ResponseCache()
+
+
+def cached_page(version):
+    # Decorator for GET views. version(): hashable identifying the data the
+    # page is rendered from; called before the cache lookup on every request.
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if not RESPONSE_CACHE_ENABLED or request.method != 'GET':
+                return view(*args, **kwargs)
+            key = (request.endpoint, tuple(sorted(request.args.items(multi=True))), version())
+
+            def render():
+                # Body, status and headers only: every request gets a fresh
+                # Response for the after_request hooks to decorate
+                response = current_app.make_response(view(*args, **kwargs))
+                return response.get_data(), response.status_code, list(response.headers.items())
+
+            body, status, headers = PAGE_CACHE.get_or_compute(key, render, lambda result: result[1] == 200)
+            return Response(body, status=status, headers=headers)
+        return wrapper
+    return decorator
+
+
+def response_cache_stats():
+    return PAGE_CACHE.stats()
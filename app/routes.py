@@ -1,10 +1,18 @@
-from flask import Blueprint, render_template, request, jsonify, redirect, url_for, flash, session
+from flask import Blueprint, render_template, request, jsonify, redirect, url_for, flash, session, abort
 import pandas as pd
-import joblib
 import os
 import numpy as np
 import sqlite3
+from werkzeug.exceptions import HTTPException
 from werkzeug.security import generate_password_hash, check_password_hash
+from app.market_data import get_symbol_data, list_symbols, normalize_symbol, UnknownSymbol
+from app.indicators import get_trend_indicators
+from app.volatility import get_volatility
+from app.downsample import DEFAULT_POINTS, MAX_POINTS
+from app.model_registry import ModelNotFound, get_model
+from app.response_cache import cached_page
+from ml.features import FEATURE_NAMES, MAX_LOOKBACK, compute_features, latest_features
+from ml.horizons import HORIZONS, MAX_HORIZON, STRATEGIES, recursive_forecast
 
 # ------------------ AUTH BLUEPRINT ------------------
 auth_routes = Blueprint('auth_routes', __name__)
@@ -44,8 +52,6 @@ def init_db():
     conn.commit()
     conn.close()
 
-init_db()
-
 
 # ------------------ AUTH ROUTES ------------------
 @auth_routes.route('/signup', methods=['GET', 'POST'])
@@ -155,58 +161,158 @@ def logout():
 # ------------------ FINANCE BLUEPRINT ------------------
 finance_routes = Blueprint('finance_routes', __name__)
 
-DATA_PATH = os.path.join('data', 'nifty_50.csv')
-MODEL_PATH = os.path.join('ml', 'models', 'linear_model.pkl')
-SCALER_X_PATH = os.path.join('ml', 'models', 'scaler_X.pkl')
-SCALER_Y_PATH = os.path.join('ml', 'models', 'scaler_y.pkl')
 
 
 # ---- Helper: Feature Engineering ----
 def prepare_features(df):
-    df['Daily_Change'] = df['Close'] - df['Open']
-    df['Percent_Change'] = ((df['Close'] - df['Open']) / df['Open']) * 100
-    df['MA_7'] = df['Close'].rolling(window=7).mean()
-    df['MA_30'] = df['Close'].rolling(window=30).mean()
-    df['Volatility'] = df['Percent_Change'].rolling(window=7).std()
-    df = df.dropna()
-    features = ['Open', 'High', 'Low', 'Daily_Change', 'Percent_Change', 'MA_7', 'MA_30', 'Volatility']
-    return df, features
+    # Full feature frame, see ml/features.py
+    return compute_features(df), FEATURE_NAMES
+
+
+def feature_frame(market):
+    # Materialized once per data version (batch scoring, history-wide stats)
+    return market.memo('features', lambda: compute_features(market.frame))
+
+
+def latest_feature_row(market):
+    # Latest row from a MAX_LOOKBACK tail: O(window), not O(history)
+    X = latest_features(market.frame)
+    if X is None:
+        X = feature_frame(market)[FEATURE_NAMES].to_numpy()[-1:]
+    return X
+
+
+def latest_prediction(market, bundle):
+    # Next-close prediction, cached per data version and model version
+    return market.memo(('prediction', bundle.version),
+                       lambda: float(bundle.predict(latest_feature_row(market))[0]))
+
+
+def horizon_forecast(market, bundle, horizon, strategy='recursive'):
+    # Predicted closes for days 1..horizon (recursive) or just day `horizon`
+    # (direct). Both are cached per data version and model version: the
+    # recursive path is rolled out once to MAX_HORIZON and sliced, so every
+    # horizon costs the same as the longest one, once.
+    if horizon == 1:
+        return [latest_prediction(market, bundle)]
+    if strategy == 'recursive':
+        path = market.memo(('recursive', bundle.version), lambda: recursive_forecast(
+            market.frame.iloc[-MAX_LOOKBACK:], bundle.predict, MAX_HORIZON).tolist())
+        return path[:horizon]
+    if horizon not in bundle.direct:
+        raise ModelNotFound(f"No {horizon}-day direct model in this model version. Retrain it first.")
+    direct = market.memo(('direct', bundle.version), lambda: {
+        h: float(bundle.predict_direct(latest_feature_row(market), h)[0]) for h in bundle.direct})
+    return [direct[horizon]]
+
+
+def requested_horizon(data=None):
+    # (horizon, strategy) from the JSON body or the query string
+    data = data or {}
+    try:
+        horizon = int(data.get('horizon') or request.args.get('horizon') or 1)
+    except (TypeError, ValueError):
+        horizon = None
+    strategy = data.get('strategy') or request.args.get('strategy') or 'recursive'
+    if horizon not in HORIZONS:
+        abort(400, f"horizon must be one of {', '.join(map(str, HORIZONS))}.")
+    if strategy not in STRATEGIES:
+        abort(400, f"strategy must be one of {', '.join(STRATEGIES)}.")
+    return horizon, strategy
+
+
+def daily_return_std(market):
+    # History-wide statistic: computed once per data version
+    return market.memo('daily_return_std', lambda: round(
+        (feature_frame(market)['Close'].pct_change().fillna(0) * 100).std(), 2))
+
+
+# ---- Helper: Page Cache Keys (app/response_cache.py) ----
+def data_version():
+    market = get_symbol_data(requested_symbol())
+    return market.path, market.version
+
+
+def prediction_version():
+    symbol = requested_symbol()
+    try:
+        model_version = get_model(symbol).version
+    except ModelNotFound:
+        model_version = None  # the page is an error and is not cached
+    return data_version() + (model_version,)
+
+
+# ---- Helper: Symbol Selection ----
+def requested_symbol(data=None):
+    # ?symbol= on every page; JSON APIs may also send "symbol" (or the
+    # predict form's "ticker") in the body
+    data = data or {}
+    return normalize_symbol(data.get('symbol') or data.get('ticker') or request.args.get('symbol'))
+
+
+def _parse_date(value):
+    try:
+        return pd.to_datetime(value, format='%d-%m-%Y')
+    except (ValueError, TypeError):
+        return pd.to_datetime(value)
+
+
+def chart_view():
+    # ?points=N (0 = every row) and ?start=/&end= dates select what charts receive
+    points = min(max(request.args.get('points', DEFAULT_POINTS, type=int), 0), MAX_POINTS)
+    try:
+        start = _parse_date(request.args['start']) if request.args.get('start') else None
+        end = _parse_date(request.args['end']) if request.args.get('end') else None
+    except (ValueError, TypeError):
+        abort(400, "Dates must be dd-mm-YYYY or YYYY-MM-DD.")
+    return {'points': points, 'start': start, 'end': end}
+
+
+def view_args(view):
+    # Echoed back to templates for the zoom form
+    return {
+        'points': view['points'],
+        'start': view['start'].strftime('%Y-%m-%d') if view['start'] is not None else '',
+        'end': view['end'].strftime('%Y-%m-%d') if view['end'] is not None else '',
+    }
+
+
+@finance_routes.errorhandler(UnknownSymbol)
+def unknown_symbol(e):
+    if request.is_json:
+        return jsonify({'error': str(e)}), 404
+    return str(e), 404
 
 
 # ---- Home Dashboard ----
 @finance_routes.route('/')
 def home():
-    df = pd.read_csv(DATA_PATH)
-    dates = df['Date'].astype(str).tolist()
-    prices = df['Close'].tolist()
-    return render_template('dashboard.html', dates=dates, prices=prices)
+    # Chart data is fetched by static/js/charts.js from /api/prices
+    symbol = requested_symbol()
+    view = chart_view()
+    get_symbol_data(symbol)  # 404 early for unknown symbols
+    return render_template('dashboard.html', symbol=symbol, symbols=list_symbols(),
+                           view=view_args(view))
 
 
 # ---- Predict Dashboard ----
 @finance_routes.route('/predict-dashboard')
+@cached_page(prediction_version)
 def predict_dashboard():
+    symbol = requested_symbol()
+    horizon, strategy = requested_horizon()
+    market = get_symbol_data(symbol)
     try:
-        try:
-            df = pd.read_csv(DATA_PATH, encoding='utf-8-sig')
-        except UnicodeDecodeError:
-            df = pd.read_csv(DATA_PATH, encoding='ISO-8859-1')
-
-        df, features = prepare_features(df)
-        closes = df['Close'].dropna().values
+        closes = market.column('Close')
         last_30 = closes[-30:].tolist()
 
-        if not (os.path.exists(MODEL_PATH) and os.path.exists(SCALER_X_PATH) and os.path.exists(SCALER_Y_PATH)):
-            return "Model or scalers not found. Train it first.", 400
-
-        model = joblib.load(MODEL_PATH)
-        scaler_X = joblib.load(SCALER_X_PATH)
-        scaler_y = joblib.load(SCALER_Y_PATH)
-
-        X_latest = df[features].iloc[-1].values.reshape(1, -1)
-        X_latest_scaled = scaler_X.transform(X_latest)
-        pred_scaled = model.predict(X_latest_scaled)
-        prediction = scaler_y.inverse_transform(pred_scaled.reshape(-1, 1))[0][0]
-
+        try:
+            bundle = get_model(symbol)
+            if horizon not in bundle.direct:
+                strategy = 'recursive'  # model versions without direct models (the shipped one)
+            prediction = horizon_forecast(market, bundle, horizon, strategy)[-1]
+        except ModelNotFound as e:
+            return str(e), 400
         recent = closes[-7:]
         trend = "Rising" if recent[-1] > recent[0] else "Falling"
         volatility = round(np.std(recent) / np.mean(recent) * 100, 2)
@@ -225,7 +331,12 @@ def predict_dashboard():
             suggestion=suggestion,
             trend=trend,
             volatility=volatility,
-            last_30_days=last_30
+            last_30_days=last_30,
+            symbol=symbol,
+            symbols=list_symbols(),
+            horizon=horizon,
+            strategy=strategy,
+            direct_horizons=sorted(bundle.direct)
         )
 
     except Exception as e:
@@ -234,76 +345,32 @@ def predict_dashboard():
 
 # ---- Volatility Dashboard ----
 @finance_routes.route('/volatility-dashboard')
+@cached_page(data_version)
 def volatility_dashboard():
-    df = pd.read_csv(DATA_PATH)
-    daily_changes = df['Close'].pct_change()
-    volatility = daily_changes.std() * 100
-    spikes = daily_changes[daily_changes.abs() > 0.05].count()
+    # Chart data is fetched by static/js/charts.js from /api/volatility
+    symbol = requested_symbol()
+    view = chart_view()
+    summary = get_volatility(get_symbol_data(symbol))['summary']
     return render_template(
         'volatility_dashboard.html',
-        volatility=round(volatility, 2),
-        spikes=spikes,
-        dates=df['Date'].astype(str).tolist(),
-        prices=df['Close'].tolist(),
-        daily_changes=daily_changes.fillna(0).tolist()
+        volatility=summary['volatility'],
+        spikes=summary['spikes'],
+        analytics=summary,
+        symbol=symbol,
+        view=view_args(view)
     )
 
 
 # ---- Trend Dashboard ----
 @finance_routes.route('/trend-dashboard')
+@cached_page(data_version)
 def trend_dashboard():
-    df = pd.read_csv(DATA_PATH)
-    df['20_MA'] = df['Close'].rolling(window=20).mean()
-    df['50_MA'] = df['Close'].rolling(window=50).mean()
-    df['200_MA'] = df['Close'].rolling(window=200).mean()
-
-    df['Daily_Return'] = df['Close'].pct_change() * 100
-    df['Monthly_Return'] = df['Close'].pct_change(30) * 100
-    df['Drawdown'] = ((df['Close'].cummax() - df['Close']) / df['Close'].cummax()) * 100
-
-    if 'Volume' not in df.columns:
-        df['Volume'] = 0
-    volume = df['Volume'].fillna(0)
-
-    delta = df['Close'].diff()
-    up = delta.clip(lower=0)
-    down = -1 * delta.clip(upper=0)
-    roll_up = up.rolling(14).mean()
-    roll_down = down.rolling(14).mean()
-    df['RSI'] = 100 - (100 / (1 + roll_up / roll_down))
-
-    ema12 = df['Close'].ewm(span=12, adjust=False).mean()
-    ema26 = df['Close'].ewm(span=26, adjust=False).mean()
-    df['MACD'] = ema12 - ema26
-
-    df['BB_Mid'] = df['Close'].rolling(20).mean()
-    df['BB_Std'] = df['Close'].rolling(20).std()
-    df['BB_Upper'] = df['BB_Mid'] + 2 * df['BB_Std']
-    df['BB_Lower'] = df['BB_Mid'] - 2 * df['BB_Std']
-
-    trend_pct = ((df['Close'].iloc[-1] / df['Close'].iloc[0]) - 1) * 100
-    highest_vol = df['Daily_Return'].abs().max()
-    support_level = df['Close'].min()
-
-    return render_template(
-        'trend_dashboard.html',
-        dates=df['Date'].astype(str).tolist(),
-        prices=df['Close'].tolist(),
-        ma20=df['20_MA'].fillna(0).tolist(),
-        ma50=df['50_MA'].fillna(0).tolist(),
-        ma200=df['200_MA'].fillna(0).tolist(),
-        bb_upper=df['BB_Upper'].fillna(0).tolist(),
-        bb_lower=df['BB_Lower'].fillna(0).tolist(),
-        daily_return=df['Daily_Return'].fillna(0).tolist(),
-        monthly_return=df['Monthly_Return'].fillna(0).tolist(),
-        drawdown=df['Drawdown'].fillna(0).tolist(),
-        volume=volume.tolist(),
-        rsi=df['RSI'].fillna(0).tolist(),
-        macd=df['MACD'].fillna(0).tolist(),
-        trend_pct=round(trend_pct, 2),
-        highest_vol=round(highest_vol, 2),
-        support_level=round(support_level, 2)
-    )
+    # Chart data is fetched by static/js/charts.js from /api/indicators
+    symbol = requested_symbol()
+    view = chart_view()
+    context = get_trend_indicators(get_symbol_data(symbol))
+    kpis = {key: context[key] for key in ('trend_pct', 'highest_vol', 'support_level')}
+    return render_template('trend_dashboard.html', symbol=symbol, view=view_args(view), **kpis)
 
 
 # ---- Predict Next Close Price API ----
@@ -312,26 +379,23 @@ def predict_next():
     try:
         data = request.get_json()
         risk = data.get('risk', 'Medium')
+        symbol = requested_symbol(data)
+        horizon, strategy = requested_horizon(data)
 
-        df = pd.read_csv(DATA_PATH)
-        df, features = prepare_features(df)
-        last_prices = df['Close'].tail(30).tolist()
+        market = get_symbol_data(symbol)
+        closes = market.column('Close')
+        last_prices = closes[-30:].tolist()
 
-        if not (os.path.exists(MODEL_PATH) and os.path.exists(SCALER_X_PATH) and os.path.exists(SCALER_Y_PATH)):
-            return jsonify({'error': 'Model or scalers not found. Train it first.'}), 400
-
-        model = joblib.load(MODEL_PATH)
-        scaler_X = joblib.load(SCALER_X_PATH)
-        scaler_y = joblib.load(SCALER_Y_PATH)
+        try:
+            bundle = get_model(symbol)
+            forecast = horizon_forecast(market, bundle, horizon, strategy)
+        except ModelNotFound as e:
+            return jsonify({'error': str(e)}), 400
 
-        X_latest = df[features].iloc[-1].values.reshape(1, -1)
-        X_latest_scaled = scaler_X.transform(X_latest)
-        pred_scaled = model.predict(X_latest_scaled)
-        prediction = scaler_y.inverse_transform(pred_scaled.reshape(-1, 1))[0][0]
+        prediction = forecast[-1]
 
-        daily_return = df['Close'].pct_change().fillna(0) * 100
-        trend = "Rising" if df['Close'].iloc[-1] > df['Close'].iloc[-6] else "Falling"
-        volatility = round(daily_return.std(), 2)
+        trend = "Rising" if closes[-1] > closes[-6] else "Falling"
+        volatility = daily_return_std(market)
 
         if risk == "Low":
             suggestion = f"{trend} trend with volatility {volatility}%. Low-risk: hold or small investment."
@@ -340,17 +404,115 @@ def predict_next():
         else:
             suggestion = f"{trend} trend with volatility {volatility}%. High-risk: aggressive investment."
 
-        return jsonify({
+        result = {
             'prediction': round(float(prediction), 2),
             'suggestion': suggestion,
             'trend': trend,
             'volatility': volatility,
-            'last_30_days': last_prices
-        })
+            'last_30_days': last_prices,
+            'symbol': symbol
+        }
+        if horizon > 1:
+            # prediction is the close `horizon` trading days out
+            result['horizon'] = horizon
+            result['strategy'] = strategy
+            steps = range(1, horizon + 1) if len(forecast) > 1 else [horizon]
+            result['forecast'] = [{'step': step, 'close': round(close, 2)} for step, close in zip(steps, forecast)]
+        return jsonify(result)
+
+    except HTTPException as e:
+        return jsonify({'error': e.description}), e.code
+    except UnknownSymbol as e:
+        return jsonify({'error': str(e)}), 404
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+# ---- Batch Prediction API ----
+def batch_query(data):
+    # Parses the dates of a /predict-batch body once, up front. Raises
+    # ValueError for a malformed body.
+    dates = data.get('dates') or []
+    if not isinstance(dates, list):
+        raise ValueError("'dates' must be a list.")
 
+    def parse(value):
+        try:
+            return _parse_date(value)
+        except (ValueError, TypeError):
+            raise ValueError(f"Bad date {value!r}: dates must be dd-mm-YYYY or YYYY-MM-DD.") from None
+
+    return {
+        'dates': [(d, parse(d)) for d in dates],
+        'start': parse(data['start']) if data.get('start') else None,
+        'end': parse(data['end']) if data.get('end') else None,
+    }
+
+
+def batch_predictions(symbol, query):
+    market = get_symbol_data(symbol)
+    df, features = feature_frame(market), FEATURE_NAMES
+    timestamps = market.timestamps[df.index]
+
+    if query['dates']:
+        mask = timestamps.isin([parsed for _, parsed in query['dates']])
+    else:
+        mask = pd.Series(True, index=df.index)
+        if query['start'] is not None:
+            mask &= timestamps >= query['start']
+        if query['end'] is not None:
+            mask &= timestamps <= query['end']
+
+    bundle = get_model(symbol)
+    rows = df[mask.to_numpy()]
+    predictions = bundle.predict(rows[features].values) if len(rows) else []
+    found = set(timestamps[mask.to_numpy()])
+
+    return {
+        'symbol': symbol,
+        'count': len(rows),
+        'predictions': [
+            {'date': date, 'close': close, 'prediction': round(float(pred), 2)}
+            for date, close, pred in zip(rows['Date'].astype(str), rows['Close'], predictions)
+        ],
+        'missing': [d for d, parsed in query['dates'] if parsed not in found]
+    }
+
+
+@finance_routes.route('/predict-batch', methods=['POST'])
+def predict_batch():
+    # Body: {"dates": ["01-07-2021", ...]} or {"start": "...", "end": "..."},
+    # optionally with "symbols": [...] (one stacked pass per symbol).
+    # Each prediction is the next close forecast made from that date's row.
+    try:
+        data = request.get_json(silent=True) or {}
+        if not (data.get('dates') or data.get('start') or data.get('end')):
+            return jsonify({'error': "Provide 'dates' or a 'start'/'end' range."}), 400
+        try:
+            query = batch_query(data)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        if data.get('symbols'):
+            results = {}
+            for symbol in data['symbols']:
+                symbol = normalize_symbol(symbol)
+                try:
+                    results[symbol] = batch_predictions(symbol, query)
+                except (UnknownSymbol, ModelNotFound) as e:
+                    results[symbol] = {'symbol': symbol, 'error': str(e)}
+            return jsonify({'results': results})
+
+        return jsonify(batch_predictions(requested_symbol(data), query))
+
+    except ModelNotFound as e:
+        return jsonify({'error': str(e)}), 400
+    except UnknownSymbol as e:
+        return jsonify({'error': str(e)}), 404
     except Exception as e:
         return jsonify({'error': str(e)}), 500
-    
+
+
 @finance_routes.route('/help_desk')
 def help_desk():
     return render_template('help_desk.html')
@@ -0,0 +1,213 @@
+import argparse
+import logging
+import os
+import threading
+import time
+import pandas as pd
+from app.indicators import get_trend_indicators
+from app.market_data import (DEFAULT_SYMBOL, get_market_data, is_current, list_symbols, normalize_symbol,
+                             refresh_market_data, resident_paths, resolve_symbol)
+from app.model_registry import ModelNotFound, get_model
+from app.routes import daily_return_std, latest_prediction
+from ml.artifacts import read_manifest
+from ml.columnar_store import ingest, read_meta, store_path
+from ml.symbols import model_dir
+from ml.train_model import MODEL_FILE, data_signature, train_symbol
+
+# ------------------ BACKGROUND REFRESH ------------------
+# Every SCHEDULER_INTERVAL_S seconds, for each symbol:
+#   1. ingest new bars dropped into data/incoming/<SYMBOL>.csv (appended to
+#      the source CSV, columnar store rebuilt),
+#   2. retrain when the model was fitted on older data (new version published
+#      through ml/artifacts.py, so readers never see a half-written model),
+#   3. warm the indicator, feature and prediction caches of the new data
+#      version before it replaces the old one (market_data.refresh_market_data).
+#
+# In-process: set SCHEDULER_ENABLED=1 and create_app() starts it on a daemon
+# thread. As a separate worker: `python -m app.scheduler` does 1 and 2; each
+# app process then reloads lazily, so warm-up only happens in-process.
+
+SCHEDULER_ENABLED = os.environ.get('SCHEDULER_ENABLED') == '1'
+SCHEDULER_INTERVAL_S = float(os.environ.get('SCHEDULER_INTERVAL_S', 300))
+INCOMING_DIR = os.path.join('data', 'incoming')
+
+logger = logging.getLogger(__name__)
+
+
+def incoming_path(symbol):
+    return os.path.join(INCOMING_DIR, f'{normalize_symbol(symbol)}.csv')
+
+
+def _new_bars(incoming, source):
+    # Rows of `incoming` dated after the last row of `source`, formatted like it
+    header = pd.read_csv(source, nrows=0, encoding='utf-8-sig').columns
+    last_date = pd.to_datetime(pd.read_csv(source, usecols=['Date'], encoding='utf-8-sig')['Date'],
+                               format='%d-%m-%Y', errors='coerce').max()
+
+    bars = pd.read_csv(incoming, encoding='utf-8-sig')
+    bars = bars.loc[:, ~bars.columns.str.contains('^Unnamed')]
+    # dd-mm-YYYY like the sources, or ISO dates from feeds
+    dates = pd.to_datetime(bars['Date'], format='%d-%m-%Y', errors='coerce')
+    dates = dates.fillna(pd.to_datetime(bars['Date'], format='ISO8601', errors='coerce'))
+    keep = dates.notna() & (dates > last_date if pd.notna(last_date) else True)
+    bars = bars[keep].assign(Date=dates[keep]).sort_values('Date').drop_duplicates('Date', keep='last')
+    bars['Date'] = bars['Date'].dt.strftime('%d-%m-%Y')
+    # Source-only columns (e.g. nifty_50.csv's trailing empty ones) stay blank
+    return bars.reindex(columns=header)
+
+
+def incoming_update(symbol, source):
+    # Returns the function that merges pending bars into `source`, or None
+    incoming = incoming_path(symbol)
+    if not os.path.exists(incoming):
+        return None
+    if not source.lower().endswith('.csv'):
+        logger.warning("Ignoring %s: %s is not a CSV source", incoming, source)
+        return None
+
+    def update():
+        bars = _new_bars(incoming, source)
+        if len(bars):
+            tmp_path = f"{source}.tmp-{os.getpid()}"
+            with open(source, 'rb') as src, open(tmp_path, 'wb') as dst:
+                data = src.read()
+                dst.write(data if data.endswith(b'\n') or not data else data + b'\n')
+            bars.to_csv(tmp_path, mode='a', header=False, index=False)
+            os.replace(tmp_path, source)
+            if read_meta(store_path(source)) is not None:
+                ingest(source)
+        os.remove(incoming)
+        logger.info("%s: %d new bars from %s", symbol, len(bars), incoming)
+
+    return update
+
+
+def model_stale(symbol, source):
+    # Fitted on different data than `source` holds now. Symbols without any
+    # model are left alone, except the default one.
+    directory = model_dir(symbol)
+    manifest = read_manifest(directory)
+    if manifest is None:
+        return symbol == DEFAULT_SYMBOL or os.path.exists(os.path.join(directory, MODEL_FILE))
+    return manifest.get('data_signature') != data_signature(source)
+
+
+def warm(symbol, market):
+    get_trend_indicators(market)
+    daily_return_std(market)
+    try:
+        latest_prediction(market, get_model(symbol))
+    except ModelNotFound:
+        pass
+
+
+def refresh_symbol(symbol, warm_up=True):
+    symbol = normalize_symbol(symbol)
+    source = resolve_symbol(symbol)
+    update = incoming_update(symbol, source)
+    # Only symbols somebody is looking at are worth loading into memory
+    warm_up = warm_up and (symbol == DEFAULT_SYMBOL or source in resident_paths())
+
+    if update is None and (not warm_up or is_current(source)):
+        if not model_stale(symbol, source):
+            return None
+        train_symbol(symbol)
+        if warm_up:
+            warm(symbol, get_market_data(source))
+        return 'retrained'
+
+    def prepare(market):
+        if model_stale(symbol, source):
+            train_symbol(symbol)
+        if warm_up:
+            warm(symbol, market)
+
+    if warm_up:
+        refresh_market_data(source, update, prepare)
+    else:
+        # Worker mode: nothing to warm here, the app reloads on its next request
+        if update is not None:
+            update()
+        if model_stale(symbol, source):
+            train_symbol(symbol)
+    return 'refreshed'
+
+
+class Scheduler:
+    def __init__(self, interval=SCHEDULER_INTERVAL_S, symbols=None, warm_up=True):
+        self.interval = interval
+        self.symbols = symbols
+        self.warm_up = warm_up
+        self.runs = 0
+        self.errors = 0
+        self.last_run = None
+        self.last_results = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def run_once(self):
+        results = {}
+        for symbol in self.symbols or list_symbols():
+            try:
+                results[symbol] = refresh_symbol(symbol, self.warm_up)
+            except Exception as e:
+                # One bad file must not stop the other symbols or the loop
+                self.errors += 1
+                results[symbol] = f'error: {e}'
+                logger.exception("Refreshing %s failed", symbol)
+        self.runs += 1
+        self.last_run = time.time()
+        self.last_results = results
+        return results
+
+    def _loop(self):
+        while not self._stop.is_set():
+            self.run_once()
+            self._stop.wait(self.interval)
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name='scheduler', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def stats(self):
+        return {'runs': self.runs, 'errors': self.errors, 'last_run': self.last_run,
+                'last_results': dict(self.last_results), 'interval_s': self.interval}
+
+
+_scheduler = None
+
+
+def start_scheduler(interval=SCHEDULER_INTERVAL_S):
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = Scheduler(interval)
+    return _scheduler.start()
+
+
+def scheduler_stats():
+    return _scheduler.stats() if _scheduler is not None else None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ingest new bars and retrain stale models")
+    parser.add_argument('symbols', nargs='*', help="Symbols to refresh (default: all)")
+    parser.add_argument('--once', action='store_true', help="Run one pass and exit")
+    parser.add_argument('--interval', type=float, default=SCHEDULER_INTERVAL_S)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+
+    scheduler = Scheduler(args.interval, [normalize_symbol(s) for s in args.symbols] or None, warm_up=False)
+    while True:
+        for symbol, result in scheduler.run_once().items():
+            print(f"{symbol}: {result or 'up to date'}")
+        if args.once:
+            break
+        time.sleep(args.interval)
@@ -0,0 +1,181 @@
+import numpy as np
+from ml.stages import stage
+
+# ------------------ SIMILAR PAST PERIODS ------------------
+# Finds the historical windows whose closes look most like the latest
+# `window` days, under z-normalized Euclidean distance, and reports what the
+# price did in the `ahead` days after each match.
+#
+# The distance profile over every start position comes from one FFT
+# convolution (MASS, Mueen's algorithm): per data version and window length
+# the rolling mean/std and the FFT of the history are computed once (the
+# index), so a query costs one FFT of the query plus one inverse FFT,
+# O(n log n) in NumPy instead of an O(n * window) scan. With dtw=True the
+# best DTW_CANDIDATES windows are re-ranked by banded dynamic time warping,
+# vectorized across candidates.
+
+DEFAULT_WINDOW = 30
+DEFAULT_K = 5
+DEFAULT_AHEAD = 20
+MAX_K = 20
+MAX_WINDOW = 250
+DTW_CANDIDATES = 50
+DTW_BAND = 0.1  # Sakoe-Chiba band, fraction of the window
+
+
+class WindowIndex:
+    # Everything about one series that does not depend on the query
+
+    def __init__(self, values, window):
+        values = np.asarray(values, dtype=float)
+        n = len(values)
+        self.values = values
+        self.window = window
+        self.nfft = 1 << int(np.ceil(np.log2(max(n + window, 2))))
+        self.spectrum = np.fft.rfft(values, self.nfft)
+
+        csum = np.concatenate(([0.0], np.cumsum(values)))
+        csum2 = np.concatenate(([0.0], np.cumsum(values ** 2)))
+        self.mean = (csum[window:] - csum[:-window]) / window
+        var = (csum2[window:] - csum2[:-window]) / window - self.mean ** 2
+        self.std = np.sqrt(np.clip(var, 0, None))
+
+    def __len__(self):
+        return len(self.mean)  # number of window start positions
+
+    def distance_profile(self, query):
+        # z-normalized Euclidean distance from query to every window
+        m = self.window
+        q_std = query.std()
+        if not q_std > 0:
+            return np.full(len(self), np.inf)  # a flat query has no shape to match
+        sliding = np.fft.irfft(self.spectrum * np.fft.rfft(query[::-1], self.nfft), self.nfft)
+        dot = sliding[m - 1:m - 1 + len(self)]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            corr = (dot - m * query.mean() * self.mean) / (m * q_std * self.std)
+        dist = np.sqrt(np.clip(2 * m * (1 - corr), 0, None))
+        dist[~np.isfinite(dist)] = np.inf  # flat windows
+        return dist
+
+
+def get_window_index(market, window):
+    # Cached per data version and window length
+    def compute():
+        with stage('similarity_index'):
+            return WindowIndex(market.column('Close'), window)
+    return market.memo(('window_index', window), compute)
+
+
+def znorm(x):
+    x = np.asarray(x, dtype=float)
+    std = x.std(axis=-1, keepdims=True)
+    return (x - x.mean(axis=-1, keepdims=True)) / np.where(std > 0, std, 1)
+
+
+def dtw_distances(query, candidates, band=DTW_BAND):
+    # Banded DTW between one query and many candidate windows (rows), all
+    # z-normalized. The DP runs over the window; each cell is a vector op
+    # across candidates.
+    m = len(query)
+    r = max(1, int(round(band * m)))
+    cost = (candidates[:, None, :] - query[None, :, None]) ** 2  # [c, i, j]
+    inf = np.full(len(candidates), np.inf)
+    previous = [inf] * (m + 1)
+    previous[0] = np.zeros(len(candidates))
+    for i in range(1, m + 1):
+        current = [inf] * (m + 1)
+        for j in range(max(1, i - r), min(m, i + r) + 1):
+            best = np.minimum(np.minimum(previous[j], current[j - 1]), previous[j - 1])
+            current[j] = cost[:, i - 1, j - 1] + best
+        previous = current
+    return np.sqrt(previous[m])
+
+
+def _pick(order, k, exclusion):
+    # Best k starts, skipping any within `exclusion` of an earlier pick
+    chosen = []
+    for start in order:
+        if all(abs(start - other) >= exclusion for other in chosen):
+            chosen.append(int(start))
+            if len(chosen) == k:
+                break
+    return chosen
+
+
+def find_similar(query, index, k=DEFAULT_K, ahead=DEFAULT_AHEAD, exclude_from=None, dtw=False):
+    # Returns [(start, distance)] of the k best windows in `index` that have
+    # `ahead` days after them and do not overlap positions >= exclude_from
+    m = index.window
+    dist = index.distance_profile(query)
+    last = len(index.values) - m - ahead  # last start with a full outcome
+    if exclude_from is not None:
+        last = min(last, exclude_from - m)
+    if last < 0:
+        return []
+    dist = dist[:last + 1]
+
+    if not dtw:
+        limit = min(len(dist), k * m)  # k picks never need more than k*m candidates
+        order = np.argpartition(dist, limit - 1)[:limit] if limit < len(dist) else np.arange(len(dist))
+        order = order[np.argsort(dist[order], kind='stable')]
+        order = order[np.isfinite(dist[order])]
+        return [(start, float(dist[start])) for start in _pick(order, k, m // 2)]
+
+    order = np.argsort(dist, kind='stable')
+    order = order[np.isfinite(dist[order])]
+    candidates = _pick(order, DTW_CANDIDATES, m // 2)
+    if not candidates:
+        return []
+    windows = np.lib.stride_tricks.sliding_window_view(index.values, m)[candidates]
+    scores = dtw_distances(znorm(query), znorm(windows))
+    ranked = np.argsort(scores, kind='stable')[:k]
+    return [(candidates[i], float(scores[i])) for i in ranked]
+
+
+def similar_periods(market, targets=None, window=DEFAULT_WINDOW, k=DEFAULT_K, ahead=DEFAULT_AHEAD, dtw=False):
+    # market: whose latest `window` closes are the query. targets: {symbol:
+    # MarketData} histories to search (default: the market itself).
+    closes = market.column('Close')
+    if len(closes) < window:
+        return {'window': window, 'ahead': ahead, 'metric': 'dtw' if dtw else 'euclidean', 'matches': []}
+    query = closes[-window:].astype(float)
+    targets = targets or {None: market}
+
+    matches = []
+    with stage('similarity'):
+        for symbol, target in targets.items():
+            index = get_window_index(target, window)
+            exclude_from = len(closes) - window if target is market else None
+            values = index.values
+            dates = target.frame['Date'].astype(str).to_numpy()
+            for start, distance in find_similar(query, index, k, ahead, exclude_from, dtw):
+                end = start + window - 1
+                base = values[end]
+                path = (values[end + 1:end + 1 + ahead] / base - 1) * 100
+                match = {
+                    'start': dates[start],
+                    'end': dates[end],
+                    'distance': round(distance, 4),
+                    'closes': values[start:end + 1].tolist(),
+                    'next_closes': values[end + 1:end + 1 + ahead].tolist(),
+                    'next_return_pct': round(float(path[-1]), 2),
+                    'next_path_pct': np.round(path, 2).tolist(),
+                }
+                if symbol is not None:
+                    match['symbol'] = symbol
+                matches.append(match)
+
+    matches.sort(key=lambda match: match['distance'])
+    matches = matches[:k]
+    outcomes = np.array([match['next_return_pct'] for match in matches])
+    return {
+        'window': window,
+        'ahead': ahead,
+        'metric': 'dtw' if dtw else 'euclidean',
+        'matches': matches,
+        'summary': {
+            'mean_return_pct': round(float(outcomes.mean()), 2) if len(outcomes) else None,
+            'median_return_pct': round(float(np.median(outcomes)), 2) if len(outcomes) else None,
+            'up_fraction': round(float((outcomes > 0).mean()), 2) if len(outcomes) else None,
+        },
+    }
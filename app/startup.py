@@ -0,0 +1,85 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# ------------------ STARTUP REPORT ------------------
+# What a fresh worker pays before it can serve: per-import times from
+# `python -X importtime`, grouped by top-level package, then create_app() and
+# the time to the first response. Runs in a clean subprocess so nothing is
+# already imported.
+#   python -m app.startup [--module app.app|app.wsgi] [--top 15] [--request /predict-dashboard]
+
+PROBE = """
+import json, resource, sys, time
+t0 = time.perf_counter()
+import {module} as target
+t1 = time.perf_counter()
+app = target.app if hasattr(target, 'app') else target.create_app()
+t2 = time.perf_counter()
+status = None
+if {request!r}:
+    response = app.test_client().get({request!r})
+    status = response.status_code
+t3 = time.perf_counter()
+print(json.dumps({{'import_s': t1 - t0, 'create_app_s': t2 - t1, 'first_request_s': t3 - t2, 'status': status,
+                  'max_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+                  'modules': len(sys.modules)}}))
+"""
+
+
+def parse_importtime(stderr):
+    # [(module, self_us, cumulative_us, depth)] from -X importtime output
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return rows
+
+
+def startup_report(module='app.app', request=None):
+    code = PROBE.format(module=module, request=request)
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=PROJECT_ROOT,
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    summary = json.loads(result.stdout.strip().splitlines()[-1])
+    rows = parse_importtime(result.stderr)
+
+    packages = defaultdict(int)
+    for name, self_us, _, _ in rows:
+        packages[name.split('.')[0]] += self_us
+    summary['packages'] = sorted(packages.items(), key=lambda item: -item[1])
+    summary['imports'] = rows
+    return summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Report import and first-request time of a fresh process")
+    parser.add_argument('--module', default='app.app')
+    parser.add_argument('--top', type=int, default=15)
+    parser.add_argument('--request', default=None, help="path to GET once after import, e.g. /")
+    args = parser.parse_args()
+
+    report = startup_report(args.module, args.request)
+    print(f"import {args.module}: {report['import_s'] * 1000:.0f} ms, "
+          f"{report['modules']} modules, peak RSS {report['max_rss_mb']:.0f} MB")
+    print(f"create_app(): {report['create_app_s'] * 1000:.0f} ms")
+    if args.request:
+        print(f"first GET {args.request}: {report['first_request_s'] * 1000:.0f} ms (status {report['status']})")
+
+    print(f"\nBy package (self time, top {args.top}):")
+    for package, us in report['packages'][:args.top]:
+        print(f"  {package:<28}{us / 1000:>9.1f} ms")
+
+    print(f"\nSlowest first-party and direct imports (cumulative, top {args.top}):")
+    direct = [row for row in report['imports'] if row[3] <= 1 or row[0].split('.')[0] in ('app', 'ml')]
+    for name, _, cumulative_us, _ in sorted(direct, key=lambda row: -row[2])[:args.top]:
+        print(f"  {name:<40}{cumulative_us / 1000:>9.1f} ms")
@@ -1,15 +1,80 @@
 let mainChartInstance = null;
 let predictChartInstance = null;
 
-(function initMainDashboardChart() {
+// Chart data comes from the JSON API. The page's own query string
+// (symbol, points, start, end) is forwarded, and the browser revalidates
+// with the ETag so repeat visits cost a 304.
+async function fetchChartData(path) {
+  const res = await fetch(path + window.location.search, {
+    headers: { Accept: 'application/json' },
+  });
+  if (!res.ok) throw new Error(`${path} returned ${res.status}`);
+  return res.json();
+}
+
+// Live bars over Server-Sent Events (/stream/events), only for symbols a
+// feed is pushing to (/stream/symbols). Live bars are intraday: they go to
+// a separate chart, labelled with the feed's timeframe, created on the
+// first bar and never merged into the daily charts. The oldest point is
+// dropped past LIVE_MAX_POINTS.
+const LIVE_MAX_POINTS = 5000;
+
+async function subscribeLiveBars(symbol, onBar) {
+  if (!window.EventSource || !symbol) return null;
   try {
+    const res = await fetch('/stream/symbols', { headers: { Accept: 'application/json' } });
+    if (!res.ok) return null;
+    const { symbols } = await res.json();
+    if (!symbols.includes(symbol)) return null;
+  } catch (err) {
+    return null;
+  }
+  const source = new EventSource('/stream/events?symbol=' + encodeURIComponent(symbol));
+  source.addEventListener('bar', (e) => onBar(JSON.parse(e.data)));
+  return source;
+}
 
-    if (typeof dates === 'undefined' || typeof prices === 'undefined') return;
+// Chart under `anchor` for one live feed; datasets: [[label, color], ...]
+function liveChart(anchor, bar, datasets) {
+  const canvas = document.createElement('canvas');
+  anchor.insertAdjacentElement('afterend', canvas);
+  return new Chart(canvas, {
+    type: 'line',
+    data: {
+      labels: [],
+      datasets: datasets.map(([label, color]) => ({
+        label: `Live ${bar.timeframe} ${label}`,
+        data: [],
+        borderColor: color,
+        borderWidth: 1,
+        pointRadius: 0,
+        fill: false,
+        spanGaps: false,
+      })),
+    },
+  });
+}
 
+function appendPoint(chart, label, values) {
+  chart.data.labels.push(label);
+  chart.data.datasets.forEach((dataset, i) => dataset.data.push(values[i]));
+  if (chart.data.labels.length > LIVE_MAX_POINTS) {
+    chart.data.labels.shift();
+    chart.data.datasets.forEach((dataset) => dataset.data.shift());
+  }
+  chart.update('none');
+}
+
+// 1. Main Dashboard Chart
+
+(async function initMainDashboardChart() {
+  try {
     const canvas = document.getElementById('stockChart');
     if (!canvas) return;
     const ctx = canvas.getContext('2d');
 
+    const { symbol, dates, prices } = await fetchChartData('/api/prices');
+
     if (mainChartInstance) mainChartInstance.destroy();
 
     mainChartInstance = new Chart(ctx, {
@@ -18,27 +83,28 @@ let predictChartInstance = null;
         labels: dates,
         datasets: [
           {
-            label: 'Close Price',
+            label: `${symbol} Prices`,
             data: prices,
-            borderColor: '#3b82f6',
-            backgroundColor: 'rgba(59,130,246,0.2)',
+            borderColor: 'rgba(59, 130, 246, 1)',
+            backgroundColor: 'rgba(59, 130, 246, 0.2)',
             fill: true,
-            tension: 0.25,
-            pointBackgroundColor: '#3b82f6',
+            tension: 0.3,
           },
         ],
       },
       options: {
         responsive: true,
         plugins: {
-          legend: { display: false },
-          title: {
-            display: true,
-          },
+          legend: { display: true },
+          tooltip: { mode: 'index', intersect: false },
+        },
+        interaction: {
+          mode: 'nearest',
+          intersect: false,
         },
         scales: {
-          x: { title: { display: true, text: 'Date' } },
-          y: { title: { display: true, text: 'Close Price (₹)' } },
+          x: { display: true, title: { display: true, text: 'Date' } },
+          y: { display: true, title: { display: true, text: 'Price (₹)' } },
         },
       },
     });
@@ -47,6 +113,128 @@ let predictChartInstance = null;
   }
 })();
 
+// Volatility Dashboard Chart
+
+(async function initVolatilityChart() {
+  try {
+    const canvas = document.getElementById('volChart');
+    if (!canvas) return;
+
+    const data = await fetchChartData('/api/volatility');
+    const { dates, daily_changes } = data;
+
+    new Chart(canvas.getContext('2d'), {
+      type: 'line',
+      data: {
+        labels: dates,
+        datasets: [
+          {
+            label: 'Daily % Change',
+            data: daily_changes,
+            borderColor: 'red',
+            borderWidth: 2,
+            fill: false,
+            tension: 0.2,
+          },
+        ],
+      },
+    });
+
+    let liveVolChart = null;
+    subscribeLiveBars(data.symbol, (bar) => {
+      liveVolChart = liveVolChart || liveChart(canvas, bar, [['% return', 'red'], ['rolling volatility (%)', '#3b82f6']]);
+      appendPoint(liveVolChart, bar.time, [bar.indicators.bar_return, bar.volatility]);
+    });
+
+    const estimatesCanvas = document.getElementById('volEstimatesChart');
+    if (estimatesCanvas) {
+      const estimators = [
+        ['realized_20', '20-day realized', '#3b82f6'],
+        ['ewma', 'EWMA', '#f59e0b'],
+        ['garch', 'GARCH(1,1)', '#8b5cf6'],
+        ['parkinson', 'Parkinson', '#10b981'],
+        ['garman_klass', 'Garman-Klass', '#6b7280'],
+      ];
+      new Chart(estimatesCanvas.getContext('2d'), {
+        type: 'line',
+        data: {
+          labels: dates,
+          datasets: estimators.map(([key, label, color]) => ({
+            label: `${label} (daily %)`,
+            data: data[key],
+            borderColor: color,
+            borderWidth: 1,
+            pointRadius: 0,
+            fill: false,
+            spanGaps: false,
+          })),
+        },
+      });
+    }
+  } catch (err) {
+    console.error('Error initializing volatility chart:', err);
+  }
+})();
+
+// Trend Dashboard Charts
+
+(async function initTrendCharts() {
+  try {
+    const priceCanvas = document.getElementById('priceChart');
+    const returnCanvas = document.getElementById('dailyReturnChart');
+    const technicalCanvas = document.getElementById('technicalChart');
+    if (!priceCanvas || !returnCanvas || !technicalCanvas) return;
+
+    const d = await fetchChartData('/api/indicators');
+
+    // --- Price Chart ---
+    new Chart(priceCanvas, {
+      type: 'line',
+      data: {
+        labels: d.dates,
+        datasets: [
+          { label: 'Close Price', data: d.prices, borderColor: '#007bff', fill: false },
+          { label: 'MA 20', data: d.ma20, borderColor: '#28a745', fill: false },
+          { label: 'MA 50', data: d.ma50, borderColor: '#ffc107', fill: false },
+          { label: 'MA 200', data: d.ma200, borderColor: '#6f42c1', fill: false },
+          { label: 'BB Upper', data: d.bb_upper, borderColor: 'rgba(255,0,0,0.5)', borderDash: [5, 5], fill: false },
+          { label: 'BB Lower', data: d.bb_lower, borderColor: 'rgba(0,255,0,0.5)', borderDash: [5, 5], fill: false },
+        ],
+      },
+    });
+
+    // --- Daily Return Chart ---
+    new Chart(returnCanvas, {
+      type: 'bar',
+      data: { labels: d.dates, datasets: [{ label: 'Daily % Return', data: d.daily_return, backgroundColor: '#17a2b8' }] },
+    });
+
+    // --- Technical Indicators Chart (RSI & MACD) ---
+    new Chart(technicalCanvas, {
+      type: 'line',
+      data: {
+        labels: d.dates,
+        datasets: [
+          { label: 'RSI', data: d.rsi, borderColor: '#fd7e14', fill: false },
+          { label: 'MACD', data: d.macd, borderColor: '#20c997', fill: false },
+        ],
+      },
+    });
+
+    // --- Live intraday bars ---
+    let livePriceChart = null;
+    subscribeLiveBars(d.symbol, (bar) => {
+      const v = bar.indicators;
+      livePriceChart = livePriceChart || liveChart(priceCanvas, bar, [
+        ['Close', '#007bff'], ['MA 20', '#28a745'], ['MA 50', '#ffc107'], ['MA 200', '#6f42c1'],
+      ]);
+      appendPoint(livePriceChart, bar.time, [bar.close, v.ma20, v.ma50, v.ma200]);
+    });
+  } catch (err) {
+    console.error('Error initializing trend charts:', err);
+  }
+})();
+
 // 2. Predict Form Handler
 
 const form = document.getElementById('predictForm');
@@ -0,0 +1,120 @@
+import hmac
+import json
+import os
+import queue
+from flask import Blueprint, Response, abort, request
+from app.market_data import UnknownSymbol
+from app.routes import requested_symbol
+from app.streaming import live_series, live_symbols
+
+# ------------------ LIVE STREAM API ------------------
+# POST /stream/ticks   {"symbol": "NIFTY50", "ticks": [{"time": ..., "price": ..., "volume": ...}], "flush": false}
+# POST /stream/bars    {"symbol": "NIFTY50", "bars": [{"time": ..., "open": ..., "high": ..., "low": ..., "close": ..., "volume": ...}]}
+# GET  /stream/events?symbol=NIFTY50   Server-Sent Events: snapshot, tick, bar
+# GET  /stream/snapshot?symbol=NIFTY50
+#
+# Pushes are accepted from localhost, or from anywhere with the
+# X-Stream-Token header when STREAM_TOKEN is set. A symbol is live once a
+# feed has pushed to it (listed by GET /stream/symbols); snapshot and events
+# answer 404 before that. Each SSE client holds one server thread while
+# connected.
+
+STREAM_TOKEN = os.environ.get('STREAM_TOKEN')
+HEARTBEAT_S = 15
+LOCAL_ADDRESSES = ('127.0.0.1', '::1')
+
+stream_routes = Blueprint('stream_routes', __name__, url_prefix='/stream')
+
+
+@stream_routes.errorhandler(UnknownSymbol)
+def unknown_symbol(e):
+    return {'error': str(e)}, 404
+
+
+def _check_pusher():
+    token = request.headers.get('X-Stream-Token')
+    if STREAM_TOKEN and token and hmac.compare_digest(token, STREAM_TOKEN):
+        return
+    if request.remote_addr not in LOCAL_ADDRESSES:
+        abort(403)
+
+
+def _rows(data, key):
+    rows = data.get(key) or []
+    if isinstance(rows, dict):
+        rows = [rows]
+    if not isinstance(rows, list):
+        abort(400, f"'{key}' must be a list.")
+    return rows
+
+
+@stream_routes.route('/ticks', methods=['POST'])
+def push_ticks():
+    _check_pusher()
+    data = request.get_json(silent=True) or {}
+    series = live_series(requested_symbol(data))
+    closed = 0
+    try:
+        for tick in _rows(data, 'ticks'):
+            closed += series.add_tick(tick['time'], tick['price'], tick.get('volume')) is not None
+    except (KeyError, TypeError, ValueError) as e:
+        abort(400, f"Bad tick: {e}")
+    if data.get('flush'):
+        closed += series.flush() is not None
+    return {'symbol': series.symbol, 'closed_bars': closed}
+
+
+@stream_routes.route('/bars', methods=['POST'])
+def push_bars():
+    _check_pusher()
+    data = request.get_json(silent=True) or {}
+    series = live_series(requested_symbol(data))
+    rows = _rows(data, 'bars')
+    try:
+        for bar in rows:
+            series.add_bar(bar['time'], bar['open'], bar['high'], bar['low'], bar['close'], bar.get('volume'))
+    except (KeyError, TypeError, ValueError) as e:
+        abort(400, f"Bad bar: {e}")
+    return {'symbol': series.symbol, 'closed_bars': len(rows)}
+
+
+def _fed_series():
+    symbol = requested_symbol()
+    series = live_series(symbol, create=False)
+    if series is None:
+        abort(404, f"No live feed for {symbol}.")
+    return series
+
+
+@stream_routes.route('/snapshot')
+def snapshot():
+    return _fed_series().snapshot()
+
+
+@stream_routes.route('/symbols')
+def symbols():
+    return {'symbols': live_symbols()}
+
+
+@stream_routes.route('/events')
+def events():
+    series = _fed_series()
+    subscriber = series.subscribe()
+    initial = series.snapshot()
+
+    def generate():
+        try:
+            yield f"event: snapshot\ndata: {json.dumps(initial, separators=(',', ':'))}\n\n"
+            while True:
+                try:
+                    event, data = subscriber.queue.get(timeout=HEARTBEAT_S)
+                except queue.Empty:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"event: {event}\ndata: {data}\n\n"
+        finally:
+            # Client went away (or the server is shutting down)
+            series.unsubscribe(subscriber)
+
+    return Response(generate(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
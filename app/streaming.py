@@ -0,0 +1,324 @@
+import argparse
+import csv
+import json
+import math
+import os
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+from app.indicators import BB_WINDOW, MA_WINDOWS, MONTHLY_LAG, RSI_WINDOW, SERIES, TrendIndicators
+from app.market_data import normalize_symbol, resolve_symbol
+from ml.rolling import RollingWindow
+
+# ------------------ LIVE BAR STREAM ------------------
+# Ticks (time, price, volume) or finished bars are pushed per symbol, over
+# HTTP (app/stream_routes.py) or replayed from a file. Ticks are aggregated
+# into OHLC bars of STREAM_BAR_SECONDS; each closed bar is appended to the
+# symbol's intraday TrendIndicators, so MA/RSI/MACD/Bollinger values and the
+# rolling volatility update in O(1) per bar. The intraday state never mixes
+# with the daily history: windows count bars of the stream's own timeframe,
+# returns are bar-to-bar (sent as bar_return), and a value is sent as null
+# until its window has filled. Bars must arrive in time order; a bar at or
+# before the last closed one is rejected. Ticks only touch the forming bar.
+# Subscribers (SSE clients) get every event serialized once, through small
+# per-subscriber queues.
+
+STREAM_BAR_SECONDS = int(os.environ.get('STREAM_BAR_SECONDS', 60))
+MAX_LIVE_BARS = 5000  # history kept per symbol before trimming
+VOL_WINDOW = 20
+SUBSCRIBER_QUEUE = 256
+REPLAY_BATCH = 500
+
+# TrendIndicators names that mean something else on intraday bars
+LIVE_NAMES = {'daily_return': 'bar_return', 'monthly_return': f'return_{MONTHLY_LAG}_bars'}
+# Bars needed before each series is defined
+WARMUP_BARS = {**{f'ma{w}': w for w in MA_WINDOWS}, 'bb_upper': BB_WINDOW, 'bb_lower': BB_WINDOW,
+               'daily_return': 2, 'monthly_return': MONTHLY_LAG + 1, 'rsi': RSI_WINDOW + 1}
+
+
+def parse_time(value):
+    # Epoch seconds or an ISO timestamp (naive = UTC)
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return float(value)
+    except ValueError:
+        stamp = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+        if stamp.tzinfo is None:
+            stamp = stamp.replace(tzinfo=timezone.utc)
+        return stamp.timestamp()
+
+
+def format_time(seconds):
+    return datetime.fromtimestamp(seconds, timezone.utc).strftime('%Y-%m-%dT%H:%M:%S')
+
+
+class BarAggregator:
+    # Folds ticks into OHLC bars aligned to `interval` seconds
+
+    def __init__(self, interval=STREAM_BAR_SECONDS):
+        self.interval = interval
+        self.bar = None  # forming bar
+        self.last_closed = None  # start of the last closed bar
+        self.late_ticks = 0
+
+    def add_tick(self, t, price, volume=0.0):
+        # Returns the bar this tick closed, if any
+        start = t - t % self.interval
+        bar = self.bar
+        if (bar is not None and start < bar['start']) or (self.last_closed is not None and start <= self.last_closed):
+            self.late_ticks += 1
+            return None
+        if bar is not None and start == bar['start']:
+            bar['high'] = max(bar['high'], price)
+            bar['low'] = min(bar['low'], price)
+            bar['close'] = price
+            bar['volume'] += volume
+            return None
+        self.bar = {'start': start, 'open': price, 'high': price, 'low': price, 'close': price, 'volume': volume}
+        return bar
+
+    def flush(self):
+        bar, self.bar = self.bar, None
+        return bar
+
+
+class Subscriber:
+    def __init__(self):
+        self.queue = queue.Queue(maxsize=SUBSCRIBER_QUEUE)
+        self.dropped = 0
+
+    def put(self, message):
+        # Slow clients lose their oldest events rather than block the feed
+        while True:
+            try:
+                self.queue.put_nowait(message)
+                return
+            except queue.Full:
+                try:
+                    self.queue.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+
+
+class LiveSeries:
+    def __init__(self, symbol, interval=STREAM_BAR_SECONDS):
+        self.symbol = symbol
+        self.aggregator = BarAggregator(interval)
+        self.lock = threading.Lock()
+        self.subscribers = set()
+        self.bars = 0
+        self.rejected_bars = 0
+
+        # Intraday state only: starts empty and warms up on this feed's bars
+        self.indicators = TrendIndicators([], [])
+        self.returns = RollingWindow(VOL_WINDOW)
+
+    # ---- Ingestion ----
+    def add_tick(self, t, price, volume=0.0):
+        t, price, volume = parse_time(t), float(price), float(volume or 0)
+        with self.lock:
+            closed = self.aggregator.add_tick(t, price, volume)
+            if closed is not None:
+                self._close_bar(closed)
+            forming = self.aggregator.bar
+            if forming is not None and forming['start'] <= t:
+                self._publish('tick', {'symbol': self.symbol, 'time': format_time(t), 'price': price,
+                                       'bar': self._bar_payload(forming)})
+        return closed
+
+    def add_bar(self, t, open_, high, low, close, volume=0.0):
+        # A bar finished upstream; any forming bar before it is closed first.
+        # Raises ValueError for a bar at or before the last closed (or the
+        # forming) bar.
+        bar = {'start': parse_time(t), 'open': float(open_), 'high': float(high), 'low': float(low),
+               'close': float(close), 'volume': float(volume or 0)}
+        with self.lock:
+            last = self.aggregator.last_closed
+            forming = self.aggregator.bar
+            if (last is not None and bar['start'] <= last) or (forming is not None and bar['start'] < forming['start']):
+                self.rejected_bars += 1
+                raise ValueError(f"bar at {format_time(bar['start'])} is not after the last closed bar.")
+            if forming is not None:
+                # Replaced by the finished bar when it covers the same period
+                forming = self.aggregator.flush()
+                if forming['start'] < bar['start']:
+                    self._close_bar(forming)
+            self._close_bar(bar)
+        return bar
+
+    def flush(self):
+        with self.lock:
+            bar = self.aggregator.flush()
+            if bar is not None:
+                self._close_bar(bar)
+        return bar
+
+    def _close_bar(self, bar):
+        self.aggregator.last_closed = bar['start']
+        indicators = self.indicators
+        indicators.append(format_time(bar['start']), bar['close'], bar['volume'])
+        if len(indicators) > 1:
+            self.returns.push(indicators.series['daily_return'][-1])
+        self.bars += 1
+        if len(indicators) > 2 * MAX_LIVE_BARS:
+            indicators.trim(MAX_LIVE_BARS)
+        self._publish('bar', self._bar_payload(bar, closed=True))
+
+    def _bar_payload(self, bar, closed=False):
+        payload = {'symbol': self.symbol, 'timeframe': self.timeframe, 'time': format_time(bar['start'])}
+        payload.update((key, bar[key]) for key in ('open', 'high', 'low', 'close', 'volume'))
+        if closed:
+            payload['indicators'] = self._latest_indicators()
+            payload['volatility'] = _finite(self.returns.std())
+        return payload
+
+    def _latest_indicators(self):
+        n = len(self.indicators)
+        if not n:
+            return {}
+        return {LIVE_NAMES.get(name, name): self.indicators.series[name][-1] if n >= WARMUP_BARS.get(name, 1) else None
+                for name in SERIES}
+
+    @property
+    def timeframe(self):
+        return f"{self.aggregator.interval}s"
+
+    # ---- Subscribers ----
+    def _publish(self, event, payload):
+        if not self.subscribers:
+            return
+        message = (event, json.dumps(payload, separators=(',', ':')))
+        for subscriber in list(self.subscribers):
+            subscriber.put(message)
+
+    def subscribe(self):
+        subscriber = Subscriber()
+        with self.lock:
+            self.subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self.lock:
+            self.subscribers.discard(subscriber)
+
+    def snapshot(self):
+        with self.lock:
+            forming = self.aggregator.bar
+            return {
+                'symbol': self.symbol,
+                'interval': self.aggregator.interval,
+                'timeframe': self.timeframe,
+                'bars': self.bars,
+                'last_time': self.indicators.dates[-1] if len(self.indicators) else None,
+                'last_close': self.indicators.prices[-1] if len(self.indicators) else None,
+                'indicators': self._latest_indicators(),
+                'volatility': _finite(self.returns.std()),
+                'forming': self._bar_payload(forming) if forming else None,
+                'subscribers': len(self.subscribers),
+                'late_ticks': self.aggregator.late_ticks,
+                'rejected_bars': self.rejected_bars,
+            }
+
+
+def _finite(value):
+    return None if value is None or math.isnan(value) else value
+
+
+_live = {}
+_lock = threading.Lock()
+
+
+def live_series(symbol, create=True):
+    # Raises UnknownSymbol for symbols missing from the directory. With
+    # create=False returns None unless a feed has pushed to the symbol.
+    symbol = normalize_symbol(symbol)
+    series = _live.get(symbol)
+    if series is None and create:
+        resolve_symbol(symbol)
+        with _lock:
+            series = _live.get(symbol)
+            if series is None:
+                series = _live[symbol] = LiveSeries(symbol)
+    return series
+
+
+def live_symbols():
+    return sorted(_live)
+
+
+# ---- Replay ----
+def read_replay(path):
+    # CSV with time,price[,volume] (ticks) or time,open,high,low,close[,volume] (bars)
+    with open(path, newline='') as f:
+        for row in csv.DictReader(f):
+            row = {key.strip().lower(): value for key, value in row.items() if key}
+            yield row
+
+
+def replay(path, symbol, speed=0.0, push=None, batch=REPLAY_BATCH):
+    # Feeds a file through `push(kind, rows)`; defaults to the in-process
+    # series. speed > 0 sleeps the recorded gaps divided by speed, otherwise
+    # rows go out in batches.
+    push = push or (lambda kind, rows: _push_local(symbol, kind, rows))
+    previous = None
+    pending, pending_kind = [], None
+    count = 0
+    for row in read_replay(path):
+        kind = 'bars' if 'close' in row else 'ticks'
+        t = parse_time(row['time'])
+        if pending and (kind != pending_kind or len(pending) >= batch or speed > 0):
+            push(pending_kind, pending)
+            pending = []
+        if speed > 0 and previous is not None and t > previous:
+            time.sleep((t - previous) / speed)
+        previous = t
+        pending.append(row)
+        pending_kind = kind
+        count += 1
+    if pending:
+        push(pending_kind, pending)
+    push('flush', [])
+    return count
+
+
+def _push_local(symbol, kind, rows):
+    series = live_series(symbol)
+    if kind == 'flush':
+        series.flush()
+    for row in rows:
+        if kind == 'bars':
+            series.add_bar(row['time'], row['open'], row['high'], row['low'], row['close'], row.get('volume'))
+        else:
+            series.add_tick(row['time'], row['price'], row.get('volume'))
+
+
+def http_pusher(base_url, symbol, token=None):
+    import urllib.request  # CLI replay only
+
+    def push(kind, rows):
+        body = {'symbol': symbol, 'flush': True} if kind == 'flush' else {'symbol': symbol, kind: rows}
+        headers = {'Content-Type': 'application/json'}
+        if token:
+            headers['X-Stream-Token'] = token
+        url = f"{base_url.rstrip('/')}/stream/{'bars' if kind == 'bars' else 'ticks'}"
+        request = urllib.request.Request(url, data=json.dumps(body).encode(), headers=headers, method='POST')
+        with urllib.request.urlopen(request) as response:
+            response.read()
+    return push
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay a tick/bar CSV into a running app")
+    parser.add_argument('path', help="CSV with time,price[,volume] or time,open,high,low,close[,volume]")
+    parser.add_argument('--symbol', default=None)
+    parser.add_argument('--url', default='http://127.0.0.1:5000')
+    parser.add_argument('--speed', type=float, default=0.0, help="replay speed-up; 0 = as fast as possible")
+    parser.add_argument('--token', default=os.environ.get('STREAM_TOKEN'))
+    args = parser.parse_args()
+
+    symbol = normalize_symbol(args.symbol)
+    count = replay(args.path, symbol, args.speed, http_pusher(args.url, symbol, args.token))
+    print(f"Replayed {count} rows into {symbol} at {args.url}")
@@ -0,0 +1,115 @@
+import math
+import numpy as np
+import pandas as pd
+from ml.stages import stage
+
+# ------------------ VOLATILITY ANALYTICS ------------------
+# Every estimator is one vectorized pass over the history, computed once per
+# data version and kept in the MarketData memo, so requests only slice
+# ready-made arrays. All values are daily volatility in percent.
+#
+#   realized_<w>  - rolling std of close-to-close returns over w days
+#   ewma          - RiskMetrics exponentially weighted volatility
+#   garch         - GARCH(1,1) with fixed weights and variance targeting
+#                   (the long-run variance is the sample variance), run as
+#                   an EWM filter instead of a fitted model
+#   parkinson     - high/low range estimator over RANGE_WINDOW days
+#   garman_klass  - open/high/low/close estimator over RANGE_WINDOW days
+#
+# Range estimators skip rows without a usable OHLC bar (early history has
+# Open/High/Low = 0). Regimes label each day low/normal/high by the terciles
+# of its 20-day realized volatility.
+
+REALIZED_WINDOWS = (10, 20, 60)
+RANGE_WINDOW = 20
+EWMA_LAMBDA = 0.94
+GARCH_ALPHA = 0.08
+GARCH_BETA = 0.90
+REGIME_WINDOW = 20
+REGIMES = ('low', 'normal', 'high')
+SPIKE_THRESHOLD = 0.05
+TRADING_DAYS = 252
+
+SERIES = ['realized_10', 'realized_20', 'realized_60', 'ewma', 'garch', 'parkinson', 'garman_klass']
+
+
+def _range_bars(frame):
+    # (log high/low, log close/open) with NaN where the bar is unusable
+    if not {'Open', 'High', 'Low'}.issubset(frame.columns):
+        nan = np.full(len(frame), np.nan)
+        return nan, nan
+    o, h, l, c = (frame[name].to_numpy(dtype=float) for name in ('Open', 'High', 'Low', 'Close'))
+    valid = (o > 0) & (l > 0) & (h >= l) & (c > 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        hl = np.where(valid, np.log(h / l), np.nan)
+        co = np.where(valid, np.log(c / o), np.nan)
+    return hl, co
+
+
+def compute_volatility(frame):
+    closes = frame['Close'].astype(float)
+    returns = closes.pct_change()
+    squared = returns ** 2
+
+    series = {f'realized_{w}': returns.rolling(w).std() for w in REALIZED_WINDOWS}
+
+    series['ewma'] = np.sqrt(squared.ewm(alpha=1 - EWMA_LAMBDA, adjust=False).mean())
+
+    # sigma2[t] - V = alpha * (r[t-1]^2 - V) + beta * (sigma2[t-1] - V)
+    long_run = returns.var()
+    shocks = (squared.shift(1) - long_run).fillna(0) * (GARCH_ALPHA / (1 - GARCH_BETA))
+    deviation = shocks.ewm(alpha=1 - GARCH_BETA, adjust=False).mean()
+    garch_var = (long_run + deviation).clip(lower=0)
+    series['garch'] = np.sqrt(garch_var)
+
+    hl, co = _range_bars(frame)
+    parkinson = pd.Series(hl ** 2 / (4 * math.log(2)))
+    garman_klass = pd.Series(0.5 * hl ** 2 - (2 * math.log(2) - 1) * co ** 2)
+    series['parkinson'] = np.sqrt(parkinson.rolling(RANGE_WINDOW).mean())
+    series['garman_klass'] = np.sqrt(garman_klass.rolling(RANGE_WINDOW).mean())
+
+    series = {name: values.to_numpy() * 100 for name, values in series.items()}
+
+    # ---- Regimes ----
+    basis = series[f'realized_{REGIME_WINDOW}']
+    finite = basis[np.isfinite(basis)]
+    thresholds = np.quantile(finite, [1 / 3, 2 / 3]) if len(finite) else np.array([np.nan, np.nan])
+    regime = np.searchsorted(thresholds, basis, side='right').astype(np.int8)
+    regime[~np.isfinite(basis)] = -1
+
+    # ---- Summary (what the dashboards print) ----
+    current = {name: _last_finite(values) for name, values in series.items()}
+    last_r2 = squared.iloc[-1] if len(squared) else math.nan
+    last_var = garch_var.iloc[-1] if len(garch_var) else math.nan
+    forecast = long_run + GARCH_ALPHA * (last_r2 - long_run) + GARCH_BETA * (last_var - long_run)
+    summary = {
+        'volatility': _round(returns.std() * 100),
+        'spikes': int((returns.abs() > SPIKE_THRESHOLD).sum()),
+        'current': {name: _round(value) for name, value in current.items()},
+        'annualized': {name: _round(value * math.sqrt(TRADING_DAYS)) for name, value in current.items()},
+        'garch_forecast': _round(math.sqrt(max(forecast, 0)) * 100),
+        'regime': REGIMES[regime[-1]] if len(regime) and regime[-1] >= 0 else None,
+        'regime_thresholds': [_round(t) for t in thresholds],
+    }
+    return {'returns': returns.to_numpy(), 'series': series, 'regime': regime, 'summary': summary}
+
+
+def _last_finite(values):
+    finite = np.flatnonzero(np.isfinite(values))
+    return float(values[finite[-1]]) if len(finite) else math.nan
+
+
+def _round(value):
+    return None if value is None or math.isnan(value) else round(float(value), 2)
+
+
+def get_volatility(market):
+    # Cached per data version; a reload recomputes from scratch
+    def compute():
+        with stage('volatility'):
+            return compute_volatility(market.frame)
+    return market.memo('volatility', compute)
+
+
+def regime_labels(codes):
+    return [REGIMES[code] if code >= 0 else None for code in codes]
@@ -0,0 +1,6 @@
+from app.app import create_app
+
+# ------------------ WSGI ENTRY ------------------
+#   gunicorn app.wsgi:app
+
+app = create_app()
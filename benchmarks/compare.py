@@ -0,0 +1,61 @@
+import argparse
+import json
+import sys
+
+# ------------------ BENCHMARK COMPARISON ------------------
+# Compares two benchmarks/run.py result files size by size and flags every
+# benchmark whose p50 or p95 grew by more than --threshold. Exits 1 when
+# anything regressed, so it can gate CI.
+#
+#   python -m benchmarks.compare benchmarks/results/<old>.json benchmarks/results/<new>.json
+
+METRICS = ('p50_ms', 'p95_ms')
+GROUPS = ('functions', 'routes', 'load')
+
+
+def compare(old, new, threshold):
+    rows, regressions = [], []
+    for size, new_result in new['sizes'].items():
+        old_result = old['sizes'].get(size)
+        if old_result is None:
+            continue
+        for group in GROUPS:
+            for name, stats in new_result.get(group, {}).items():
+                before = old_result.get(group, {}).get(name)
+                if before is None:
+                    continue
+                for metric in METRICS:
+                    ratio = stats[metric] / before[metric] if before[metric] else float('inf')
+                    row = (size, group, name, metric, before[metric], stats[metric], ratio)
+                    rows.append(row)
+                    if ratio > 1 + threshold:
+                        regressions.append(row)
+        before_rss, after_rss = old_result.get('peak_rss_mb'), new_result.get('peak_rss_mb')
+        if before_rss and after_rss:
+            row = (size, 'process', 'peak_rss', 'mb', before_rss, after_rss, after_rss / before_rss)
+            rows.append(row)
+            if row[-1] > 1 + threshold:
+                regressions.append(row)
+    return rows, regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files")
+    parser.add_argument('old')
+    parser.add_argument('new')
+    parser.add_argument('--threshold', type=float, default=0.10, help="allowed slowdown, 0.10 = 10%%")
+    args = parser.parse_args()
+
+    with open(args.old) as f:
+        old = json.load(f)
+    with open(args.new) as f:
+        new = json.load(f)
+    if old.get('config') != new.get('config'):
+        print("Warning: runs used different settings; numbers may not be comparable.")
+
+    rows, regressions = compare(old, new, args.threshold)
+    for size, group, name, metric, before, after, ratio in rows:
+        flag = '  REGRESSION' if ratio > 1 + args.threshold else ''
+        print(f"{size:>8} {group:<9} {name:<22} {metric:<7} {before:10.2f} -> {after:10.2f} ({ratio:5.2f}x){flag}")
+    print(f"{len(regressions)} regression(s) above {args.threshold:.0%}")
+    sys.exit(1 if regressions else 0)
@@ -0,0 +1,276 @@
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from benchmarks.synthetic import write_workspace
+
+# ------------------ BENCHMARK SUITE ------------------
+# For every history size a fresh workspace (synthetic data/nifty_50.csv,
+# empty ml/models/, its own users.db) is generated and a worker process
+# benchmarks inside it, so sizes don't share caches and peak RSS is per size:
+#   - load_data, prepare_features, create_dataset and the training script,
+#   - each route through the Flask test client (first call reported as cold),
+#   - the same routes under concurrent load against a local threaded server.
+# Results go to benchmarks/results/<commit>.json; compare two runs with
+# `python -m benchmarks.compare old.json new.json`.
+#
+#   python -m benchmarks.run                       # 10k, 100k and 1M rows
+#   python -m benchmarks.run --sizes 10k --requests 20
+
+SIZES = ('10k', '100k', '1M')
+RESULTS_DIR = os.path.join(ROOT, 'benchmarks', 'results')
+USERNAME = PASSWORD = 'bench'
+
+ROUTES = [
+    ('home', 'GET', '/', None),
+    ('predict_dashboard', 'GET', '/predict-dashboard', None),
+    ('trend_dashboard', 'GET', '/trend-dashboard', None),
+    ('volatility_dashboard', 'GET', '/volatility-dashboard', None),
+    ('predict_next', 'POST', '/predict-next', {'json': {'risk': 'Medium'}}),
+    ('login', 'POST', '/login', {'data': {'username': USERNAME, 'password': PASSWORD}}),
+    ('api_prices', 'GET', '/api/prices', None),
+    ('api_indicators', 'GET', '/api/indicators', None),
+    ('api_volatility', 'GET', '/api/volatility', None),
+]
+
+
+def parse_size(text):
+    text = text.strip().lower()
+    scale = {'k': 10 ** 3, 'm': 10 ** 6}.get(text[-1], 1)
+    return int(float(text.rstrip('km')) * scale)
+
+
+def summarize(samples, wall=None):
+    ms = np.asarray(samples) * 1000
+    summary = {
+        'count': int(len(ms)),
+        'p50_ms': float(np.percentile(ms, 50)),
+        'p95_ms': float(np.percentile(ms, 95)),
+        'p99_ms': float(np.percentile(ms, 99)),
+        'mean_ms': float(ms.mean()),
+        'min_ms': float(ms.min()),
+        'max_ms': float(ms.max()),
+    }
+    # Sequential runs: one call at a time, so throughput is 1 / mean latency
+    summary['throughput_per_s'] = len(ms) / wall if wall else 1000.0 / summary['mean_ms']
+    return summary
+
+
+def peak_rss_mb(who=resource.RUSAGE_SELF):
+    return resource.getrusage(who).ru_maxrss / 1024  # KiB on Linux
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return samples
+
+
+# ---- Worker: runs inside one workspace ----
+def bench_functions(repeat, train_repeat):
+    from app.routes import prepare_features
+    from ml.model_training import create_dataset
+    from ml.model_utils import load_data, preprocess_data
+
+    path = os.path.join('data', 'nifty_50.csv')
+    results = {}
+    results['load_data'] = summarize(timed(lambda: load_data(path), repeat))
+    df = load_data(path)
+    results['prepare_features'] = summarize(timed(lambda: prepare_features(df), repeat))
+    data, _ = preprocess_data(df, column='Close', scale=True)
+    results['create_dataset'] = summarize(timed(lambda: create_dataset(data, look_back=5), repeat))
+
+    # The real entry point, cold interpreter included; also leaves the model
+    # artifacts the predict routes need
+    script = os.path.join(ROOT, 'ml', 'train_model.py')
+    results['train_script'] = summarize(timed(
+        lambda: subprocess.run([sys.executable, script], check=True, capture_output=True), train_repeat))
+    results['train_script']['peak_rss_mb'] = peak_rss_mb(resource.RUSAGE_CHILDREN)
+    return results
+
+
+def _call(client, method, url, kwargs):
+    response = client.open(url, method=method, **(kwargs or {}))
+    if response.status_code >= 400:
+        raise RuntimeError(f"{method} {url} -> {response.status_code}")
+    return response
+
+
+def bench_routes(app, requests):
+    client = app.test_client()
+    results = {}
+    for name, method, url, kwargs in ROUTES:
+        t0 = time.perf_counter()
+        _call(client, method, url, kwargs)
+        cold = time.perf_counter() - t0
+        results[name] = summarize(timed(lambda: _call(client, method, url, kwargs), requests))
+        results[name]['cold_ms'] = cold * 1000
+    return results
+
+
+def _http(base, method, url, kwargs):
+    kwargs = kwargs or {}
+    headers, body = {}, None
+    if 'json' in kwargs:
+        body, headers['Content-Type'] = json.dumps(kwargs['json']).encode(), 'application/json'
+    elif 'data' in kwargs:
+        body = urllib.parse.urlencode(kwargs['data']).encode()
+        headers['Content-Type'] = 'application/x-www-form-urlencoded'
+    request = urllib.request.Request(base + url, data=body, headers=headers, method=method)
+
+    class NoRedirect(urllib.request.HTTPRedirectHandler):
+        def redirect_request(self, *args, **kw):
+            return None
+
+    t0 = time.perf_counter()
+    try:
+        with urllib.request.build_opener(NoRedirect).open(request) as response:
+            response.read()
+    except urllib.error.HTTPError as e:
+        if e.code >= 400:
+            raise
+    return time.perf_counter() - t0
+
+
+def bench_load(app, concurrency, load_requests):
+    # Every route in turn from `concurrency` client threads against a
+    # threaded local server
+    from werkzeug.serving import make_server
+
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base = f'http://127.0.0.1:{server.server_port}'
+    try:
+        results = {}
+        for name, method, url, kwargs in ROUTES:
+            t0 = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                samples = list(pool.map(lambda _: _http(base, method, url, kwargs), range(load_requests)))
+            results[name] = summarize(samples, wall=time.perf_counter() - t0)
+            results[name]['concurrency'] = concurrency
+        return results
+    finally:
+        server.shutdown()
+
+
+def worker(args):
+    # cwd is the workspace; USERS_DB_PATH points into it
+    results = {'rows': args.rows}
+    t0 = time.perf_counter()
+    from app.app import create_app
+    from app.db import create_user
+    from app.password_hashing import hash_password
+    app = create_app()
+    results['app_import_ms'] = (time.perf_counter() - t0) * 1000
+    create_user(USERNAME, hash_password(PASSWORD))
+
+    results['functions'] = bench_functions(args.repeat, args.train_repeat)
+    results['rss_after_functions_mb'] = peak_rss_mb()
+
+    results['routes'] = bench_routes(app, args.requests)
+    results['rss_after_routes_mb'] = peak_rss_mb()
+    if args.load_requests:
+        results['load'] = bench_load(app, args.concurrency, args.load_requests)
+    results['peak_rss_mb'] = peak_rss_mb()
+    print(json.dumps(results))
+
+
+# ---- Driver ----
+def git_info():
+    def git(*cmd):
+        try:
+            return subprocess.run(['git', *cmd], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+    return {'commit': git('rev-parse', 'HEAD'), 'subject': git('log', '-1', '--format=%s'),
+            'dirty': bool(git('status', '--porcelain', '--untracked-files=no'))}
+
+
+def run_size(rows, args):
+    with tempfile.TemporaryDirectory(prefix=f'bench-{rows}-') as workspace:
+        t0 = time.perf_counter()
+        write_workspace(workspace, rows, seed=args.seed)
+        generate_s = time.perf_counter() - t0
+
+        # Page cache off by default so route timings measure the render, comparable across commits
+        env = dict(os.environ, PYTHONPATH=ROOT, USERS_DB_PATH=os.path.join(workspace, 'users.db'),
+                   MPLBACKEND='Agg', SCHEDULER_ENABLED='0',
+                   RESPONSE_CACHE=os.environ.get('RESPONSE_CACHE', '0'))
+        cmd = [sys.executable, '-m', 'benchmarks.run', '--worker', '--rows', str(rows),
+               '--repeat', str(args.repeat), '--train-repeat', str(args.train_repeat),
+               '--requests', str(args.requests), '--concurrency', str(args.concurrency),
+               '--load-requests', str(args.load_requests)]
+        proc = subprocess.run(cmd, cwd=workspace, env=env, capture_output=True, text=True)
+        if proc.returncode != 0:
+            raise RuntimeError(f"Benchmark worker failed for {rows} rows:\n{proc.stderr}")
+        result = json.loads(proc.stdout.strip().splitlines()[-1])
+        result['generate_s'] = generate_s
+        return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark routes, feature helpers and training")
+    parser.add_argument('--sizes', nargs='+', default=list(SIZES), help="history lengths, e.g. 10k 100k 1M")
+    parser.add_argument('--repeat', type=int, default=5, help="runs per ML function")
+    parser.add_argument('--train-repeat', type=int, default=2, help="runs of the training script")
+    parser.add_argument('--requests', type=int, default=50, help="sequential requests per route")
+    parser.add_argument('--concurrency', type=int, default=8, help="load generator threads")
+    parser.add_argument('--load-requests', type=int, default=200, help="requests per route under load (0 = skip)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="default: benchmarks/results/<commit>.json")
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--rows', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args)
+        return
+
+    config = {key: getattr(args, key) for key in
+              ('repeat', 'train_repeat', 'requests', 'concurrency', 'load_requests', 'seed')}
+    report = {
+        'meta': {**git_info(), 'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                 'python': platform.python_version(), 'platform': platform.platform(),
+                 'cpu_count': os.cpu_count()},
+        'config': config,
+        'sizes': {},
+    }
+    for size in args.sizes:
+        rows = parse_size(size)
+        print(f"Benchmarking {rows} rows...", file=sys.stderr)
+        report['sizes'][str(rows)] = result = run_size(rows, args)
+        for group in ('functions', 'routes', 'load'):
+            for name, stats in result.get(group, {}).items():
+                print(f"  {group:<9} {name:<22} p50={stats['p50_ms']:9.2f}ms p95={stats['p95_ms']:9.2f}ms "
+                      f"p99={stats['p99_ms']:9.2f}ms {stats['throughput_per_s']:8.1f}/s", file=sys.stderr)
+        print(f"  peak RSS {result['peak_rss_mb']:.0f} MB", file=sys.stderr)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{(report['meta']['commit'] or 'unknown')[:10]}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results saved at {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+import os
+import numpy as np
+import pandas as pd
+
+# ------------------ SYNTHETIC PRICE HISTORIES ------------------
+# Random-walk OHLCV series in the layout of data/nifty_50.csv (dd-mm-YYYY
+# dates, Open/High/Low/Close/Volume), so benchmarks can grow the history far
+# beyond the real file. pandas timestamps stop at 2262, so long series end on
+# 31-12-2021 and start in 1700; above ~117k rows several bars share a date.
+
+END_DATE = pd.Timestamp('2021-12-31')
+START_DATE = pd.Timestamp('1700-01-01')
+
+
+def make_history(rows, seed=0, start_price=1000.0):
+    rng = np.random.default_rng(seed)
+    close = start_price * np.exp(np.cumsum(rng.normal(0.0003, 0.012, rows)))
+    open_ = np.concatenate([[start_price], close[:-1]]) * (1 + rng.normal(0, 0.002, rows))
+    high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 0.004, rows)))
+    low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.004, rows)))
+
+    span = min(rows, (END_DATE - START_DATE).days + 1)
+    offsets = np.arange(rows) * span // rows
+    dates = END_DATE - pd.to_timedelta(span - 1 - offsets, unit='D')
+    return pd.DataFrame({
+        'Date': dates.strftime('%d-%m-%Y'),
+        'Open': open_.round(2),
+        'High': high.round(2),
+        'Low': low.round(2),
+        'Close': close.round(2),
+        'Volume': rng.integers(10 ** 5, 10 ** 8, rows),
+    })
+
+
+def write_workspace(directory, rows, seed=0):
+    # A directory the app and training script can run from (their data and
+    # model paths are relative): data/nifty_50.csv plus an empty ml/models/
+    os.makedirs(os.path.join(directory, 'data'), exist_ok=True)
+    os.makedirs(os.path.join(directory, 'ml', 'models'), exist_ok=True)
+    path = os.path.join(directory, 'data', 'nifty_50.csv')
+    make_history(rows, seed).to_csv(path, index=False)
+    return path
@@ -0,0 +1,101 @@
+import argparse
+import io
+import os
+import sys
+import numpy as np
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from ml.features import FEATURE_NAMES
+
+# ------------------ FOLDED AFFINE MODEL ------------------
+# scaler_X -> LinearRegression -> scaler_y inverse is one affine map in price
+# units. With MinMaxScaler's x_s = x * sx + mx and y = (y_s - my) / sy:
+#   coef      = w * sx / sy
+#   intercept = (w . mx + c - my) / sy
+# ml/train_model.py writes the folded model as affine.npz next to the
+# pickles (direct multi-step models included), and the app serves from it
+# with NumPy alone: no scikit-learn import and no unpickling in the web
+# process. Older model directories can be converted with
+#   python -m ml.affine [SYMBOL ...]
+
+AFFINE_FILE = 'affine.npz'
+
+
+def fold(model, scaler_X, scaler_y):
+    w = np.ravel(model.coef_).astype(float)
+    c = float(np.ravel(model.intercept_)[0])
+    sy, my = float(scaler_y.scale_[0]), float(scaler_y.min_[0])
+    return w * scaler_X.scale_ / sy, (w @ scaler_X.min_ + c - my) / sy
+
+
+class AffineModel:
+    def __init__(self, coef, intercept, features=FEATURE_NAMES, direct=None):
+        self.coef = np.asarray(coef, dtype=float)
+        self.intercept = float(intercept)
+        self.features = list(features)
+        self.direct = direct or {}  # horizon -> (coef, intercept)
+
+    @classmethod
+    def from_sklearn(cls, model, scaler_X, scaler_y, direct_artifacts=(), features=FEATURE_NAMES):
+        # direct_artifacts: the dicts written by ml/horizons.train_direct
+        direct = {a['horizon']: fold(a['model'], a['scaler_X'], a['scaler_y']) for a in direct_artifacts}
+        return cls(*fold(model, scaler_X, scaler_y), features, direct)
+
+    def predict(self, X):
+        return np.asarray(X, dtype=float) @ self.coef + self.intercept
+
+    def predict_direct(self, X, horizon):
+        coef, intercept = self.direct[horizon]
+        return np.asarray(X, dtype=float) @ coef + intercept
+
+    def save(self, path):
+        horizons = sorted(self.direct)
+        buffer = io.BytesIO()
+        np.savez(buffer, coef=self.coef, intercept=np.float64(self.intercept),
+                 features=np.array(self.features),
+                 direct_horizons=np.array(horizons, dtype=np.int64),
+                 direct_coef=np.array([self.direct[h][0] for h in horizons]).reshape(len(horizons), len(self.coef)),
+                 direct_intercept=np.array([self.direct[h][1] for h in horizons], dtype=float))
+        tmp_path = f"{path}.tmp-{os.getpid()}"
+        with open(tmp_path, 'wb') as f:
+            f.write(buffer.getvalue())
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            direct = {int(h): (coef, float(intercept)) for h, coef, intercept
+                      in zip(data['direct_horizons'], data['direct_coef'], data['direct_intercept'])}
+            return cls(data['coef'], float(data['intercept']), data['features'].tolist(), direct)
+
+
+def export_pickles(directory):
+    # Folds the pickled model/scalers in `directory` into affine.npz there
+    import joblib
+    from ml.horizons import direct_horizon
+    from ml.train_model import MODEL_FILE, SCALER_X_FILE, SCALER_Y_FILE
+
+    model, scaler_X, scaler_y = (joblib.load(os.path.join(directory, name))
+                                 for name in (MODEL_FILE, SCALER_X_FILE, SCALER_Y_FILE))
+    direct = [joblib.load(os.path.join(directory, name)) for name in sorted(os.listdir(directory))
+              if direct_horizon(name) is not None]
+    path = os.path.join(directory, AFFINE_FILE)
+    AffineModel.from_sklearn(model, scaler_X, scaler_y, direct).save(path)
+    return path
+
+
+if __name__ == "__main__":
+    from ml.artifacts import artifact_path, read_manifest
+    from ml.symbols import DEFAULT_SYMBOL, model_dir, normalize_symbol
+
+    parser = argparse.ArgumentParser(description="Fold trained pickles into affine.npz")
+    parser.add_argument('symbols', nargs='*', default=[DEFAULT_SYMBOL])
+    args = parser.parse_args()
+
+    for symbol in args.symbols:
+        directory = model_dir(normalize_symbol(symbol))
+        target = os.path.dirname(artifact_path(directory, AFFINE_FILE, read_manifest(directory)))
+        print(f"{symbol}: {export_pickles(target)}")
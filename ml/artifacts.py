@@ -0,0 +1,87 @@
+import json
+import os
+import shutil
+import time
+
+# ------------------ VERSIONED MODEL ARTIFACTS ------------------
+# Every training run writes into a fresh directory that nothing reads yet:
+#   ml/models/[SYMBOL/]versions/<version>/linear_model.pkl, scaler_*.pkl
+# and only then atomically replaces manifest.json next to it, which names the
+# live version. Readers resolve artifact paths through the manifest, so they
+# see either the old set or the new one, never a mix. Without a manifest the
+# flat files in the model directory are used (models trained before this).
+
+MANIFEST_FILE = 'manifest.json'
+VERSIONS_DIR = 'versions'
+KEEP_VERSIONS = int(os.environ.get('MODEL_KEEP_VERSIONS', 3))
+
+
+def new_version():
+    # Wall-clock time down to the nanosecond, zero-padded so that names sort
+    # in publish order (prune() relies on it); the pid tells apart writers
+    # that publish in the same nanosecond
+    now = time.time_ns()
+    stamp = time.strftime('%Y%m%dT%H%M%S', time.localtime(now // 10**9))
+    return f"{stamp}.{now % 10**9:09d}-{os.getpid()}"
+
+
+def atomic_dump(obj, path):
+    # Write next to the target and rename, so readers never unpickle a
+    # half-written file.
+    import joblib  # only writers need it; the app reads affine.npz
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    joblib.dump(obj, tmp_path)
+    os.replace(tmp_path, path)
+
+
+def read_manifest(directory):
+    try:
+        with open(os.path.join(directory, MANIFEST_FILE)) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def artifact_path(directory, filename, manifest=None):
+    if manifest is None:
+        return os.path.join(directory, filename)
+    return os.path.join(directory, VERSIONS_DIR, manifest['version'], filename)
+
+
+def publish(directory, artifacts, **meta):
+    # artifacts: {filename: object}; meta is recorded in the manifest
+    version = new_version()
+    version_dir = os.path.join(directory, VERSIONS_DIR, version)
+    os.makedirs(version_dir)
+    import joblib
+    for filename, obj in artifacts.items():
+        path = os.path.join(version_dir, filename)
+        if hasattr(obj, 'save'):
+            obj.save(path)  # own format, e.g. ml/affine.py's .npz
+        else:
+            joblib.dump(obj, path)
+
+    # manifest.json goes last: it is the commit marker
+    manifest = {'version': version, 'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'files': sorted(artifacts), **meta}
+    tmp_path = os.path.join(directory, f'{MANIFEST_FILE}.tmp-{os.getpid()}')
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, os.path.join(directory, MANIFEST_FILE))
+
+    prune(directory, keep=KEEP_VERSIONS)
+    return manifest
+
+
+def prune(directory, keep=KEEP_VERSIONS):
+    # Old versions stay around briefly for processes still loading them
+    root = os.path.join(directory, VERSIONS_DIR)
+    manifest = read_manifest(directory)
+    live = manifest['version'] if manifest else None
+    try:
+        versions = sorted(os.listdir(root))
+    except FileNotFoundError:
+        return
+    for version in versions[:-keep] if keep > 0 else versions:
+        if version != live:
+            shutil.rmtree(os.path.join(root, version), ignore_errors=True)
@@ -0,0 +1,177 @@
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from ml.features import FEATURE_NAMES, compute_features
+from ml.columnar_store import load_frame
+
+# ------------------ WALK-FORWARD BACKTEST ------------------
+# Re-fits the next-close linear model on expanding or rolling windows and
+# scores each out-of-sample fold. Every window is solved from running sums
+# of the normal equations (X'X and X'y accumulated row by row), so a refit
+# costs O(p^2) regardless of window length and thousands of folds take
+# well under a second. Batches of folds can be spread over a process pool.
+
+DATA_PATH = os.path.join('data', 'nifty_50.csv')
+RIDGE = 1e-8  # keeps the normal equations solvable on degenerate windows
+
+
+def build_design(df):
+    # Rows of [1, standardized features] and the next day's close as target.
+    # Standardizing with global statistics is an affine change of basis, so
+    # OLS predictions are identical to fitting on raw features.
+    df = compute_features(df)
+    X = df[FEATURE_NAMES].to_numpy(dtype=float)[:-1]
+    close = df['Close'].to_numpy(dtype=float)
+    y = close[1:]
+    std = X.std(axis=0)
+    std[std == 0] = 1.0
+    Z = np.column_stack([np.ones(len(X)), (X - X.mean(axis=0)) / std])
+    dates = df['Date'].to_numpy()[:-1] if 'Date' in df.columns else np.arange(len(X))
+    return Z, y, close[:-1], dates
+
+
+def normal_equation_sums(Z, y):
+    # Prefix sums with a leading zero row: window [a, b) is S[b] - S[a]
+    p = Z.shape[1]
+    ZtZ = np.zeros((len(Z) + 1, p, p))
+    np.cumsum(Z[:, :, None] * Z[:, None, :], axis=0, out=ZtZ[1:])
+    Zty = np.zeros((len(Z) + 1, p))
+    np.cumsum(Z * y[:, None], axis=0, out=Zty[1:])
+    return ZtZ, Zty
+
+
+def make_folds(n, train_size, step, window='expanding'):
+    if window not in ('expanding', 'rolling'):
+        raise ValueError("window must be 'expanding' or 'rolling'.")
+    if train_size <= 0 or step <= 0:
+        raise ValueError("train_size and step must be positive.")
+    folds = []
+    for test_start in range(train_size, n, step):
+        train_start = test_start - train_size if window == 'rolling' else 0
+        folds.append((train_start, test_start, min(test_start + step, n)))
+    return np.array(folds, dtype=np.int64).reshape(-1, 3)
+
+
+# ---- Fold evaluation (runs inline or inside pool workers) ----
+_shared = {}
+
+
+def _init_worker(Z, y, close, ZtZ, Zty):
+    _shared.update(Z=Z, y=y, close=close, ZtZ=ZtZ, Zty=Zty)
+
+
+def _evaluate_folds(folds, allow_short=False):
+    Z, y, close = _shared['Z'], _shared['y'], _shared['close']
+    ZtZ, Zty = _shared['ZtZ'], _shared['Zty']
+    train_start, test_start, test_end = folds.T
+
+    # One batched solve for every window in this chunk
+    A = ZtZ[test_start] - ZtZ[train_start]
+    b = Zty[test_start] - Zty[train_start]
+    penalty = RIDGE * np.eye(Z.shape[1])
+    penalty[0, 0] = 0.0
+    betas = np.linalg.solve(A + penalty, b[:, :, None])[:, :, 0]
+
+    # Out-of-sample rows of all folds, each tagged with its fold's coefficients
+    lengths = test_end - test_start
+    fold_id = np.repeat(np.arange(len(folds)), lengths)
+    rows = np.concatenate([np.arange(s, e) for s, e in zip(test_start, test_end)])
+    pred = np.einsum('ij,ij->i', Z[rows], betas[fold_id])
+    actual, current = y[rows], close[rows]
+
+    err = pred - actual
+    hit = np.sign(pred - current) == np.sign(actual - current)
+    # Follow the suggestion: long when the model expects a rise, else flat/short
+    position = np.where(pred > current, 1.0, -1.0 if allow_short else 0.0)
+    pnl = position * (actual / current - 1)
+
+    def per_fold(values):
+        return np.bincount(fold_id, weights=values, minlength=len(folds))
+
+    return {
+        'mse': per_fold(err ** 2) / lengths,
+        'mae': per_fold(np.abs(err)) / lengths,
+        'directional_accuracy': per_fold(hit.astype(float)) / lengths,
+        'pnl': per_fold(pnl),
+        'rows': rows,
+        'predictions': pred,
+        'strategy_returns': pnl,
+    }
+
+
+def _merge(parts):
+    return {key: np.concatenate([part[key] for part in parts]) for key in parts[0]}
+
+
+def walk_forward(df, train_size=1000, step=20, window='expanding', n_jobs=1, allow_short=False):
+    Z, y, close, dates = build_design(df)
+    folds = make_folds(len(Z), train_size, step, window)
+    if not len(folds):
+        raise ValueError(f"Need more than {train_size} usable rows, got {len(Z)}.")
+
+    ZtZ, Zty = normal_equation_sums(Z, y)
+    n_jobs = os.cpu_count() if n_jobs in (None, -1) else max(1, n_jobs)
+    chunks = np.array_split(folds, min(n_jobs, len(folds)))
+
+    if len(chunks) == 1:
+        _init_worker(Z, y, close, ZtZ, Zty)
+        result = _evaluate_folds(folds, allow_short)
+    else:
+        with ProcessPoolExecutor(max_workers=len(chunks), initializer=_init_worker,
+                                 initargs=(Z, y, close, ZtZ, Zty)) as pool:
+            parts = list(pool.map(_evaluate_folds, chunks, [allow_short] * len(chunks)))
+        result = _merge(parts)
+
+    fold_report = [
+        {
+            'train_start': str(dates[a]),
+            'test_start': str(dates[s]),
+            'test_end': str(dates[e - 1]),
+            'mse': float(result['mse'][i]),
+            'mae': float(result['mae'][i]),
+            'directional_accuracy': float(result['directional_accuracy'][i]),
+            'pnl': float(result['pnl'][i]),
+        }
+        for i, (a, s, e) in enumerate(folds)
+    ]
+
+    rows = result['rows']
+    err = result['predictions'] - y[rows]
+    equity = np.cumprod(1 + result['strategy_returns'])
+    hits = np.sign(result['predictions'] - close[rows]) == np.sign(y[rows] - close[rows])
+    summary = {
+        'window': window,
+        'train_size': train_size,
+        'step': step,
+        'folds': len(folds),
+        'test_rows': int(len(rows)),
+        'mse': float(np.mean(err ** 2)),
+        'mae': float(np.mean(np.abs(err))),
+        'directional_accuracy': float(np.mean(hits)),
+        'strategy_return_pct': float((equity[-1] - 1) * 100),
+        'buy_and_hold_return_pct': float((y[rows[-1]] / close[rows[0]] - 1) * 100),
+    }
+    return {'summary': summary, 'folds': fold_report}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Walk-forward backtest of the next-close model")
+    parser.add_argument('--data', default=DATA_PATH)
+    parser.add_argument('--window', choices=['expanding', 'rolling'], default='expanding')
+    parser.add_argument('--train-size', type=int, default=1000)
+    parser.add_argument('--step', type=int, default=20, help="rows between refits (test fold length)")
+    parser.add_argument('--n-jobs', type=int, default=1, help="-1 uses every core")
+    parser.add_argument('--allow-short', action='store_true')
+    parser.add_argument('--output', help="write the full report as JSON")
+    args = parser.parse_args()
+
+    report = walk_forward(load_frame(args.data), args.train_size, args.step, args.window,
+                          args.n_jobs, args.allow_short)
+    for key, value in report['summary'].items():
+        print(f"{key}: {value}")
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Report saved at {args.output}")
@@ -0,0 +1,156 @@
+import argparse
+import json
+import os
+import numpy as np
+import pandas as pd
+from ml.stages import timed_stage
+
+# ------------------ COLUMNAR PRICE STORE ------------------
+# One directory per series under data/store/, one .npy file per column:
+#   Date.npy            int32 days since 1970-01-01
+#   Open/High/... .npy  float64
+#   meta.json           row count, columns and the source file it came from
+# Readers memory-map the columns, so a cold start costs a few page faults
+# instead of a CSV/XLSX parse and every worker shares the OS page cache.
+
+STORE_DIR = os.path.join('data', 'store')
+META_FILE = 'meta.json'
+
+
+def store_path(source, store_dir=STORE_DIR):
+    name = os.path.splitext(os.path.basename(source))[0]
+    return os.path.join(store_dir, name)
+
+
+def file_signature(path):
+    st = os.stat(path)
+    return [st.st_mtime_ns, st.st_size]
+
+
+def read_meta(dest):
+    try:
+        with open(os.path.join(dest, META_FILE)) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def is_fresh(dest, source):
+    # Usable when it was built from the current source file, or when the
+    # source is gone and the store is all that ships.
+    meta = read_meta(dest)
+    if meta is None:
+        return False
+    if not os.path.exists(source):
+        return True
+    return meta.get('source_signature') == file_signature(source)
+
+
+def _normalize_columns(df):
+    # yahoo_data.xlsx uses 'Close*' / 'Adj Close**'
+    df.columns = df.columns.str.strip().str.replace('*', '', regex=False).str.replace(' ', '_')
+    return df
+
+
+def read_source(source):
+    # The one parse of a CSV/XLSX history. The app (app/market_data.py),
+    # ingest() and load_frame() all go through it, so a store is a cache of
+    # exactly what reading the source directly returns.
+    if os.path.splitext(source)[1].lower() in ('.xls', '.xlsx'):
+        df = pd.read_excel(source)
+    else:
+        try:
+            df = pd.read_csv(source, encoding='utf-8-sig')
+        except UnicodeDecodeError:
+            df = pd.read_csv(source, encoding='ISO-8859-1')
+    return normalize_prices(df)
+
+
+def normalize_prices(df):
+    # Unnamed columns dropped, names normalized, Date parsed day first,
+    # non-numeric columns dropped, prices as float64, rows with a missing
+    # date or price dropped, sorted by Date
+    df = _normalize_columns(df.loc[:, ~df.columns.str.contains('^Unnamed')])
+    if 'Date' not in df.columns:
+        raise ValueError("Price history has no Date column.")
+    frame = {'Date': pd.to_datetime(df['Date'], errors='coerce', dayfirst=True)}
+    for name in df.columns.drop('Date'):
+        values = pd.to_numeric(df[name], errors='coerce')
+        if not values.isna().all():
+            frame[name] = values.astype(np.float64)
+    df = pd.DataFrame(frame).dropna(how='any')
+    return df.sort_values('Date', kind='stable').reset_index(drop=True)
+
+
+def to_columns(df):
+    # A normalized frame as stored: Date as int32 days, prices float64
+    columns = {'Date': df['Date'].to_numpy().astype('datetime64[D]').astype(np.int32)}
+    columns.update((name, df[name].to_numpy(dtype=np.float64)) for name in df.columns.drop('Date'))
+    return columns
+
+
+def _atomic_save(path, array):
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    with open(tmp_path, 'wb') as f:
+        np.save(f, array)
+    os.replace(tmp_path, path)
+
+
+def ingest(source, dest=None):
+    dest = dest or store_path(source)
+    df = read_source(source)
+    columns = to_columns(df)
+
+    os.makedirs(dest, exist_ok=True)
+    for name, values in columns.items():
+        _atomic_save(os.path.join(dest, f'{name}.npy'), values)
+
+    # meta.json goes last: readers treat it as the commit marker
+    meta = {
+        'source': source,
+        'source_signature': file_signature(source),
+        'rows': int(len(df)),
+        'columns': list(columns),
+        'first_date': str(df['Date'].iloc[0].date()) if len(df) else None,
+        'last_date': str(df['Date'].iloc[-1].date()) if len(df) else None,
+    }
+    tmp_meta = os.path.join(dest, f'{META_FILE}.tmp-{os.getpid()}')
+    with open(tmp_meta, 'w') as f:
+        json.dump(meta, f, indent=2)
+    os.replace(tmp_meta, os.path.join(dest, META_FILE))
+    return meta
+
+
+def open_columns(dest, mmap=True):
+    meta = read_meta(dest)
+    if meta is None:
+        raise FileNotFoundError(f"No columnar store at {dest}. Run: python -m ml.columnar_store <source>")
+    mode = 'r' if mmap else None
+    return {name: np.load(os.path.join(dest, f'{name}.npy'), mmap_mode=mode) for name in meta['columns']}
+
+
+def days_to_datetime(days):
+    return pd.to_datetime(np.asarray(days, dtype='int64'), unit='D')
+
+
+@timed_stage('load_frame')
+def load_frame(source):
+    # Training-side loader: Date as datetime, numeric columns memory-mapped.
+    # Falls back to parsing the source when no fresh store exists.
+    dest = store_path(source)
+    columns = open_columns(dest) if is_fresh(dest, source) else to_columns(read_source(source))
+    frame = {'Date': days_to_datetime(columns.pop('Date'))}
+    frame.update(columns)
+    return pd.DataFrame(frame, copy=False)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert CSV/XLSX price history into the columnar store")
+    parser.add_argument('sources', nargs='+', help="CSV or XLSX files")
+    parser.add_argument('--store-dir', default=STORE_DIR)
+    args = parser.parse_args()
+
+    for source in args.sources:
+        dest = store_path(source, args.store_dir)
+        meta = ingest(source, dest)
+        print(f"{source} -> {dest} ({meta['rows']} rows, columns: {', '.join(meta['columns'])})")
@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+from ml.rolling import RollingWindow
+from ml.stages import timed_stage
+
+# ------------------ FEATURE PIPELINE ------------------
+# Single definition of the model inputs, shared by training (ml/train_model.py,
+# ml/backtest.py) and serving (app/routes.py). Each feature declares how many
+# rows of history it needs, so serving can compute the latest row from a short
+# tail of the series instead of the whole history.
+
+
+class Feature:
+    def __init__(self, name, lookback, compute):
+        self.name = name
+        self.lookback = lookback  # rows needed, including the current one
+        self.compute = compute
+
+
+def _percent_change(df):
+    return ((df['Close'] - df['Open']) / df['Open']) * 100
+
+
+FEATURES = [
+    Feature('Open', 1, lambda df: df['Open']),
+    Feature('High', 1, lambda df: df['High']),
+    Feature('Low', 1, lambda df: df['Low']),
+    Feature('Daily_Change', 1, lambda df: df['Close'] - df['Open']),
+    Feature('Percent_Change', 1, _percent_change),
+    Feature('MA_7', 7, lambda df: df['Close'].rolling(window=7).mean()),
+    Feature('MA_30', 30, lambda df: df['Close'].rolling(window=30).mean()),
+    Feature('Volatility', 7, lambda df: _percent_change(df).rolling(window=7).std()),
+]
+
+FEATURE_NAMES = [f.name for f in FEATURES]
+MAX_LOOKBACK = max(f.lookback for f in FEATURES)
+
+
+@timed_stage('features')
+def compute_features(df):
+    # Full materialization (training, backtests, batch scoring): the input
+    # frame plus one column per feature, rows without a full history dropped
+    df = df.copy()
+    for feature in FEATURES:
+        df[feature.name] = feature.compute(df)
+    return df.dropna()
+
+
+@timed_stage('features_latest')
+def latest_features(df, rows=1):
+    # Feature matrix for the last `rows` rows, computed from only the
+    # MAX_LOOKBACK + rows - 1 rows they depend on. Returns None when any of
+    # those rows can't be computed (too little history or bad prices), in
+    # which case callers fall back to compute_features().
+    tail = df.iloc[-(MAX_LOOKBACK + rows - 1):]
+    X = pd.DataFrame({f.name: f.compute(tail) for f in FEATURES}).iloc[-rows:]
+    if len(X) < rows or X.isna().any().any():
+        return None
+    return X.to_numpy()
+
+
+class IncrementalFeatures:
+    # The same features, updated in O(1) per appended bar: seeded from the
+    # last MAX_LOOKBACK rows, then push() one (open, high, low, close) at a
+    # time. Used to roll forecasts forward without rebuilding a frame per
+    # step; keep in step with FEATURES (checked against it below).
+    NAMES = ['Open', 'High', 'Low', 'Daily_Change', 'Percent_Change', 'MA_7', 'MA_30', 'Volatility']
+
+    def __init__(self, df):
+        tail = df.iloc[-MAX_LOOKBACK:]
+        closes = tail['Close'].to_numpy(dtype=float)
+        pct = _percent_change(tail).to_numpy(dtype=float)
+        self.ma_7 = RollingWindow(7, closes[-7:])
+        self.ma_30 = RollingWindow(30, closes[-30:])
+        self.volatility = RollingWindow(7, pct[-7:])
+        last = tail.iloc[-1]
+        self.close = float(last['Close'])
+        self.row = self._row(float(last['Open']), float(last['High']), float(last['Low']), self.close, pct[-1])
+
+    def _row(self, open_, high, low, close, pct):
+        return np.array([open_, high, low, close - open_, pct, self.ma_7.mean(), self.ma_30.mean(),
+                         self.volatility.std()])
+
+    def push(self, open_, high, low, close):
+        pct = (close - open_) / open_ * 100
+        self.ma_7.push(close)
+        self.ma_30.push(close)
+        self.volatility.push(pct)
+        self.close = close
+        self.row = self._row(open_, high, low, close, pct)
+        return self.row
+
+
+if IncrementalFeatures.NAMES != FEATURE_NAMES:
+    raise RuntimeError("IncrementalFeatures is out of date with FEATURES in ml/features.py.")
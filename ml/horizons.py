@@ -0,0 +1,67 @@
+import re
+import numpy as np
+from ml.features import FEATURE_NAMES, IncrementalFeatures
+
+# ------------------ MULTI-STEP FORECASTS ------------------
+# Two ways to forecast the close N trading days ahead:
+#   recursive - the next-close model applied N times, each prediction fed
+#               back as a synthetic bar (open = previous close, high/low =
+#               the pair's max/min) through IncrementalFeatures, so a step
+#               costs O(1) feature updates plus one predict on one row;
+#   direct    - one model per horizon, trained to map today's features to
+#               the close h days later (artifacts direct_h<h>.pkl, written
+#               by ml/train_model.py next to the next-close model).
+
+HORIZONS = (1, 5, 20, 60)
+DIRECT_HORIZONS = (5, 20, 60)
+MAX_HORIZON = max(HORIZONS)
+STRATEGIES = ('recursive', 'direct')
+DIRECT_FILE = 'direct_h{}.pkl'
+_DIRECT_PATTERN = re.compile(r'^direct_h(\d+)\.pkl$')
+
+
+def direct_file(horizon):
+    return DIRECT_FILE.format(horizon)
+
+
+def direct_horizon(filename):
+    # 20 for 'direct_h20.pkl', None for anything else
+    match = _DIRECT_PATTERN.match(filename)
+    return int(match.group(1)) if match else None
+
+
+def recursive_forecast(df, predict, steps=MAX_HORIZON):
+    # df: recent raw rows (at least MAX_LOOKBACK); predict: raw feature rows ->
+    # next closes. Returns the predicted closes for days 1..steps.
+    state = IncrementalFeatures(df)
+    closes = np.empty(steps)
+    for step in range(steps):
+        close = float(predict(state.row[None, :])[0])
+        previous = state.close
+        state.push(previous, max(previous, close), min(previous, close), close)
+        closes[step] = close
+    return closes
+
+
+def train_direct(df, horizons=DIRECT_HORIZONS):
+    # df: output of compute_features(). One scaled linear model per horizon,
+    # same recipe as the next-close model.
+    from sklearn.linear_model import LinearRegression
+    from sklearn.preprocessing import MinMaxScaler
+
+    X_all = df[FEATURE_NAMES].to_numpy()
+    close = df['Close'].to_numpy()
+    artifacts = {}
+    for h in horizons:
+        if len(df) <= h + 1:
+            continue
+        X, y = X_all[:-h], close[h:].reshape(-1, 1)
+        scaler_X, scaler_y = MinMaxScaler(), MinMaxScaler()
+        model = LinearRegression().fit(scaler_X.fit_transform(X), scaler_y.fit_transform(y))
+        artifacts[direct_file(h)] = {'horizon': h, 'model': model, 'scaler_X': scaler_X, 'scaler_y': scaler_y}
+    return artifacts
+
+
+def predict_direct(artifact, X):
+    pred_scaled = artifact['model'].predict(artifact['scaler_X'].transform(X))
+    return artifact['scaler_y'].inverse_transform(np.reshape(pred_scaled, (-1, 1)))[:, 0]
@@ -4,23 +4,32 @@ import pandas as pd
 from sklearn.linear_model import LinearRegression
 from sklearn.metrics import mean_squared_error
 import joblib
-from ml.model_utils import load_data, preprocess_data, plot_stock
+from ml.model_utils import preprocess_data, plot_stock
+from ml.columnar_store import load_frame
+from ml.stages import timed_stage
+from ml.windowing import lag_windows
 
 
-def create_dataset(data, look_back=1):
-  
-    X, y = [], []
-    for i in range(len(data) - look_back):
-        X.append(data[i:(i + look_back), 0])
-        y.append(data[i + look_back, 0])
-    return np.array(X), np.array(y)
+@timed_stage('create_dataset')
+def create_dataset(data, look_back=1, horizon=1):
+    # Strided views, see ml/windowing.py; y stays 1-D for a single-step target
+    X, y = lag_windows(data, look_back, horizon)
+    return X, (y[:, 0] if horizon == 1 else y)
+
+# None: no chart, 'show': open a window (blocks until closed), any other
+# value: save the chart to that path without a display
+TRAINING_PLOT = os.environ.get('TRAINING_PLOT') or None
+
 
-def train_model(file_path, look_back=5, save_model_path='ml/models/linear_model.pkl'):
+def train_model(file_path, look_back=5, save_model_path='ml/models/linear_model.pkl', plot=TRAINING_PLOT):
 
-    df = load_data(file_path)
+    df = load_frame(file_path)
     print("Data loaded successfully!")
 
-    plot_stock(df, column='Close')
+    if plot == 'show':
+        plot_stock(df, column='Close')
+    elif plot:
+        print(f"Price chart saved at {plot_stock(df, column='Close', path=plot)}")
 
     data, scaler = preprocess_data(df, column='Close', scale=True)
     
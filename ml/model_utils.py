@@ -1,11 +1,12 @@
-import pandas as pd
-import matplotlib.pyplot as plt
-import os
-from sklearn.preprocessing import MinMaxScaler
-
 import os
 import pandas as pd
+from ml.stages import timed_stage
 
+# matplotlib and scikit-learn are imported inside the functions that need
+# them, so load_data() alone does not pay ~1s of imports. The app and the
+# columnar store read sources with ml/columnar_store.read_source().
+
+@timed_stage('load_data')
 def load_data(file_path):
     if not os.path.exists(file_path):
         raise FileNotFoundError(f"{file_path} not found.")
@@ -45,11 +46,19 @@ def preprocess_data(df, column='Close*', scale=True):
     data = df[[column]].values
     scaler = None
     if scale:
+        from sklearn.preprocessing import MinMaxScaler
         scaler = MinMaxScaler(feature_range=(0,1))
         data = scaler.fit_transform(data)
     return data, scaler
 
-def plot_stock(df, column='Close*'):
+def plot_stock(df, column='Close*', path=None):
+    # Saves the chart to `path` with the non-interactive Agg backend (safe on
+    # servers and in scheduled jobs); without a path it opens a window.
+    import matplotlib
+    if path is not None:
+        matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
     plt.figure(figsize=(12,6))
     plt.plot(df['Date'], df[column], label=f'{column} Price')
     plt.xlabel("Date")
@@ -57,4 +66,8 @@ def plot_stock(df, column='Close*'):
     plt.title(f"{column} Price Trend")
     plt.legend()
     plt.grid(True)
+    if path is not None:
+        plt.savefig(path, dpi=100, bbox_inches='tight')
+        plt.close()
+        return path
     plt.show()
@@ -0,0 +1,42 @@
+import math
+from collections import deque
+
+# ------------------ ROLLING WINDOWS ------------------
+# O(1) rolling mean/std for incremental updates: the trend indicator engine
+# (app/indicators.py), live bars (app/streaming.py) and recursive forecasts
+# (ml/horizons.py).
+
+
+class RollingWindow:
+    # Fixed-size window keeping running sum and sum of squares
+
+    def __init__(self, size, values=()):
+        self.size = size
+        self.values = deque(maxlen=size)
+        self.total = 0.0
+        self.total_sq = 0.0
+        for value in values:
+            self.push(value)
+
+    def push(self, value):
+        if len(self.values) == self.size:
+            old = self.values[0]
+            self.total -= old
+            self.total_sq -= old * old
+        self.values.append(value)
+        self.total += value
+        self.total_sq += value * value
+
+    @property
+    def full(self):
+        return len(self.values) == self.size
+
+    def mean(self):
+        return self.total / self.size if self.full else math.nan
+
+    def std(self):
+        # Sample std (ddof=1), same as pandas rolling().std()
+        if not self.full:
+            return math.nan
+        var = (self.total_sq - self.total * self.total / self.size) / (self.size - 1)
+        return math.sqrt(max(var, 0.0))
@@ -0,0 +1,233 @@
+import argparse
+import itertools
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+from sklearn.ensemble import GradientBoostingRegressor
+from sklearn.linear_model import Lasso, LinearRegression, Ridge
+from sklearn.model_selection import TimeSeriesSplit
+from sklearn.neighbors import KNeighborsRegressor
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import MinMaxScaler
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from ml.artifacts import atomic_dump
+from ml.columnar_store import load_frame
+from ml.features import FEATURE_NAMES, compute_features
+from ml.symbols import DEFAULT_SYMBOL, model_dir, normalize_symbol, resolve_symbol
+from ml.windowing import lag_windows
+
+# ------------------ MODEL SEARCH ------------------
+# Scores every combination of model family/hyper-parameters, look-back
+# (number of past closes added as inputs) and feature subset with
+# TimeSeriesSplit cross-validation on a process pool.
+#
+# The design matrix is built once, for the longest look-back and every
+# feature, and placed in shared memory; workers attach to it by name and take
+# column/row views per candidate, so nothing but the candidate spec is pickled
+# per task. All candidates are scored on the same rows and folds.
+#
+# Models predict the next day's change in close; scores are on the implied
+# next close, in price units. Writes ml/models/[SYMBOL/]search_leaderboard.json
+# and the winner, refitted on all rows, as search_best.pkl.
+
+FAMILIES = {
+    'linear': (LinearRegression, [{}]),
+    'ridge': (Ridge, [{'alpha': a} for a in (0.1, 1.0, 10.0)]),
+    'lasso': (Lasso, [{'alpha': a, 'max_iter': 10000} for a in (0.01, 0.1, 1.0)]),
+    'gbm': (GradientBoostingRegressor, [{'n_estimators': 200, 'max_depth': d, 'learning_rate': 0.05,
+                                         'subsample': 0.8, 'random_state': 0} for d in (2, 3)]),
+    'knn': (KNeighborsRegressor, [{'n_neighbors': k, 'weights': 'distance'} for k in (5, 20, 50)]),
+}
+LOOK_BACKS = (0, 5, 10, 20)
+FEATURE_SUBSETS = {
+    'all': FEATURE_NAMES,
+    'price': ['Open', 'High', 'Low'],
+    'technical': ['Daily_Change', 'Percent_Change', 'MA_7', 'MA_30', 'Volatility'],
+}
+N_SPLITS = 5
+LEADERBOARD_FILE = 'search_leaderboard.json'
+BEST_FILE = 'search_best.pkl'
+
+
+def lag_names(look_back):
+    # Close_lag_0 is today's close, Close_lag_1 yesterday's, ...
+    return [f'Close_lag_{i}' for i in range(look_back)]
+
+
+def build_search_design(df, max_look_back=max(LOOK_BACKS)):
+    # Columns: FEATURE_NAMES + Close_lag_0..max_look_back-1. Rows: days with
+    # every feature, the longest look-back and a next close available.
+    df = compute_features(df)
+    close = df['Close'].to_numpy(dtype=float)
+    base = df[FEATURE_NAMES].to_numpy(dtype=float)
+    skip = max(max_look_back - 1, 0)
+    if max_look_back:
+        lags, _ = lag_windows(close, max_look_back, horizon=1)  # rows end one day short
+        lags = lags[:, ::-1]  # newest first, so Close_lag_i is i days back
+        X = np.column_stack([base[skip:-1], lags])
+    else:
+        X = base[:-1]
+    target = close[skip + 1:] - close[skip:-1]
+    columns = FEATURE_NAMES + lag_names(max_look_back)
+    return np.ascontiguousarray(X), target, columns
+
+
+def candidates(families=None, look_backs=LOOK_BACKS, subsets=None):
+    for family in families or FAMILIES:
+        estimator, grid = FAMILIES[family]
+        for params, look_back, subset in itertools.product(grid, look_backs, subsets or FEATURE_SUBSETS):
+            yield {'family': family, 'params': params, 'look_back': look_back, 'features': subset}
+
+
+def make_model(candidate):
+    estimator, _ = FAMILIES[candidate['family']]
+    return make_pipeline(MinMaxScaler(), estimator(**candidate['params']))
+
+
+def candidate_columns(candidate, columns):
+    names = FEATURE_SUBSETS[candidate['features']] + lag_names(candidate['look_back'])
+    return [columns.index(name) for name in names], names
+
+
+# ---- Shared feature matrices ----
+_shared = {}
+_segments = []
+
+
+def _share(arrays):
+    # Copy each array into a named shared-memory block once; returns the
+    # (name, shape, dtype) specs workers attach with, and the blocks to free.
+    specs, blocks = {}, []
+    for key, array in arrays.items():
+        block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        np.ndarray(array.shape, array.dtype, buffer=block.buf)[...] = array
+        specs[key] = (block.name, array.shape, array.dtype.str)
+        blocks.append(block)
+    return specs, blocks
+
+
+def _attach(specs, columns, folds):
+    for key, (name, shape, dtype) in specs.items():
+        # Workers share the parent's resource tracker; the parent unlinks
+        block = shared_memory.SharedMemory(name=name)
+        _segments.append(block)  # keeps the mapping alive
+        _shared[key] = np.ndarray(shape, np.dtype(dtype), buffer=block.buf)
+    _shared.update(columns=columns, folds=folds)
+
+
+def _init_inline(arrays, columns, folds):
+    _shared.update(arrays, columns=columns, folds=folds)
+
+
+def _score(candidate):
+    X, target = _shared['X'], _shared['target']
+    cols, _ = candidate_columns(candidate, _shared['columns'])
+    X = X[:, cols]
+
+    t0 = time.perf_counter()
+    fold_mse, fold_mae, fold_hits = [], [], []
+    for train, test in _shared['folds']:
+        model = make_model(candidate)
+        model.fit(X[train], target[train])
+        change = model.predict(X[test])
+        err = change - target[test]  # same as predicted close - actual close
+        fold_mse.append(float(np.mean(err ** 2)))
+        fold_mae.append(float(np.mean(np.abs(err))))
+        fold_hits.append(float(np.mean(np.sign(change) == np.sign(target[test]))))
+
+    return {
+        **candidate,
+        'mse': float(np.mean(fold_mse)),
+        'mse_std': float(np.std(fold_mse)),
+        'mae': float(np.mean(fold_mae)),
+        'directional_accuracy': float(np.mean(fold_hits)),
+        'fold_mse': fold_mse,
+        'seconds': time.perf_counter() - t0,
+    }
+
+
+def search(df, families=None, look_backs=LOOK_BACKS, subsets=None, n_splits=N_SPLITS, n_jobs=1):
+    X, target, columns = build_search_design(df, max(look_backs))
+    folds = [(train, test) for train, test in TimeSeriesSplit(n_splits=n_splits).split(X)]
+    grid = list(candidates(families, look_backs, subsets))
+    n_jobs = os.cpu_count() if n_jobs in (None, -1) else max(1, n_jobs)
+    arrays = {'X': X, 'target': target}
+
+    if n_jobs == 1 or len(grid) == 1:
+        _init_inline(arrays, columns, folds)
+        results = [_score(candidate) for candidate in grid]
+    else:
+        specs, blocks = _share(arrays)
+        try:
+            with ProcessPoolExecutor(max_workers=min(n_jobs, len(grid)), initializer=_attach,
+                                     initargs=(specs, columns, folds)) as pool:
+                # Slow families first, so the tail of the run isn't one GBM fit
+                order = sorted(range(len(grid)), key=lambda i: grid[i]['family'] != 'gbm')
+                scored = pool.map(_score, [grid[i] for i in order])
+                results = [None] * len(grid)
+                for i, result in zip(order, scored):
+                    results[i] = result
+        finally:
+            for block in blocks:
+                block.close()
+                block.unlink()
+
+    leaderboard = sorted(results, key=lambda r: r['mse'])
+    return leaderboard, (X, target, columns)
+
+
+def fit_best(best, design):
+    X, target, columns = design
+    cols, names = candidate_columns(best, columns)
+    model = make_model(best)
+    model.fit(X[:, cols], target)
+    # Inputs: `features` (FEATURE_NAMES subset) then `look_back` past closes,
+    # newest first; output: predicted change from the latest close.
+    return {'model': model, 'inputs': names, 'family': best['family'], 'params': best['params'],
+            'look_back': best['look_back'], 'features': FEATURE_SUBSETS[best['features']],
+            'target': 'next_close_minus_close'}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cross-validated search over model families, look-backs and feature subsets")
+    parser.add_argument('--symbol', default=DEFAULT_SYMBOL)
+    parser.add_argument('--families', nargs='+', choices=sorted(FAMILIES))
+    parser.add_argument('--look-backs', nargs='+', type=int, default=list(LOOK_BACKS))
+    parser.add_argument('--subsets', nargs='+', choices=sorted(FEATURE_SUBSETS))
+    parser.add_argument('--splits', type=int, default=N_SPLITS)
+    parser.add_argument('--n-jobs', type=int, default=-1, help="-1 uses every core")
+    parser.add_argument('--top', type=int, default=10, help="rows of the leaderboard to print")
+    args = parser.parse_args()
+
+    symbol = normalize_symbol(args.symbol)
+    t0 = time.perf_counter()
+    leaderboard, design = search(load_frame(resolve_symbol(symbol)), args.families, tuple(args.look_backs),
+                                 args.subsets, args.splits, args.n_jobs)
+    elapsed = time.perf_counter() - t0
+
+    for rank, row in enumerate(leaderboard[:args.top], 1):
+        print(f"{rank:>3}. {row['family']:<7} {json.dumps(row['params']):<60} look_back={row['look_back']:<3} "
+              f"features={row['features']:<10} mse={row['mse']:.2f} mae={row['mae']:.2f} "
+              f"dir_acc={row['directional_accuracy']:.3f}")
+    print(f"{len(leaderboard)} candidates x {args.splits} folds in {elapsed:.1f}s")
+
+    directory = model_dir(symbol)
+    os.makedirs(directory, exist_ok=True)
+    leaderboard_path = os.path.join(directory, LEADERBOARD_FILE)
+    tmp_path = f"{leaderboard_path}.tmp-{os.getpid()}"
+    with open(tmp_path, 'w') as f:
+        json.dump({'symbol': symbol, 'splits': args.splits, 'seconds': elapsed, 'leaderboard': leaderboard}, f, indent=2)
+    os.replace(tmp_path, leaderboard_path)
+
+    best_path = os.path.join(directory, BEST_FILE)
+    atomic_dump(fit_best(leaderboard[0], design), best_path)
+    print(f"Leaderboard saved at {leaderboard_path}")
+    print(f"Best model ({leaderboard[0]['family']}) saved at {best_path}")
@@ -0,0 +1,47 @@
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+# ------------------ STAGE TIMERS ------------------
+# Named timers around the expensive steps (data load, feature engineering,
+# model load, predict, ...). Nothing is recorded until an observer is added:
+# the app registers one that feeds /metrics (app/instrumentation.py), scripts
+# can add their own, e.g. add_observer(lambda name, s: print(name, s)).
+
+_observers = []
+
+
+def add_observer(callback):
+    # callback(stage_name, seconds), called on the thread that ran the stage
+    if callback not in _observers:
+        _observers.append(callback)
+
+
+def remove_observer(callback):
+    if callback in _observers:
+        _observers.remove(callback)
+
+
+@contextmanager
+def stage(name):
+    if not _observers:
+        yield
+        return
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - t0
+        for callback in list(_observers):
+            callback(name, elapsed)
+
+
+def timed_stage(name):
+    # Decorator form of stage()
+    def decorate(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
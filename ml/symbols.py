@@ -0,0 +1,74 @@
+import os
+import threading
+
+# ------------------ SYMBOL DIRECTORY ------------------
+# NIFTY50 is the index series in data/nifty_50.csv. Every other symbol is one
+# file (partition) in data/symbols/, e.g. data/symbols/RELIANCE.csv, and can be
+# ingested into the columnar store like any other source. Models for NIFTY50
+# live in ml/models/; every other symbol gets ml/models/<SYMBOL>/.
+
+DEFAULT_SYMBOL = 'NIFTY50'
+DEFAULT_DATA_PATH = os.path.join('data', 'nifty_50.csv')
+SYMBOL_DIR = os.path.join('data', 'symbols')
+MODEL_DIR = os.path.join('ml', 'models')
+SOURCE_EXTENSIONS = ('.csv', '.xlsx', '.xls')
+
+
+class UnknownSymbol(KeyError):
+    def __str__(self):
+        return f"Unknown symbol: {self.args[0]}"
+
+
+def normalize_symbol(symbol):
+    return (symbol or DEFAULT_SYMBOL).strip().upper()
+
+
+# The directory listing is cached until data/symbols/ itself changes
+_index = {'signature': None, 'symbols': {}}
+_lock = threading.Lock()
+
+
+def _dir_signature(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def symbol_index(symbol_dir=SYMBOL_DIR):
+    signature = _dir_signature(symbol_dir)
+    if _index['signature'] == (symbol_dir, signature):
+        return _index['symbols']
+
+    with _lock:
+        symbols = {DEFAULT_SYMBOL: DEFAULT_DATA_PATH}
+        if signature is not None:
+            for name in sorted(os.listdir(symbol_dir)):
+                stem, ext = os.path.splitext(name)
+                if ext.lower() in SOURCE_EXTENSIONS:
+                    symbols.setdefault(normalize_symbol(stem), os.path.join(symbol_dir, name))
+        _index['symbols'] = symbols
+        _index['signature'] = (symbol_dir, signature)
+        return symbols
+
+
+def list_symbols():
+    return sorted(symbol_index())
+
+
+def resolve_symbol(symbol=None):
+    symbol = normalize_symbol(symbol)
+    try:
+        return symbol_index()[symbol]
+    except KeyError:
+        raise UnknownSymbol(symbol) from None
+
+
+def model_dir(symbol=None):
+    # Only symbols in the directory get a model path: the name comes from
+    # ?symbol= and must never reach the filesystem unchecked
+    symbol = normalize_symbol(symbol)
+    if symbol == DEFAULT_SYMBOL:
+        return MODEL_DIR
+    resolve_symbol(symbol)
+    return os.path.join(MODEL_DIR, symbol)
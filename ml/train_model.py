@@ -1,78 +1,93 @@
 import os
-import pandas as pd
-import numpy as np
-from sklearn.linear_model import LinearRegression
-from sklearn.preprocessing import MinMaxScaler
-import joblib
-
-# --- Paths ---
-DATA_PATH = os.path.join('data', 'nifty_50.csv')  # your dataset
-MODEL_DIR = os.path.join('ml', 'models')
-MODEL_PATH = os.path.join(MODEL_DIR, 'linear_model.pkl')
-SCALER_X_PATH = os.path.join(MODEL_DIR, 'scaler_X.pkl')
-SCALER_Y_PATH = os.path.join(MODEL_DIR, 'scaler_y.pkl')
-
-# Create models directory if it doesn't exist
-os.makedirs(MODEL_DIR, exist_ok=True)
-
-
-# --- Load Data ---
-df = pd.read_csv(DATA_PATH)
-df.columns = df.columns.str.strip().str.replace('*', '', regex=False).str.replace(' ', '_')
-
-df = pd.read_csv(DATA_PATH)
-
-try:
-    df = pd.read_csv(DATA_PATH, encoding='utf-8-sig')
-except UnicodeDecodeError:
-    # Fallback if utf-8 fails
-    df = pd.read_csv(DATA_PATH, encoding='ISO-8859-1')
-
-# Fix date parsing for Indian date format
-df['Date'] = pd.to_datetime(df['Date'], format='%d-%m-%Y')
-
-# Sort by date to make sure it's in order
-df = df.sort_values('Date')
-
-# Keep necessary columns
-df = df[['Date', 'Open', 'High', 'Low', 'Close']]
-
-# Convert Date and sort
-df['Date'] = pd.to_datetime(df['Date'])
-df = df.sort_values('Date')
-
-# --- Feature Engineering ---
-df['Daily_Change'] = df['Close'] - df['Open']
-df['Percent_Change'] = ((df['Close'] - df['Open']) / df['Open']) * 100
-df['MA_7'] = df['Close'].rolling(window=7).mean()
-df['MA_30'] = df['Close'].rolling(window=30).mean()
-df['Volatility'] = df['Percent_Change'].rolling(window=7).std()
-
-df = df.dropna()
-
-# --- Prepare Dataset ---
-features = ['Open', 'High', 'Low', 'Daily_Change', 'Percent_Change', 'MA_7', 'MA_30', 'Volatility']
-X = df[features].values
-y = df['Close'].shift(-1).dropna().values  # predict next day's close
-
-# Align X and y (since y shifted)
-X = X[:-1]
-y = y.reshape(-1, 1)
-
-# --- Scale Data ---
-scaler_X = MinMaxScaler()
-scaler_y = MinMaxScaler()
-X_scaled = scaler_X.fit_transform(X)
-y_scaled = scaler_y.fit_transform(y)
-
-# --- Train Model ---
-model = LinearRegression()
-model.fit(X_scaled, y_scaled)
-
-# --- Save Model and Scalers ---
-joblib.dump(model, MODEL_PATH)
-joblib.dump(scaler_X, SCALER_X_PATH)
-joblib.dump(scaler_y, SCALER_Y_PATH)
-
-print(f"Model saved at: {MODEL_PATH}")
-print("Training complete! You can now use the Predict Next Close Price page.")
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from ml.affine import AFFINE_FILE, AffineModel
+from ml.artifacts import publish
+from ml.columnar_store import file_signature, load_frame
+from ml.features import FEATURE_NAMES, compute_features
+from ml.horizons import train_direct
+from ml.symbols import DEFAULT_SYMBOL, model_dir, normalize_symbol, resolve_symbol
+
+MODEL_FILE = 'linear_model.pkl'
+SCALER_X_FILE = 'scaler_X.pkl'
+SCALER_Y_FILE = 'scaler_y.pkl'
+
+
+def data_signature(path):
+    # Identifies the training data a model was fitted on (see ml/artifacts.py)
+    try:
+        return file_signature(path)
+    except FileNotFoundError:
+        return None
+
+
+def train(df):
+    # scikit-learn is only needed here; the web app imports this module for
+    # its constants and must not pay for it
+    from sklearn.linear_model import LinearRegression
+    from sklearn.preprocessing import MinMaxScaler
+
+    # Keep necessary columns
+    df = df[['Date', 'Open', 'High', 'Low', 'Close']]
+
+    # --- Feature Engineering ---
+    # Defined once in ml/features.py, shared with the app's predict routes
+    df = compute_features(df)
+
+    # --- Prepare Dataset ---
+    features = FEATURE_NAMES
+    X = df[features].values
+    y = df['Close'].shift(-1).dropna().values  # predict next day's close
+
+    # Align X and y (since y shifted)
+    X = X[:-1]
+    y = y.reshape(-1, 1)
+
+    # --- Scale Data ---
+    scaler_X = MinMaxScaler()
+    scaler_y = MinMaxScaler()
+    X_scaled = scaler_X.fit_transform(X)
+    y_scaled = scaler_y.fit_transform(y)
+
+    # --- Train Model ---
+    model = LinearRegression()
+    model.fit(X_scaled, y_scaled)
+    artifacts = {MODEL_FILE: model, SCALER_X_FILE: scaler_X, SCALER_Y_FILE: scaler_y}
+
+    # --- Direct multi-step models (5/20/60 days ahead), see ml/horizons.py ---
+    direct = train_direct(df)
+    artifacts.update(direct)
+
+    # --- NumPy-only serving artifact, see ml/affine.py ---
+    artifacts[AFFINE_FILE] = AffineModel.from_sklearn(model, scaler_X, scaler_y, direct.values())
+    return artifacts
+
+
+def train_symbol(symbol=DEFAULT_SYMBOL, df=None):
+    # Trains on the symbol's current data and publishes a new model version.
+    # `df` lets callers that already hold the frame skip reloading it.
+    symbol = normalize_symbol(symbol)
+    data_path = resolve_symbol(symbol)
+    signature = data_signature(data_path)
+    if df is None:
+        # Memory-mapped from data/store/ when `python -m ml.columnar_store` has been run,
+        # otherwise parsed from the CSV (Indian dd-mm-YYYY dates, sorted by date).
+        df = load_frame(data_path)
+
+    directory = model_dir(symbol)
+    os.makedirs(directory, exist_ok=True)
+    return publish(directory, train(df), symbol=symbol, data_signature=signature,
+                   rows=int(len(df)), features=FEATURE_NAMES)
+
+
+if __name__ == "__main__":
+    # Usage: python ml/train_model.py [SYMBOL]   (defaults to NIFTY50)
+    SYMBOL = normalize_symbol(sys.argv[1] if len(sys.argv) > 1 else DEFAULT_SYMBOL)
+    manifest = train_symbol(SYMBOL)
+
+    print(f"Model version {manifest['version']} saved in: {model_dir(SYMBOL)}")
+    print("Training complete! You can now use the Predict Next Close Price page.")
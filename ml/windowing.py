@@ -0,0 +1,31 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# ------------------ SLIDING WINDOWS ------------------
+# Lag/target matrices as strided views over the original series: no Python
+# loop per row and no copy, so a look-back grid over a long history costs
+# the memory of the series itself. The views are read-only; call np.array()
+# on them if a writable copy is really needed.
+
+
+def _as_series(data):
+    data = np.asarray(data)
+    if data.ndim == 2:
+        # (n, 1) column as produced by preprocess_data
+        data = data[:, 0]
+    if data.ndim != 1:
+        raise ValueError("Expected a 1-D series or an (n, 1) column.")
+    return data
+
+
+def lag_windows(data, look_back, horizon=1, stride=1):
+    # X[i] = data[i : i+look_back], y[i] = data[i+look_back : i+look_back+horizon]
+    series = _as_series(data)
+    if look_back < 1 or horizon < 1:
+        raise ValueError("look_back and horizon must be at least 1.")
+    if len(series) < look_back + horizon:
+        empty = series[:0]
+        return empty.reshape(0, look_back), empty.reshape(0, horizon)
+    windows = sliding_window_view(series, look_back + horizon)[::stride]
+    return windows[:, :look_back], windows[:, look_back:]
+
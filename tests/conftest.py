@@ -0,0 +1,35 @@
+import os
+import sys
+import tempfile
+import pytest
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+os.chdir(PROJECT_ROOT)  # data/ and ml/models/ paths are relative
+
+# Set before the app modules read them at import
+_TMP = tempfile.mkdtemp(prefix='stock-dashboard-tests-')
+os.environ['USERS_DB_PATH'] = os.path.join(_TMP, 'users.db')
+os.environ['MARKET_DATA_PLANE_DIR'] = os.path.join(_TMP, 'plane')
+os.environ.pop('SCHEDULER_ENABLED', None)
+
+
+@pytest.fixture
+def app():
+    from app.app import create_app
+    app = create_app(scheduler=False)
+    app.config['TESTING'] = True
+    return app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def prices():
+    # NIFTY50 history as the app serves it
+    from app.market_data import get_symbol_data
+    return get_symbol_data('NIFTY50').frame
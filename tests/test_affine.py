@@ -0,0 +1,52 @@
+import os
+import numpy as np
+import pytest
+from ml.affine import AFFINE_FILE, AffineModel
+from ml.features import FEATURE_NAMES, compute_features
+
+joblib = pytest.importorskip('joblib')
+pytest.importorskip('sklearn')
+
+MODEL_DIR = os.path.join('ml', 'models')
+
+
+@pytest.fixture
+def pickles():
+    from ml.train_model import MODEL_FILE, SCALER_X_FILE, SCALER_Y_FILE
+    return [joblib.load(os.path.join(MODEL_DIR, name)) for name in (MODEL_FILE, SCALER_X_FILE, SCALER_Y_FILE)]
+
+
+@pytest.fixture
+def X(prices):
+    return compute_features(prices)[FEATURE_NAMES].to_numpy()
+
+
+def _pickled_predict(model, scaler_X, scaler_y, X):
+    return scaler_y.inverse_transform(model.predict(scaler_X.transform(X)).reshape(-1, 1))[:, 0]
+
+
+def test_fold_matches_the_pickles(pickles, X):
+    folded = AffineModel.from_sklearn(*pickles)
+    np.testing.assert_allclose(folded.predict(X), _pickled_predict(*pickles, X), rtol=1e-9)
+
+
+def test_shipped_affine_file_matches_the_pickles(pickles, X):
+    shipped = AffineModel.load(os.path.join(MODEL_DIR, AFFINE_FILE))
+    assert shipped.features == FEATURE_NAMES
+    np.testing.assert_allclose(shipped.predict(X), _pickled_predict(*pickles, X), rtol=1e-9)
+
+
+def test_direct_models_fold_and_round_trip(prices, pickles, tmp_path):
+    from ml.horizons import predict_direct, train_direct
+
+    df = compute_features(prices)
+    artifacts = train_direct(df, horizons=(5, 20))
+    folded = AffineModel.from_sklearn(*pickles, artifacts.values())
+    path = str(tmp_path / AFFINE_FILE)
+    folded.save(path)
+    loaded = AffineModel.load(path)
+
+    X = df[FEATURE_NAMES].to_numpy()
+    for artifact in artifacts.values():
+        expected = predict_direct(artifact, X)
+        np.testing.assert_allclose(loaded.predict_direct(X, artifact['horizon']), expected, rtol=1e-9)
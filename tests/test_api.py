@@ -0,0 +1,37 @@
+import gzip
+import json
+import pytest
+
+ENDPOINTS = ['/api/prices', '/api/indicators', '/api/volatility', '/api/similar']
+
+
+@pytest.mark.parametrize('path', ENDPOINTS)
+def test_revalidation_with_etag_returns_304(client, path):
+    first = client.get(path)
+    assert first.status_code == 200
+    etag = first.headers['ETag']
+    assert etag
+
+    again = client.get(path, headers={'If-None-Match': etag})
+    assert again.status_code == 304
+    assert again.data == b''
+    assert again.headers['ETag'] == etag
+
+
+def test_etag_depends_on_query_and_encoding(client):
+    plain = client.get('/api/prices?points=50')
+    other = client.get('/api/prices?points=60')
+    gzipped = client.get('/api/prices?points=50', headers={'Accept-Encoding': 'gzip'})
+    assert len({plain.headers['ETag'], other.headers['ETag'], gzipped.headers['ETag']}) == 3
+    assert client.get('/api/prices?points=60', headers={'If-None-Match': plain.headers['ETag']}).status_code == 200
+
+    assert gzipped.headers['Content-Encoding'] == 'gzip'
+    assert json.loads(gzip.decompress(gzipped.data)) == plain.get_json()
+
+
+def test_cached_body_is_identical(client):
+    assert client.get('/api/indicators').data == client.get('/api/indicators').data
+
+
+def test_unknown_symbol_is_404(client):
+    assert client.get('/api/prices?symbol=NOSUCHSYMBOL').status_code == 404
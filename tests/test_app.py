@@ -0,0 +1,23 @@
+import importlib
+from app import startup
+
+
+def test_importing_the_module_builds_no_app():
+    module = importlib.import_module('app.app')
+    assert not hasattr(module, 'app')
+
+
+def test_create_app_registers_every_blueprint(app):
+    assert {'auth_routes', 'finance_routes', 'api_routes', 'metrics_routes', 'stream_routes'} <= set(app.blueprints)
+
+
+def test_startup_probe_calls_the_factory():
+    report = startup.startup_report('app.app', '/help_desk')
+    assert report['status'] == 200
+    assert report['create_app_s'] >= 0
+    assert any(name == 'app.app' for name, _, _, _ in report['imports'])
+
+
+def test_wsgi_entry_serves():
+    from app.wsgi import app
+    assert app.test_client().get('/help_desk').status_code == 200
@@ -0,0 +1,16 @@
+import os
+from ml import artifacts
+
+
+def test_versions_sort_in_publish_order():
+    versions = [artifacts.new_version() for _ in range(200)]
+    assert versions == sorted(versions)
+    assert len(set(versions)) == len(versions)
+
+
+def test_prune_keeps_the_newest_versions(tmp_path):
+    directory = str(tmp_path)
+    published = [artifacts.publish(directory, {'a.pkl': n}, note=n)['version'] for n in range(6)]
+    kept = sorted(os.listdir(os.path.join(directory, artifacts.VERSIONS_DIR)))
+    assert kept == published[-artifacts.KEEP_VERSIONS:]
+    assert artifacts.read_manifest(directory)['version'] == published[-1]
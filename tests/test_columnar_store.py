@@ -0,0 +1,35 @@
+import pandas as pd
+import pytest
+from app.market_data import _from_columns, _read_source
+from ml.columnar_store import ingest, load_frame, open_columns, read_source
+
+
+@pytest.mark.parametrize('source', ['data/nifty_50.csv', 'data/yahoo_data.xlsx'])
+def test_store_is_a_cache_of_the_source_read(tmp_path, source):
+    ingest(source, str(tmp_path))
+    frame, timestamps = _read_source(source)
+    stored_frame, stored_timestamps = _from_columns(open_columns(str(tmp_path)))
+    pd.testing.assert_frame_equal(stored_frame, frame)
+    pd.testing.assert_series_equal(stored_timestamps, timestamps)
+
+
+def test_messy_csv_is_cleaned_the_same_way(tmp_path):
+    source = tmp_path / 'messy.csv'
+    source.write_text(
+        "Date,Open,High,Low,Close*,Note,Unnamed: 6\n"
+        "05-01-2021,2,3,1,2.5,a,\n"
+        "04-01-2021,1,2,0.5,1.5,b,\n"
+        "06-01-2021,,3,2,2.8,c,\n"
+        "not a date,1,1,1,1,d,\n"
+        "07-01-2021,3,4,2,3.5,e,\n"
+    )
+    df = read_source(str(source))
+    assert list(df.columns) == ['Date', 'Open', 'High', 'Low', 'Close']
+    assert df['Date'].dt.strftime('%d-%m-%Y').tolist() == ['04-01-2021', '05-01-2021', '07-01-2021']
+
+    dest = tmp_path / 'store'
+    ingest(str(source), str(dest))
+    frame, _ = _read_source(str(source))
+    stored, _ = _from_columns(open_columns(str(dest)))
+    pd.testing.assert_frame_equal(stored, frame)
+    pd.testing.assert_frame_equal(load_frame(str(source)), df, check_dtype=False)
@@ -0,0 +1,77 @@
+import os
+import shutil
+import numpy as np
+import pandas as pd
+import pytest
+from app import data_plane, market_data
+from app.indicators import SERIES, get_trend_indicators
+from app.market_data import _load, load_source, source_signature
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = str(tmp_path / 'plane_source.csv')
+    shutil.copy('data/nifty_50.csv', path)
+    return path
+
+
+@pytest.fixture
+def plane(monkeypatch):
+    monkeypatch.setattr(market_data, 'MARKET_DATA_PLANE', True)
+    yield data_plane.PLANE_DIR
+    shutil.rmtree(data_plane.PLANE_DIR, ignore_errors=True)
+    data_plane._pointers.clear()
+
+
+def test_plane_load_matches_the_source_load(source, plane):
+    pointer = data_plane.publish(source)
+    direct = load_source(source)
+    attached = _load(source, market_data._signature(source))
+
+    assert attached.plane is not None and attached.version == ('plane', pointer['version'])
+    pd.testing.assert_frame_equal(attached.frame, direct.frame, check_dtype=False)
+    pd.testing.assert_series_equal(attached.timestamps, direct.timestamps, check_dtype=False)
+
+    shared, computed = get_trend_indicators(attached), get_trend_indicators(direct)
+    for name in SERIES + ['prices']:
+        np.testing.assert_allclose(shared[name], computed[name], rtol=1e-12, err_msg=name)
+    assert list(shared['dates']) == list(computed['dates'])
+    assert list(shared['volume']) == list(computed['volume'])
+
+
+def test_api_bodies_match_with_and_without_the_plane(client, monkeypatch):
+    path = market_data.resolve_symbol('NIFTY50')
+    urls = ['/api/prices?points=0', '/api/indicators?points=0', '/api/volatility']
+    without = [client.get(url).data for url in urls]
+    monkeypatch.setattr(market_data, 'MARKET_DATA_PLANE', True)
+    try:
+        data_plane.publish(path)
+        assert market_data.get_market_data(path).plane is not None
+        assert [client.get(url).data for url in urls] == without
+    finally:
+        os.remove(data_plane.pointer_path(path))
+        data_plane._pointers.clear()
+
+
+def test_republished_between_pointer_read_and_attach(source, plane):
+    old = data_plane.publish(source)
+    new = data_plane.publish(source)
+    market = _load(source, ('plane', old['version']))
+    assert market.version == ('plane', new['version']) and market.plane is not None
+
+
+def test_unpublished_between_pointer_read_and_attach(source, plane):
+    pointer = data_plane.publish(source)
+    os.remove(os.path.join(plane, pointer['segment']))
+    os.remove(data_plane.pointer_path(source))
+    market = _load(source, ('plane', pointer['version']))
+    assert market.plane is None and market.version == source_signature(source)
+    assert len(market) == len(load_source(source))
+
+
+def test_republished_segments_prune_oldest_first(source, plane):
+    versions = [data_plane.publish(source, plane)['version'] for _ in range(data_plane.KEEP_SEGMENTS + 3)]
+    assert versions == sorted(versions)
+    prefix = f'{data_plane.plane_name(source)}-'
+    kept = sorted(name for name in os.listdir(plane) if name.startswith(prefix) and name.endswith('.plane'))
+    assert kept == [f'{prefix}{version}.plane' for version in versions[-data_plane.KEEP_SEGMENTS:]]
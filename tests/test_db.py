@@ -0,0 +1,55 @@
+import sqlite3
+import threading
+import pytest
+from app import db
+
+
+def test_connections_are_shared_and_bounded(tmp_path):
+    path = str(tmp_path / 'users.db')
+    db.init_db(path)
+    with db.connection(path) as conn:
+        first = conn
+    with db.connection(path) as conn:
+        assert conn is first  # returned to the pool and reused
+
+    errors = []
+
+    def query():
+        try:
+            for _ in range(20):
+                with db.connection(path) as conn:
+                    conn.execute('SELECT COUNT(*) FROM users').fetchone()
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=query) for _ in range(12)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors
+    assert len(db._idle[path]) <= db.POOL_SIZE
+    db.close_db(path)
+    assert path not in db._idle
+
+
+def test_failed_transaction_is_rolled_back_before_reuse(tmp_path):
+    path = str(tmp_path / 'users.db')
+    db.init_db(path)
+    with pytest.raises(RuntimeError), db.connection(path) as conn:
+        conn.execute("INSERT INTO users (username, password) VALUES ('a', 'x')")
+        raise RuntimeError
+    with db.connection(path) as conn:
+        assert not conn.in_transaction
+        assert conn.execute('SELECT COUNT(*) FROM users').fetchone() == (0,)
+    db.close_db(path)
+
+
+def test_queries(app):
+    user_id = db.create_user('alice', 'hash')
+    assert db.get_credentials('alice') == (user_id, 'hash')
+    with pytest.raises(sqlite3.IntegrityError):
+        db.create_user('alice', 'other')
+    db.create_profile(user_id, {'full_name': 'Alice', 'age': 30})
+    profile = db.get_profile(user_id)
+    assert profile['full_name'] == 'Alice' and profile['age'] == 30
@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+import pytest
+from app.downsample import lttb_indices, minmax_indices, view_indices
+
+
+@pytest.fixture
+def walk():
+    return np.cumsum(np.random.default_rng(3).normal(size=1000))
+
+
+@pytest.mark.parametrize('n_out', [3, 4, 50, 999])
+def test_lttb_keeps_endpoints_and_budget(walk, n_out):
+    picked = lttb_indices(walk, n_out)
+    assert len(picked) == n_out
+    assert picked[0] == 0 and picked[-1] == len(walk) - 1
+    assert (np.diff(picked) > 0).all()
+
+
+@pytest.mark.parametrize('n_out', [0, 1000, 5000])
+def test_lttb_returns_everything_when_budget_is_not_binding(walk, n_out):
+    np.testing.assert_array_equal(lttb_indices(walk, n_out), np.arange(len(walk)))
+
+
+@pytest.mark.parametrize('n_out', [2, 3, 50, 51, 998])
+def test_minmax_keeps_endpoints_and_extremes(walk, n_out):
+    picked = minmax_indices(walk, n_out)
+    assert len(picked) <= n_out
+    assert picked[0] == 0 and picked[-1] == len(walk) - 1
+    assert (np.diff(picked) > 0).all()
+    if n_out >= 4:
+        assert int(np.argmin(walk)) in picked
+        assert int(np.argmax(walk)) in picked
+
+
+def test_view_indices_respects_date_window(walk):
+    dates = pd.date_range('2020-01-01', periods=len(walk), freq='D')
+    start, end = '2020-03-01', '2021-02-28'
+    inside = np.flatnonzero((dates >= start) & (dates <= end))
+
+    for method in ('lttb', 'minmax'):
+        picked = view_indices(dates, walk, points=40, start=start, end=end, method=method)
+        assert 0 < len(picked) <= 40
+        assert picked[0] == inside[0] and picked[-1] == inside[-1]
+        assert (np.diff(picked) > 0).all()
+
+    window = walk[inside]
+    picked = view_indices(dates, walk, points=40, start=start, end=end, method='minmax')
+    assert inside[np.argmin(window)] in picked
+    assert inside[np.argmax(window)] in picked
+
+
+def test_view_indices_without_window_covers_the_series(walk):
+    dates = pd.date_range('2020-01-01', periods=len(walk), freq='D')
+    picked = view_indices(dates, walk, points=100)
+    assert len(picked) == 100
+    assert picked[0] == 0 and picked[-1] == len(walk) - 1
+    np.testing.assert_array_equal(view_indices(dates, walk, points=5000), np.arange(len(walk)))
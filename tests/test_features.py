@@ -0,0 +1,24 @@
+import numpy as np
+import pytest
+from ml.features import FEATURE_NAMES, MAX_LOOKBACK, IncrementalFeatures, compute_features, latest_features
+
+
+@pytest.mark.parametrize('rows', [1, 5, 60])
+def test_latest_features_match_the_full_frame(prices, rows):
+    full = compute_features(prices)[FEATURE_NAMES].to_numpy()
+    np.testing.assert_allclose(latest_features(prices, rows), full[-rows:], rtol=1e-12)
+
+
+def test_latest_features_need_full_history(prices):
+    assert latest_features(prices.tail(MAX_LOOKBACK - 1)) is None
+    assert latest_features(prices.tail(MAX_LOOKBACK)) is not None
+
+
+def test_incremental_features_match_the_full_frame(prices):
+    history = prices.iloc[:-50]
+    state = IncrementalFeatures(history)
+    full = compute_features(prices)[FEATURE_NAMES].to_numpy()
+    np.testing.assert_allclose(state.row, full[-51], rtol=1e-9)
+    for i, row in enumerate(prices.iloc[-50:].itertuples()):
+        state.push(row.Open, row.High, row.Low, row.Close)
+        np.testing.assert_allclose(state.row, full[-50 + i], rtol=1e-9, atol=1e-9)
@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+from ml.affine import AFFINE_FILE, AffineModel
+from ml.features import FEATURE_NAMES, MAX_LOOKBACK, compute_features
+from ml.horizons import direct_horizon, recursive_forecast
+
+
+@pytest.fixture
+def predict():
+    return AffineModel.load(f'ml/models/{AFFINE_FILE}').predict
+
+
+def _slow_forecast(df, predict, steps):
+    # Rebuilds the whole feature frame for every step
+    df = df[['Open', 'High', 'Low', 'Close']].reset_index(drop=True)
+    closes = []
+    for _ in range(steps):
+        X = compute_features(df)[FEATURE_NAMES].to_numpy()[-1:]
+        close = float(predict(X)[0])
+        previous = float(df['Close'].iloc[-1])
+        bar = {'Open': previous, 'High': max(previous, close), 'Low': min(previous, close), 'Close': close}
+        df = pd.concat([df, pd.DataFrame([bar])], ignore_index=True)
+        closes.append(close)
+    return np.array(closes)
+
+
+@pytest.mark.parametrize('steps', [1, 5, 60])
+def test_recursive_forecast_matches_a_full_rebuild(prices, predict, steps):
+    tail = prices.tail(MAX_LOOKBACK * 3)
+    np.testing.assert_allclose(recursive_forecast(tail, predict, steps), _slow_forecast(tail, predict, steps),
+                               rtol=1e-9)
+
+
+def test_direct_horizon_names():
+    assert direct_horizon('direct_h20.pkl') == 20
+    assert direct_horizon('linear_model.pkl') is None
+
+
+def test_dashboard_falls_back_to_recursive_without_direct_models(client):
+    from app.model_registry import get_model
+    assert not get_model('NIFTY50').direct  # the shipped model version
+    direct = client.get('/predict-dashboard?horizon=20&strategy=direct')
+    recursive = client.get('/predict-dashboard?horizon=20&strategy=recursive')
+    assert direct.status_code == 200
+    assert b'value="direct"' not in direct.data
+    assert direct.data == recursive.data
+
+
+def test_dashboard_offers_direct_when_the_model_has_it(client, monkeypatch):
+    from app import routes
+    from app.model_registry import AffineBundle
+
+    shipped = AffineModel.load(f'ml/models/{AFFINE_FILE}')
+    shipped.direct = {20: (shipped.coef, shipped.intercept + 100.0)}
+    monkeypatch.setattr(routes, 'get_model', lambda symbol: AffineBundle(shipped, 'with-direct'))
+    response = client.get('/predict-dashboard?horizon=20&strategy=direct')
+    assert response.status_code == 200
+    assert b'value="direct"' in response.data
+    assert b'value="direct" selected' in response.data
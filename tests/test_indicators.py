@@ -0,0 +1,30 @@
+import numpy as np
+import pytest
+from app.indicators import SERIES, TrendIndicators
+
+
+@pytest.mark.parametrize('split', [1, 30, 250, -1])
+def test_incremental_append_matches_full_pass(prices, split):
+    split = split % len(prices)
+    full = TrendIndicators(prices['Date'], prices['Close'])
+    incremental = TrendIndicators(prices['Date'][:split], prices['Close'][:split])
+    for date, close in zip(prices['Date'][split:], prices['Close'][split:]):
+        incremental.append(date, close)
+
+    assert incremental.dates == full.dates
+    for name in SERIES:
+        np.testing.assert_allclose(incremental.series[name], full.series[name], rtol=1e-9, atol=1e-7,
+                                   err_msg=name)
+    assert incremental.kpis() == pytest.approx(full.kpis())
+
+
+def test_append_from_empty_matches_full_pass(prices):
+    tail = prices.tail(300)
+    full = TrendIndicators(tail['Date'], tail['Close'])
+    incremental = TrendIndicators([], [])
+    for date, close in zip(tail['Date'], tail['Close']):
+        incremental.append(date, close)
+
+    for name in SERIES:
+        np.testing.assert_allclose(incremental.series[name], full.series[name], rtol=1e-9, atol=1e-7,
+                                   err_msg=name)
@@ -0,0 +1,46 @@
+import shutil
+import threading
+import time
+from app.market_data import get_market_data, refresh_market_data
+
+
+def _copy(tmp_path, name):
+    path = str(tmp_path / name)
+    shutil.copy('data/nifty_50.csv', path)
+    return path
+
+
+def test_refresh_does_not_block_other_symbols(tmp_path):
+    path, other = _copy(tmp_path, 'a.csv'), _copy(tmp_path, 'b.csv')
+    warming, release = threading.Event(), threading.Event()
+
+    def warm(market):
+        market.memo('warm', lambda: True)
+        warming.set()
+        release.wait(10)
+
+    refresh = threading.Thread(target=refresh_market_data, args=(path, None, warm))
+    refresh.start()
+    try:
+        assert warming.wait(10)
+        t0 = time.perf_counter()
+        assert len(get_market_data(other)) > 0
+        assert time.perf_counter() - t0 < 5
+    finally:
+        release.set()
+        refresh.join()
+    assert get_market_data(path).memo('warm', lambda: False) is True  # the warmed copy
+
+
+def test_refresh_skips_a_copy_outdated_while_warming(tmp_path):
+    path = _copy(tmp_path, 'c.csv')
+    before = len(get_market_data(path))
+
+    def warm(market):
+        with open(path, 'a') as f:
+            f.write('02-07-2021,15700,15800,15600,15750\n')
+
+    stale = refresh_market_data(path, warm=warm)
+    current = get_market_data(path)
+    assert len(stale) == before
+    assert current is not stale and len(current) == before + 1
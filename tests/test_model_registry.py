@@ -0,0 +1,140 @@
+import os
+import threading
+import numpy as np
+import pytest
+from app import model_registry
+from app.market_data import UnknownSymbol
+from app.model_registry import get_model
+from ml import artifacts, symbols
+
+
+@pytest.fixture(autouse=True)
+def fresh_registry():
+    model_registry.clear_cache()
+    yield
+    model_registry.clear_cache()
+
+
+@pytest.mark.parametrize('symbol', ['../../etc', '..', 'NIFTY50/../..', 'NOSUCHSYMBOL'])
+def test_unknown_symbols_never_reach_the_filesystem(client, monkeypatch, symbol):
+    touched = []
+    monkeypatch.setattr(model_registry, '_signature', lambda paths: touched.append(paths))
+    with pytest.raises(UnknownSymbol):
+        get_model(symbol)
+    assert client.get('/predict-dashboard', query_string={'symbol': symbol}).status_code == 404
+    assert touched == []
+
+
+def test_resident_bundles_are_capped(monkeypatch):
+    shipped = model_registry.model_paths()
+    index = {name: symbols.DEFAULT_DATA_PATH for name in ('NIFTY50', 'AAA', 'BBB', 'CCC')}
+    monkeypatch.setattr(symbols, 'symbol_index', lambda: index)
+    monkeypatch.setattr(model_registry, 'model_paths', lambda symbol: shipped)
+    monkeypatch.setattr(model_registry, 'MAX_RESIDENT_SYMBOLS', 2)
+    for symbol in ('AAA', 'BBB', 'AAA', 'CCC'):
+        get_model(symbol)
+    assert list(model_registry._bundles) == ['AAA', 'CCC']
+    assert os.path.exists(shipped[0])
+
+
+def _artifacts(tag):
+    # A model/scaler set whose three pieces all carry the same tag
+    from sklearn.linear_model import LinearRegression
+    from sklearn.preprocessing import StandardScaler
+    X = np.arange(12, dtype=float).reshape(6, 2) + tag
+    y = X.sum(axis=1) * (tag + 1)
+    scaler_X, scaler_y = StandardScaler().fit(X), StandardScaler().fit(y.reshape(-1, 1))
+    model = LinearRegression().fit(scaler_X.transform(X), scaler_y.transform(y.reshape(-1, 1))[:, 0])
+    parts = {model_registry.MODEL_FILE: model, model_registry.SCALER_X_FILE: scaler_X,
+             model_registry.SCALER_Y_FILE: scaler_y}
+    for part in parts.values():
+        part.tag = tag
+    return parts
+
+
+def _tags(bundle):
+    return bundle.model.tag, bundle.scaler_X.tag, bundle.scaler_y.tag
+
+
+@pytest.fixture
+def model_home(tmp_path, monkeypatch):
+    # NIFTY50's model directory, moved to a scratch dir
+    monkeypatch.setattr(model_registry, 'model_dir', lambda symbol: str(tmp_path))
+    monkeypatch.setattr(artifacts, 'KEEP_VERSIONS', 1000)
+    return str(tmp_path)
+
+
+def test_changed_flat_files_load_a_new_bundle(model_home):
+    for filename, obj in _artifacts(1).items():
+        artifacts.atomic_dump(obj, os.path.join(model_home, filename))
+    first = get_model()
+    assert get_model() is first
+    assert _tags(first) == (1, 1, 1)
+
+    for filename, obj in _artifacts(2).items():
+        artifacts.atomic_dump(obj, os.path.join(model_home, filename))
+    second = get_model()
+    assert second is not first
+    assert second.version != first.version
+    assert _tags(second) == (2, 2, 2)
+    X = np.array([[3.0, 4.0]])
+    assert second.predict(X)[0] != pytest.approx(first.predict(X)[0])
+
+
+def test_published_version_replaces_the_bundle(model_home):
+    artifacts.publish(model_home, _artifacts(1))
+    first = get_model()
+    artifacts.publish(model_home, _artifacts(2))
+    second = get_model()
+    assert second.version != first.version
+    assert _tags(second) == (2, 2, 2)
+
+
+def test_broken_artifact_keeps_the_previous_bundle(model_home):
+    artifacts.publish(model_home, _artifacts(1))
+    good = get_model()
+
+    manifest = artifacts.publish(model_home, _artifacts(2))
+    broken = artifacts.artifact_path(model_home, model_registry.MODEL_FILE, manifest)
+    with open(broken, 'wb') as f:
+        f.write(b'not a pickle')
+    assert get_model() is good
+
+    artifacts.publish(model_home, _artifacts(3))
+    assert _tags(get_model()) == (3, 3, 3)
+
+
+def test_first_load_failure_is_raised(model_home):
+    manifest = artifacts.publish(model_home, _artifacts(1))
+    with open(artifacts.artifact_path(model_home, model_registry.SCALER_Y_FILE, manifest), 'wb') as f:
+        f.write(b'not a pickle')
+    with pytest.raises(Exception):
+        get_model()
+
+
+def test_concurrent_readers_never_see_a_mixed_set(model_home):
+    artifacts.publish(model_home, _artifacts(0))
+    seen, errors = [], []
+    done = threading.Event()
+
+    def reader():
+        try:
+            while not done.is_set():
+                seen.append(_tags(get_model()))
+        except Exception as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=reader) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    try:
+        for tag in range(1, 16):
+            artifacts.publish(model_home, _artifacts(tag))
+    finally:
+        done.set()
+        for thread in threads:
+            thread.join()
+
+    assert errors == []
+    assert seen and all(len(set(tags)) == 1 for tags in seen)
+    assert _tags(get_model()) == (15, 15, 15)
@@ -0,0 +1,82 @@
+import threading
+import time
+import pytest
+from app import password_hashing
+from app.password_hashing import PasswordHashBusy, _HashPool
+
+
+def _slow(event):
+    event.wait(5)
+    return 'done'
+
+
+def test_timeout_raises_busy_and_frees_slots(monkeypatch):
+    monkeypatch.setattr(password_hashing, 'HASH_TIMEOUT_S', 0.05)
+    pool = _HashPool(workers=1, queue_limit=1)
+    release = threading.Event()
+    errors = []
+
+    def call():
+        try:
+            pool.run(_slow, release)
+        except PasswordHashBusy as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=call) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(errors) == 2  # one running past the timeout, one cancelled in the queue
+
+    release.set()
+    deadline = time.monotonic() + 5
+    while pool.stats()['in_progress'] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    stats = pool.stats()
+    assert stats['timed_out'] == 2 and stats['queue_depth'] == 0 and stats['in_progress'] == 0
+    # Both slots are back
+    monkeypatch.setattr(password_hashing, 'HASH_TIMEOUT_S', 5)
+    assert pool.run(str.upper, 'a') == 'A'
+    assert pool.run(str.upper, 'b') == 'B'
+
+
+def test_full_queue_is_rejected():
+    pool = _HashPool(workers=1, queue_limit=0)
+    release = threading.Event()
+    thread = threading.Thread(target=pool.run, args=(_slow, release))
+    thread.start()
+    try:
+        deadline = time.monotonic() + 5
+        while not pool.stats()['in_progress'] and time.monotonic() < deadline:
+            time.sleep(0.01)
+        with pytest.raises(PasswordHashBusy):
+            pool.run(str.upper, 'a')
+    finally:
+        release.set()
+        thread.join()
+
+
+@pytest.fixture
+def slow_hashing(monkeypatch):
+    monkeypatch.setattr(password_hashing, 'HASH_TIMEOUT_S', 0.05)
+    release = threading.Event()
+
+    def slow(*args, **kwargs):
+        release.wait(5)
+        return 'x'
+
+    monkeypatch.setattr(password_hashing, 'check_password_hash', slow)
+    monkeypatch.setattr(password_hashing, 'generate_password_hash', slow)
+    yield
+    release.set()
+
+
+def test_slow_login_answers_503(client, slow_hashing):
+    from app.db import create_user
+    create_user('slow-login', 'scrypt:32768:8:1$salt$hash')
+    assert client.post('/login', data={'username': 'slow-login', 'password': 'secret'}).status_code == 503
+
+
+def test_slow_signup_answers_503(client, slow_hashing):
+    assert client.post('/signup', data={'username': 'slow-signup', 'password': 'secret'}).status_code == 503
@@ -0,0 +1,36 @@
+import pytest
+
+
+@pytest.mark.parametrize('body', [
+    {'dates': ['99-99-2021']},
+    {'dates': ['01-07-2021', 'yesterday']},
+    {'start': 'not a date'},
+    {'start': '2021-01-01', 'end': '31-31-2021'},
+    {'dates': '01-07-2021'},
+])
+def test_malformed_dates_are_rejected_with_400(client, body):
+    response = client.post('/predict-batch', json=body)
+    assert response.status_code == 400
+    assert 'error' in response.get_json()
+
+
+def test_missing_body_is_rejected_with_400(client):
+    assert client.post('/predict-batch', data='not json').status_code == 400
+    assert client.post('/predict-batch', json={}).status_code == 400
+
+
+def test_dates_and_missing(client, prices):
+    last = prices['Date'].iloc[-1]
+    response = client.post('/predict-batch', json={'dates': [last, '25-12-1985']})
+    assert response.status_code == 200
+    data = response.get_json()
+    assert [p['date'] for p in data['predictions']] == [last]
+    assert data['missing'] == ['25-12-1985']
+
+
+def test_range_matches_single_dates(client, prices):
+    dates = list(prices['Date'].iloc[-5:])
+    by_range = client.post('/predict-batch', json={'start': dates[0], 'end': dates[-1]}).get_json()
+    by_dates = client.post('/predict-batch', json={'dates': dates}).get_json()
+    assert by_range['predictions'] == by_dates['predictions']
+    assert by_range['count'] == 5
@@ -0,0 +1,155 @@
+import threading
+import time
+import pytest
+from app import market_data, response_cache, routes
+from app.response_cache import PAGE_CACHE, ResponseCache
+
+
+def _concurrently(n, target):
+    start = threading.Barrier(n)
+    results = [None] * n
+
+    def run(i):
+        start.wait()
+        results[i] = target()
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(n)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_concurrent_misses_compute_once():
+    cache = ResponseCache(max_entries=4)
+    calls = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.2)  # long enough for every thread to find the flight
+        return 'page'
+
+    results = _concurrently(10, lambda: cache.get_or_compute('key', compute))
+    assert results == ['page'] * 10
+    assert len(calls) == 1
+    assert cache.stats() == {'hits': 0, 'misses': 1, 'coalesced': 9, 'evictions': 0, 'entries': 1}
+
+
+def test_waiter_recomputes_when_the_leader_fails():
+    cache = ResponseCache()
+    leader_started, release = threading.Event(), threading.Event()
+
+    def failing():
+        leader_started.set()
+        release.wait(5)
+        raise RuntimeError("render failed")
+
+    errors = []
+
+    def lead():
+        try:
+            cache.get_or_compute('key', failing)
+        except RuntimeError as e:
+            errors.append(e)
+
+    leader = threading.Thread(target=lead)
+    leader.start()
+    assert leader_started.wait(5)
+    waiter_result = []
+    waiter = threading.Thread(target=lambda: waiter_result.append(cache.get_or_compute('key', lambda: 'own')))
+    waiter.start()
+    time.sleep(0.05)
+    release.set()
+    leader.join()
+    waiter.join()
+    assert len(errors) == 1
+    assert waiter_result == ['own']
+    assert cache.stats()['entries'] == 0  # neither the error nor the waiter's result was stored
+
+
+def test_waiter_recomputes_after_flight_timeout(monkeypatch):
+    monkeypatch.setattr(response_cache, 'FLIGHT_TIMEOUT_S', 0.05)
+    cache = ResponseCache()
+    leader_started, release = threading.Event(), threading.Event()
+
+    def stuck():
+        leader_started.set()
+        release.wait(5)
+        return 'late'
+
+    leader = threading.Thread(target=cache.get_or_compute, args=('key', stuck))
+    leader.start()
+    assert leader_started.wait(5)
+    t0 = time.perf_counter()
+    assert cache.get_or_compute('key', lambda: 'own') == 'own'
+    assert time.perf_counter() - t0 < 2
+    release.set()
+    leader.join()
+    assert cache.get_or_compute('key', lambda: 'unused') == 'late'
+
+
+def test_uncacheable_results_are_not_stored():
+    cache = ResponseCache()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return ('error', 500)
+
+    for _ in range(2):
+        assert cache.get_or_compute('key', compute, lambda result: result[1] == 200) == ('error', 500)
+    assert len(calls) == 2
+    assert cache.stats()['entries'] == 0
+
+
+def test_lru_eviction_and_counters():
+    cache = ResponseCache(max_entries=2)
+    cache.get_or_compute('a', lambda: 1)
+    cache.get_or_compute('b', lambda: 2)
+    assert cache.get_or_compute('a', lambda: None) == 1  # a is now most recent
+    cache.get_or_compute('c', lambda: 3)  # evicts b
+    assert cache.get_or_compute('a', lambda: None) == 1
+    assert cache.get_or_compute('b', lambda: 'again') == 'again'
+    assert cache.stats() == {'hits': 2, 'misses': 4, 'coalesced': 0, 'evictions': 2, 'entries': 2}
+
+
+class _Versioned:
+    # A model bundle under a different version
+    def __init__(self, bundle, version):
+        self._bundle = bundle
+        self.version = version
+
+    def __getattr__(self, name):
+        return getattr(self._bundle, name)
+
+
+@pytest.fixture
+def page_cache():
+    PAGE_CACHE.clear()
+    yield PAGE_CACHE
+    PAGE_CACHE.clear()
+
+
+def test_new_data_version_misses(client, page_cache, monkeypatch):
+    first = client.get('/trend-dashboard')
+    hits = page_cache.stats()['hits']
+    assert client.get('/trend-dashboard').data == first.data
+    assert page_cache.stats()['hits'] == hits + 1
+
+    signature = market_data._signature
+    monkeypatch.setattr(market_data, '_signature', lambda path: ('reloaded', signature(path)))
+    misses = page_cache.stats()['misses']
+    assert client.get('/trend-dashboard').status_code == 200
+    assert page_cache.stats()['misses'] == misses + 1
+
+
+def test_new_model_version_misses(client, page_cache, monkeypatch):
+    assert client.get('/predict-dashboard').status_code == 200
+    client.get('/predict-dashboard')
+    hits, misses = page_cache.stats()['hits'], page_cache.stats()['misses']
+
+    get_model = routes.get_model
+    monkeypatch.setattr(routes, 'get_model', lambda symbol: _Versioned(get_model(symbol), 'retrained'))
+    assert client.get('/predict-dashboard').status_code == 200
+    assert page_cache.stats()['misses'] == misses + 1 and page_cache.stats()['hits'] == hits
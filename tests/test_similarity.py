@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+import pytest
+from app.market_data import MarketData
+from app.similarity import WindowIndex, _pick, dtw_distances, find_similar, similar_periods, znorm
+
+
+def _series(n=600, seed=0):
+    rng = np.random.default_rng(seed)
+    return 100 + np.cumsum(rng.normal(size=n))
+
+
+def _market(closes):
+    dates = pd.date_range('2000-01-03', periods=len(closes), freq='D').strftime('%d-%m-%Y')
+    return MarketData('synthetic.csv', pd.DataFrame({'Date': dates, 'Close': closes}), ('synthetic', len(closes)))
+
+
+def test_distance_profile_matches_brute_force():
+    values, m = _series(), 30
+    query = _series(m, seed=1)
+    index = WindowIndex(values, m)
+    windows = np.lib.stride_tricks.sliding_window_view(values, m)
+    brute = np.linalg.norm(znorm(windows) - znorm(query), axis=1)
+    np.testing.assert_allclose(index.distance_profile(query), brute, atol=1e-4)
+
+
+def _plain_dtw(a, b):
+    n, m = len(a), len(b)
+    cost = np.full((n + 1, m + 1), np.inf)
+    cost[0, 0] = 0
+    for i in range(1, n + 1):
+        for j in range(1, m + 1):
+            cost[i, j] = (a[i - 1] - b[j - 1]) ** 2 + min(cost[i - 1, j], cost[i, j - 1], cost[i - 1, j - 1])
+    return np.sqrt(cost[n, m])
+
+
+def test_unbanded_dtw_matches_the_plain_dynamic_program():
+    query = znorm(_series(20, seed=2))
+    candidates = znorm(np.stack([_series(20, seed=s) for s in range(3, 8)]))
+    expected = [_plain_dtw(query, candidate) for candidate in candidates]
+    np.testing.assert_allclose(dtw_distances(query, candidates, band=1.0), expected, rtol=1e-12)
+
+
+def test_dtw_of_identical_windows_is_zero():
+    query = znorm(_series(25))
+    assert dtw_distances(query, query[None, :])[0] == pytest.approx(0)
+
+
+def test_self_match_is_excluded():
+    closes = _series(800)
+    m, ahead = 30, 20
+    result = similar_periods(_market(closes), window=m, k=5, ahead=ahead)
+    assert result['matches']
+    query_start = len(closes) - m
+    for match in result['matches']:
+        start = pd.to_datetime(match['start'], format='%d-%m-%Y')
+        position = (start - pd.Timestamp('2000-01-03')).days
+        assert position + m <= query_start  # the match window ends before the query starts
+        assert len(match['next_closes']) == ahead
+
+
+def test_picks_do_not_overlap_by_half_a_window():
+    order = np.array([100, 105, 114, 115, 130, 90, 84])
+    assert _pick(order, 4, 15) == [100, 115, 130, 84]
+
+    values, m = _series(), 30
+    index = WindowIndex(values, m)
+    starts = [start for start, _ in find_similar(values[-m:], index, k=8, exclude_from=len(values) - m)]
+    assert all(abs(a - b) >= m // 2 for i, a in enumerate(starts) for b in starts[i + 1:])
+
+
+@pytest.mark.parametrize('dtw', [False, True])
+def test_flat_query_has_no_matches(dtw):
+    closes = np.concatenate([_series(500), np.full(30, 120.0)])
+    result = similar_periods(_market(closes), window=30, dtw=dtw)
+    assert result['matches'] == []
+    assert result['summary']['mean_return_pct'] is None
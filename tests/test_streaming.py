@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+from app import streaming
+from app.indicators import SERIES, TrendIndicators
+from app.streaming import LIVE_NAMES, LiveSeries
+
+
+@pytest.fixture(autouse=True)
+def no_live_series(monkeypatch):
+    monkeypatch.setattr(streaming, '_live', {})
+
+
+def _bars(n, start=0, interval=60):
+    closes = 100 + np.cumsum(np.sin(np.arange(n)))
+    return [(start + i * interval, c, c + 1, c - 1, c, 10.0) for i, c in enumerate(closes)]
+
+
+def test_intraday_indicators_use_only_the_feed():
+    series = LiveSeries('NIFTY50', interval=60)
+    bars = _bars(250)
+    for bar in bars:
+        series.add_bar(*bar)
+
+    closes = [bar[4] for bar in bars]
+    expected = TrendIndicators([streaming.format_time(bar[0]) for bar in bars], closes)
+    latest = series.snapshot()['indicators']
+    for name in SERIES:
+        assert latest[LIVE_NAMES.get(name, name)] == pytest.approx(expected.series[name][-1]), name
+    assert series.snapshot()['timeframe'] == '60s'
+    assert series.indicators.prices == closes  # no daily closes mixed in
+
+
+def test_indicators_are_null_until_their_window_fills():
+    series = LiveSeries('NIFTY50', interval=60)
+    for bar in _bars(25):
+        series.add_bar(*bar)
+    latest = series.snapshot()['indicators']
+    assert latest['ma20'] is not None and latest['bar_return'] is not None
+    assert latest['ma50'] is None and latest['ma200'] is None and latest['return_30_bars'] is None
+
+
+def test_out_of_order_and_repeated_bars_are_rejected():
+    series = LiveSeries('NIFTY50', interval=60)
+    series.add_bar(120, 1, 1, 1, 1)
+    for t in (120, 60):
+        with pytest.raises(ValueError):
+            series.add_bar(t, 1, 1, 1, 1)
+    series.add_tick(185, 2.0)  # forming bar at 180
+    with pytest.raises(ValueError):
+        series.add_bar(170, 1, 1, 1, 1)
+    series.add_bar(180, 3, 3, 3, 3)  # replaces the forming bar of the same period
+    assert series.snapshot()['forming'] is None
+    assert series.flush() is None
+    assert series.bars == 2 and series.rejected_bars == 3
+
+    series.add_tick(150, 5.0)  # before the last closed bar
+    assert series.snapshot()['late_ticks'] == 1
+
+
+def test_no_feed_no_series(client):
+    assert client.get('/stream/snapshot').status_code == 404
+    assert client.get('/stream/events').status_code == 404
+    assert client.get('/stream/symbols').get_json() == {'symbols': []}
+    assert streaming._live == {}
+
+
+def test_pushed_bars(client):
+    bars = [{'time': t, 'open': o, 'high': h, 'low': low, 'close': c} for t, o, h, low, c, _ in _bars(3)]
+    response = client.post('/stream/bars', json={'symbol': 'NIFTY50', 'bars': bars})
+    assert response.status_code == 200
+    assert client.get('/stream/symbols').get_json() == {'symbols': ['NIFTY50']}
+    assert client.get('/stream/snapshot').get_json()['bars'] == 3
+
+    response = client.post('/stream/bars', json={'symbol': 'NIFTY50', 'bars': bars[:1]})
+    assert response.status_code == 400
+    assert client.get('/stream/snapshot').get_json()['rejected_bars'] == 1
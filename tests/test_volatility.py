@@ -0,0 +1,125 @@
+import math
+import numpy as np
+import pandas as pd
+import pytest
+from app.market_data import DATA_PATH
+from app.volatility import (EWMA_LAMBDA, GARCH_ALPHA, GARCH_BETA, RANGE_WINDOW, REALIZED_WINDOWS, REGIMES,
+                            compute_volatility)
+
+
+@pytest.fixture
+def frame():
+    # 90 days of random OHLC; the first bars have no Open/High/Low like early NIFTY history
+    rng = np.random.default_rng(7)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, 90)))
+    open_ = close * np.exp(rng.normal(0, 0.01, 90))
+    high = np.maximum(open_, close) * np.exp(np.abs(rng.normal(0, 0.01, 90)))
+    low = np.minimum(open_, close) * np.exp(-np.abs(rng.normal(0, 0.01, 90)))
+    open_[:5] = high[:5] = low[:5] = 0
+    return pd.DataFrame({'Open': open_, 'High': high, 'Low': low, 'Close': close})
+
+
+def _returns(frame):
+    close = frame['Close'].to_numpy()
+    return np.concatenate([[np.nan], close[1:] / close[:-1] - 1])
+
+
+def _windowed(values, window, reduce):
+    out = np.full(len(values), np.nan)
+    for end in range(window, len(values) + 1):
+        chunk = values[end - window:end]
+        if np.isfinite(chunk).all():
+            out[end - 1] = reduce(chunk)
+    return out
+
+
+def _ewma(r):
+    out = np.full(len(r), np.nan)
+    level = r[1] ** 2
+    out[1] = level
+    for t in range(2, len(r)):
+        level = EWMA_LAMBDA * level + (1 - EWMA_LAMBDA) * r[t] ** 2
+        out[t] = level
+    return np.sqrt(out)
+
+
+def _garch(r):
+    long_run = np.nanvar(r, ddof=1)
+    out = np.empty(len(r))
+    variance = long_run
+    out[0] = variance
+    for t in range(1, len(r)):
+        shock = r[t - 1] ** 2 if np.isfinite(r[t - 1]) else long_run
+        variance = long_run + GARCH_ALPHA * (shock - long_run) + GARCH_BETA * (variance - long_run)
+        out[t] = variance
+    return np.sqrt(np.clip(out, 0, None))
+
+
+def _range_terms(frame):
+    o, h, l, c = (frame[name].to_numpy() for name in ('Open', 'High', 'Low', 'Close'))
+    usable = (o > 0) & (l > 0)
+    hl = np.full(len(frame), np.nan)
+    co = np.full(len(frame), np.nan)
+    hl[usable] = np.log(h[usable] / l[usable])
+    co[usable] = np.log(c[usable] / o[usable])
+    return hl, co
+
+
+def test_estimators_match_direct_formulas(frame):
+    result = compute_volatility(frame)
+    series = result['series']
+    r = _returns(frame)
+    hl, co = _range_terms(frame)
+
+    expected = {f'realized_{w}': _windowed(r, w, lambda x: np.std(x, ddof=1)) for w in REALIZED_WINDOWS}
+    expected['ewma'] = _ewma(r)
+    expected['garch'] = _garch(r)
+    expected['parkinson'] = np.sqrt(_windowed(hl ** 2 / (4 * math.log(2)), RANGE_WINDOW, np.mean))
+    expected['garman_klass'] = np.sqrt(_windowed(
+        0.5 * hl ** 2 - (2 * math.log(2) - 1) * co ** 2, RANGE_WINDOW, np.mean))
+
+    np.testing.assert_allclose(result['returns'], r, rtol=1e-12)
+    assert set(series) == set(expected)
+    for name, values in expected.items():
+        np.testing.assert_allclose(series[name], values * 100, rtol=1e-9, atol=1e-12, err_msg=name)
+
+    # The range estimators only start once RANGE_WINDOW usable bars have been seen
+    assert np.isnan(series['parkinson'][:5 + RANGE_WINDOW - 1]).all()
+    assert np.isfinite(series['parkinson'][5 + RANGE_WINDOW - 1:]).all()
+
+
+def test_regimes_split_at_realized_terciles(frame):
+    result = compute_volatility(frame)
+    basis = result['series']['realized_20']
+    finite = basis[np.isfinite(basis)]
+    low, high = np.quantile(finite, [1 / 3, 2 / 3])
+
+    expected = np.where(basis >= high, 2, np.where(basis >= low, 1, 0))
+    expected[~np.isfinite(basis)] = -1
+    np.testing.assert_array_equal(result['regime'], expected)
+    assert set(result['regime'][np.isfinite(basis)]) == {0, 1, 2}
+
+    summary = result['summary']
+    assert summary['regime_thresholds'] == [round(low, 2), round(high, 2)]
+    assert summary['regime'] == REGIMES[expected[-1]]
+
+
+def test_short_history_has_no_regime():
+    result = compute_volatility(pd.DataFrame({'Close': [100.0, 101.0, 99.0]}))
+    assert (result['regime'] == -1).all()
+    assert result['summary']['regime'] is None
+    assert result['summary']['regime_thresholds'] == [None, None]
+    assert np.isnan(result['series']['parkinson']).all()
+
+
+def test_dashboard_summary_matches_baseline(client):
+    # The numbers the dashboard printed before the analytics rewrite
+    daily_changes = pd.read_csv(DATA_PATH)['Close'].pct_change()
+    volatility = round(daily_changes.std() * 100, 2)
+    spikes = int(daily_changes[daily_changes.abs() > 0.05].count())
+
+    response = client.get('/volatility-dashboard')
+    assert response.status_code == 200
+    page = response.get_data(as_text=True)
+    assert f'Average Daily Volatility: {volatility}%' in page
+    assert f'Number of Recent Spikes: {spikes}' in page
@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+from ml.model_training import create_dataset
+from ml.windowing import lag_windows
+
+
+def _loop_dataset(data, look_back=1):
+    # create_dataset as it was before the strided version
+    X, y = [], []
+    for i in range(len(data) - look_back):
+        X.append(data[i:(i + look_back), 0])
+        y.append(data[i + look_back, 0])
+    return np.array(X), np.array(y)
+
+
+@pytest.fixture
+def column():
+    # (n, 1) scaled closes, as preprocess_data returns them
+    return np.random.default_rng(5).random((50, 1))
+
+
+@pytest.mark.parametrize('look_back', [1, 2, 5, 30, 49])
+def test_create_dataset_matches_loop(column, look_back):
+    X, y = create_dataset(column, look_back)
+    X_loop, y_loop = _loop_dataset(column, look_back)
+    assert X.shape == X_loop.shape and y.shape == y_loop.shape
+    np.testing.assert_array_equal(X, X_loop)
+    np.testing.assert_array_equal(y, y_loop)
+
+
+@pytest.mark.parametrize('look_back', [50, 80])
+def test_create_dataset_without_enough_rows_is_empty(column, look_back):
+    X, y = create_dataset(column, look_back)
+    assert X.shape == (0, look_back) and y.shape == (0,)
+
+
+def test_lag_windows_horizon_and_stride():
+    series = np.arange(10.0)
+    X, y = lag_windows(series, 3, horizon=2, stride=2)
+    np.testing.assert_array_equal(X, [[0, 1, 2], [2, 3, 4], [4, 5, 6]])
+    np.testing.assert_array_equal(y, [[3, 4], [5, 6], [7, 8]])
+    assert not X.flags.writeable  # views over the series, not copies
+
+    with pytest.raises(ValueError):
+        lag_windows(series, 0)
+    with pytest.raises(ValueError):
+        lag_windows(np.zeros((3, 2, 2)), 1)